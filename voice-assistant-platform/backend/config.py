@@ -21,6 +21,62 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
     WHISPER_MODEL_SIZE: str = "base"
+    # eager: block startup on loading + warmup; background: serve while models load; lazy: load on first use
+    MODEL_LOAD_MODE: str = "background"
+    # Models that must be loaded before /api/health/ready reports ready
+    READY_REQUIRED_MODELS: list[str] = Field(default_factory=lambda: ["whisper", "tts"])
+    # Model lifecycle: 0 disables the RAM budget / idle unloading. Pinned models are never unloaded.
+    MODEL_MEMORY_BUDGET_MB: int = 0
+    MODEL_IDLE_UNLOAD_SECONDS: int = 0
+    MODEL_PINNED: list[str] = Field(default_factory=list)
+    # Dedicated inference thread pools per model; torch threads 0 keeps the torch default
+    MODEL_EXECUTOR_THREADS: dict[str, int] = Field(
+        default_factory=lambda: {"whisper": 1, "whisper_partial": 1, "sentiment": 1, "embedding": 1, "emotion": 2}
+    )
+    MODEL_TORCH_THREADS: dict[str, int] = Field(default_factory=dict)
+    MODEL_EXECUTOR_QUEUE: int = 64
+    # "off": each API worker loads its own models; "client": use the shared model server (python -m models.model_server)
+    MODEL_SERVER_MODE: str = "off"
+    MODEL_SERVER_SOCKET: str = "/tmp/voice-assistant-models.sock"
+    MODEL_SERVER_TIMEOUT_SECONDS: float = 30.0
+    MODEL_SERVER_LOAD_TIMEOUT_SECONDS: float = 900.0
+    MODEL_SERVER_EMBED_BATCH_WAIT_MS: int = 5
+    # "fp32" or "int8" (dynamic quantization of Linear layers; CPU only) for Whisper, sentiment and embeddings
+    MODEL_PRECISION: str = "fp32"
+    # "torch" or "onnx" (ONNX Runtime via optimum) for the sentiment and embedding models
+    TEXT_MODEL_BACKEND: str = "torch"
+    ONNX_CACHE_DIR: str = "./model_cache/onnx"
+    ONNX_INTRA_OP_THREADS: int = 0  # 0 = all cores
+    # Optional fast model for live partials and intent detection (e.g. "openai/whisper-tiny"). Empty
+    # reuses the final model, which lets end_stream keep committed partial text and decode only the tail;
+    # with a separate partial model every utterance is decoded again in full by the final model.
+    WHISPER_PARTIAL_MODEL: str = ""
+    WHISPER_PARTIAL_QUANTIZE: bool = False
+    WHISPER_STREAM_INTERVAL_SECONDS: float = 1.0
+    WHISPER_STREAM_WINDOW_SECONDS: float = 8.0
+    WHISPER_STREAM_UNSTABLE_SECONDS: float = 2.0
+    # Clips longer than one window are split in pauses (or with overlap) and decoded as a batch of windows
+    WHISPER_LONGFORM_WINDOW_SECONDS: float = 30.0
+    WHISPER_LONGFORM_OVERLAP_SECONDS: float = 1.0
+    # Condition each decode on the session's previous transcript; prompted decodes only batch within a session
+    WHISPER_PROMPT_PREVIOUS: bool = False
+    WHISPER_PROMPT_MAX_CHARS: int = 200
+    # Acoustic emotion features look at no more than this much audio (evenly spaced blocks); 0 = whole clip
+    EMOTION_MAX_ANALYSIS_SECONDS: float = 30.0
+    TRANSCRIPTION_CACHE_MAX_MB: float = 16.0  # 0 disables the cache
+    TRANSCRIPTION_CACHE_PATH: str = ""  # optional SQLite file shared by workers on the host
+    TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES: int = 50000
+    ASR_BATCH_MAX_SIZE: int = 8
+    ASR_BATCH_WAIT_MS: int = 20
+    ASR_BUCKET_SECONDS: float = 5.0
+    ASR_PARTIAL_MAX_AGE_MS: int = 1500
+    ASR_CONCURRENCY: int = 1
+    ASR_PARTIAL_CONCURRENCY: int = 1
+    ASR_EXECUTION_MODE: str = "thread"  # "thread" or "process"
+    ASR_WORKERS: int = 0  # process mode only; 0 = half the available cores
+    VAD_ENABLED: bool = True
+    VAD_END_SILENCE_MS: int = 800
+    VAD_MIN_SPEECH_MS: int = 300
     OLLAMA_HOST: str = "http://ollama:11434"
     OLLAMA_MODEL: str = "llama3"
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
@@ -29,15 +85,32 @@ class Settings(BaseSettings):
     OPENROUTER_APP_URL: str | None = None
     OPENROUTER_APP_NAME: str = "AI Voice Assistant Platform"
     TTS_MODEL: str = "tts_models/en/ljspeech/tacotron2-DDC"
+    TTS_STREAM_CONCURRENCY: int = 3
     HUGGINGFACE_TOKEN: str | None = None
+    SENTIMENT_BATCH_MAX_SIZE: int = 16
+    SENTIMENT_BATCH_WAIT_MS: int = 5
+    SENTIMENT_QUEUE_SIZE: int = 256
 
     WHATSAPP_TOKEN: str | None = None
     WHATSAPP_PHONE_NUMBER_ID: str | None = None
     WHATSAPP_VERIFY_TOKEN: str | None = None
     N8N_WEBHOOK_URL: str | None = None
 
+    # Turn latency budgets. The deadline starts once the transcript is known. Enrichment stages that
+    # overrun min(stage budget, time left before the deadline) are answered from a cheaper fallback;
+    # history, the LLM and TTS are never cut short.
+    TURN_DEADLINE_MS: int = 2500
+    STAGE_BUDGETS_MS: dict[str, int] = Field(
+        default_factory=lambda: {"memory": 400, "sentiment": 600, "emotion": 1200, "duplicates": 300}
+    )
+
     CORS_ORIGINS: list[str] | str = Field(default_factory=lambda: ["http://localhost:3000"])
     FRAUD_ALERT_THRESHOLD: float = 0.65
+    # Cross-session near-duplicate detection (services/near_duplicate_index.py)
+    FRAUD_DUPLICATE_WINDOW_DAYS: int = 7
+    FRAUD_DUPLICATE_THRESHOLD: float = 0.8  # estimated Jaccard similarity of character shingles
+    FRAUD_DUPLICATE_MAX_PER_USER: int = 500
+    FRAUD_DUPLICATE_REFRESH_SECONDS: float = 60.0
     URGENCY_ALERT_THRESHOLD: float = 0.80
     AUDIO_STORAGE_PATH: str = "./audio_storage"
 
@@ -45,6 +45,10 @@ async def create_indexes() -> None:
     await db.messages.create_index("session_id")
     await db.messages.create_index("timestamp")
 
+    await db.fraud_fingerprints.create_index([("user_id", 1), ("created_at", -1)])
+    # Each fingerprint carries its own expiry, so changing FRAUD_DUPLICATE_WINDOW_DAYS never alters index options
+    await db.fraud_fingerprints.create_index("expires_at", expireAfterSeconds=0)
+
     await db.integration_logs.create_index("timestamp")
     await db.integration_logs.create_index("integration")
 
@@ -147,6 +147,7 @@ class AnalysisResult(BaseSchema):
     urgency_score: float
     fraud_risk: float
     fraud_signals: list[str]
+    fraud_segments: list[dict] = Field(default_factory=list)
     escalation_required: bool
     label_scores: dict[str, float]
     urgency_label: str = "low"
@@ -1,7 +1,14 @@
+import time
 from typing import List
 
 import numpy as np
 
+from models.model_client import model_client, remote_models
+from models.model_executor import ModelExecutor
+from models.model_loader import ModelLoader
+from models.onnx_backend import OnnxSentenceEncoder, onnx_available, onnx_size_mb, use_onnx
+from models.precision import model_precision, module_size_mb, quantize_module
+
 try:
     from sentence_transformers import SentenceTransformer
 except Exception:  # pragma: no cover
@@ -15,34 +22,108 @@ class EmbeddingService:
     def __init__(self):
         self.model = None
         self.available = False
+        self.load_time_ms = 0
+        self.error: str | None = None
+        self.precision = model_precision()
+        self.backend = "onnx" if use_onnx() else "torch"
+        self.memory_mb = 0.0
+        self.executor = ModelExecutor("embedding")
+        self.loader = ModelLoader(
+            "embedding",
+            self.load,
+            lambda: self.available,
+            unload=self.unload,
+            memory_mb=lambda: self.memory_mb,
+            executor=self.executor,
+        )
 
     async def load(self):
+        if self.available:
+            return
+        if remote_models():
+            await self._connect_model_server()
+            return
+        if self.backend == "onnx" and onnx_available():
+            await self._load_onnx()
+            return
+        self.backend = "torch"
         if SentenceTransformer is None:
             self.available = False
+            self.error = "sentence-transformers unavailable"
             return
         import asyncio
 
+        start = time.perf_counter()
         loop = asyncio.get_event_loop()
-        self.model = await loop.run_in_executor(None, lambda: SentenceTransformer(self.MODEL_NAME))
+        try:
+            model = await loop.run_in_executor(None, lambda: SentenceTransformer(self.MODEL_NAME))
+            self.model = await loop.run_in_executor(None, lambda: quantize_module(model, self.precision))
+        except Exception as exc:
+            self.available = False
+            self.error = str(exc)
+            return
+        self.memory_mb = module_size_mb(self.model)
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+        self.error = None
         self.available = True
 
-    async def embed(self, text: str) -> List[float]:
-        if not self.available:
-            return [0.0] * self.DIMENSIONS
+    async def _connect_model_server(self):
+        start = time.perf_counter()
+        try:
+            info = await model_client.load("embedding")
+        except Exception as exc:
+            self.available = False
+            self.error = f"model server: {exc}"
+            return
+        self.backend = "model_server"
+        self.error = info.get("error")
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+        self.available = bool(info.get("ready"))
+
+    async def _load_onnx(self):
         import asyncio
 
+        start = time.perf_counter()
         loop = asyncio.get_event_loop()
-        embedding = await loop.run_in_executor(None, lambda: self.model.encode(text, normalize_embeddings=True))
+        try:
+            # Exposes the same encode() signature, so embed/embed_batch do not care which backend is active
+            self.model = await loop.run_in_executor(None, lambda: OnnxSentenceEncoder(self.MODEL_NAME, self.precision))
+        except Exception as exc:
+            self.available = False
+            self.error = str(exc)
+            return
+        self.memory_mb = onnx_size_mb(self.model.model)
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+        self.error = None
+        self.available = True
+
+    async def embed(self, text: str) -> List[float]:
+        if not self.available:
+            await self.loader.ensure()
+        if not self.available:
+            return [0.0] * self.DIMENSIONS
+        if remote_models():
+            return (await model_client.embed([text]))[0].tolist()
+        embedding = await self.executor.run(self.model.encode, text, normalize_embeddings=True)
         return embedding.tolist()
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not self.available:
+            await self.loader.ensure()
         if not self.available:
             return [[0.0] * self.DIMENSIONS for _ in texts]
-        import asyncio
+        return (await self.encode(texts)).tolist()
 
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(None, lambda: self.model.encode(texts, normalize_embeddings=True, batch_size=32))
-        return embeddings.tolist()
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Normalized float32 embeddings, one row per text (no availability fallback)."""
+        if remote_models():
+            return await model_client.embed(texts)
+        return await self.executor.run(self.model.encode, texts, normalize_embeddings=True, batch_size=32)
+
+    def unload(self) -> None:
+        self.model = None
+        self.available = False
+        self.memory_mb = 0.0
 
     def cosine_similarity(self, vec_a: List[float], vec_b: List[float]) -> float:
         a = np.array(vec_a)
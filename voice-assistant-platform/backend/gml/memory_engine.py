@@ -14,7 +14,7 @@ logger = structlog.get_logger(__name__)
 
 class MemoryEngine:
     async def initialize(self):
-        await embedding_service.load()
+        # The embedding model itself is loaded (eagerly, in the background or lazily) by ModelManager
         logger.info("gml_memory_engine_initialized", embedding_model=embedding_service.MODEL_NAME, available=embedding_service.available)
 
     async def ingest_session(self, db, user_id: str, session_id: str, transcript: str) -> dict:
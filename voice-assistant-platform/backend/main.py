@@ -19,6 +19,7 @@ from models.model_manager import model_manager
 from routers import analytics, auth, emotion, health, integrations, voice
 from services.session_service import session_service
 from models.tts_service import tts_service
+from models.whisper_service import whisper_service
 from utils.helpers import generate_api_key, hash_password
 from utils.logger import bind_request_context, clear_request_context, configure_logging, get_logger
 from ws.audio_stream import router as ws_router
@@ -70,8 +71,7 @@ async def request_logging_middleware(request: Request, call_next):
 @app.on_event("startup")
 async def on_startup():
     await init_database()
-    await model_manager.initialize()
-    await model_manager.warmup_all()
+    await model_manager.start()
     await memory_engine.initialize()
     db = await get_database()
     asyncio.create_task(memory_decay.schedule_decay_loop(db, interval_hours=24))
@@ -94,6 +94,7 @@ async def on_startup():
 async def on_shutdown():
     await tts_service.cleanup_old_files(settings.AUDIO_RETENTION_HOURS)
     await close_database()
+    whisper_service.shutdown()
 
 
 app.include_router(auth.router)
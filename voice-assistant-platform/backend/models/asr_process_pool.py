@@ -0,0 +1,168 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger("models.asr_process_pool")
+
+# Set in each worker process by _init_worker; never touched in the parent
+_worker_pipe = None
+
+
+def pipeline_kwargs(pipe, options: dict) -> dict:
+    """Pipeline call kwargs for a batch's decode options.
+
+    ``language`` and ``prompt`` travel as plain strings (hashable for batching, JSON-safe
+    for the model server) and only become Whisper generate kwargs here.
+    """
+    options = dict(options)
+    language = options.pop("language", None)
+    prompt = options.pop("prompt", None)
+    generate_kwargs = {}
+    if language:
+        # A pinned language skips Whisper's detection pass
+        generate_kwargs.update(language=language, task="transcribe")
+    if prompt:
+        generate_kwargs["prompt_ids"] = pipe.tokenizer.get_prompt_ids(prompt, return_tensors="pt").to(pipe.device)
+    if generate_kwargs:
+        options["generate_kwargs"] = generate_kwargs
+    return options
+
+
+def _init_worker(model_name: str, torch_threads: int, precision: str) -> None:
+    global _worker_pipe
+    import torch
+    from transformers import pipeline
+
+    from models.precision import quantize_module
+
+    # Workers split the cores between them instead of each spinning up a full-size intra-op pool
+    torch.set_num_threads(torch_threads)
+    _worker_pipe = pipeline("automatic-speech-recognition", model=model_name, device="cpu")
+    _worker_pipe.model = quantize_module(_worker_pipe.model, precision)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _worker_transcribe(shm_name: str, lengths: list[int], options: dict) -> tuple[int, float, list[dict]]:
+    """Decode a batch laid out back to back as float32 in shared memory."""
+    started = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pcm = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        offsets = np.cumsum([0, *lengths])
+        audios = [pcm[offsets[i] : offsets[i + 1]] for i in range(len(lengths))]
+        options = pipeline_kwargs(_worker_pipe, options)
+        if len(audios) == 1:
+            results = [_worker_pipe(audios[0], **options)]
+        else:
+            results = list(_worker_pipe(audios, batch_size=len(audios), **options))
+        # Views into the segment must be gone before it can be closed
+        del audios, pcm
+    finally:
+        shm.close()
+    return os.getpid(), (time.perf_counter() - started) * 1000, results
+
+
+class ASRProcessPool:
+    """Whisper pipelines in separate processes, one model per worker.
+
+    PCM goes through a shared-memory segment per batch, so only its name and the
+    segment lengths are pickled; results come back as ordinary pipeline dicts.
+    """
+
+    def __init__(self, model_name: str, workers: int = 0, precision: str = "fp32"):
+        cpus = os.cpu_count() or 1
+        self.model_name = model_name
+        self.precision = precision
+        self.workers = workers if workers > 0 else max(cpus // 2, 1)
+        self.torch_threads = max(cpus // self.workers, 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.started_at = 0.0
+        self.in_flight = 0
+        self.worker_stats: dict[int, dict] = {}
+
+    def start(self) -> None:
+        """Spawn the workers and block until every model has loaded; raises if they cannot."""
+        # spawn rather than fork: torch and the event loop's threads do not survive a fork cleanly
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.torch_threads, self.precision),
+        )
+        pids = {f.result() for f in [self._executor.submit(_worker_ready) for _ in range(self.workers)]}
+        self.started_at = time.perf_counter()
+        with self._lock:
+            for pid in pids:
+                self.worker_stats.setdefault(pid, {"batches": 0, "requests": 0, "busy_ms": 0.0})
+        logger.info(
+            "asr_process_pool_started",
+            workers=self.workers,
+            torch_threads=self.torch_threads,
+            model=self.model_name,
+            precision=self.precision,
+        )
+
+    def run_batch(self, audios: list[np.ndarray], options: dict) -> list[dict]:
+        """Blocking; called from the ASR scheduler's worker thread."""
+        if self._executor is None:
+            raise RuntimeError("ASR process pool not started")
+        lengths = [len(a) for a in audios]
+        shm = shared_memory.SharedMemory(create=True, size=max(sum(lengths), 1) * 4)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            pcm = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+            offset = 0
+            for audio, length in zip(audios, lengths):
+                pcm[offset : offset + length] = audio
+                offset += length
+            del pcm
+            pid, busy_ms, results = self._executor.submit(_worker_transcribe, shm.name, lengths, options).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            shm.close()
+            shm.unlink()
+
+        with self._lock:
+            stats = self.worker_stats.setdefault(pid, {"batches": 0, "requests": 0, "busy_ms": 0.0})
+            stats["batches"] += 1
+            stats["requests"] += len(audios)
+            stats["busy_ms"] += busy_ms
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        uptime_ms = max((time.perf_counter() - self.started_at) * 1000, 1.0) if self.started_at else 0.0
+        with self._lock:
+            workers = [
+                {
+                    "pid": pid,
+                    "batches": s["batches"],
+                    "requests": s["requests"],
+                    "busy_ms": int(s["busy_ms"]),
+                    "utilisation": round(min(s["busy_ms"] / uptime_ms, 1.0), 3) if uptime_ms else 0.0,
+                }
+                for pid, s in sorted(self.worker_stats.items())
+            ]
+        return {
+            "workers": self.workers,
+            "torch_threads_per_worker": self.torch_threads,
+            "in_flight": self.in_flight,
+            "per_worker": workers,
+        }
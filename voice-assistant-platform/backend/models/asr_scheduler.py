@@ -0,0 +1,177 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger("models.asr_scheduler")
+
+PRIORITY_FINAL = 0
+PRIORITY_PARTIAL = 1
+
+BatchRunner = Callable[[list[np.ndarray], dict], list[dict]]
+
+
+class ASRRequest:
+    def __init__(self, priority: int, seq: int, audio: np.ndarray, options: dict, bucket: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.audio = audio
+        self.options = options
+        # Requests only share a forward pass when they use the same decode options and similar lengths
+        self.key = (tuple(sorted(options.items())), bucket)
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+    def __lt__(self, other: "ASRRequest") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ASRScheduler:
+    """Queues transcription requests and runs them as batched pipeline calls.
+
+    Final transcripts (PRIORITY_FINAL) are always picked ahead of streaming partials;
+    partials that waited longer than ``partial_max_age_ms`` are dropped (resolved to None)
+    since a fresher partial will follow.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 20,
+        bucket_seconds: float = 5.0,
+        partial_max_age_ms: int = 1500,
+        concurrency: int = 1,
+        sample_rate: int = 16000,
+        executor=None,
+    ):
+        self.name = name
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait_ms / 1000
+        self.bucket_samples = max(int(bucket_seconds * sample_rate), 1)
+        self.partial_max_age = partial_max_age_ms / 1000
+        self.concurrency = max(concurrency, 1)
+        # Optional ModelExecutor; without one batches run on the default thread pool
+        self.executor = executor
+        self._runner: BatchRunner | None = None
+        self._pending: list[ASRRequest] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.in_flight = 0
+        # Monotonic time the last batch finished, on whichever runner is bound
+        self.last_used = 0.0
+        self.stats = {"requests": 0, "batches": 0, "max_batch_size": 0, "dropped_partials": 0, "wait_ms_total": 0}
+
+    def bind(self, runner: BatchRunner) -> None:
+        """``runner(audios, options)`` is a blocking call returning one result per audio; it runs off the event loop."""
+        self._runner = runner
+
+    async def submit(self, audio: np.ndarray, priority: int = PRIORITY_FINAL, **options: Any) -> dict | None:
+        if self._runner is None:
+            raise RuntimeError(f"ASR scheduler {self.name} has no runner bound")
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        bucket = len(audio) // self.bucket_samples
+        heapq.heappush(self._pending, ASRRequest(priority, next(self._seq), audio, options, bucket, future))
+        self._wakeup.set()
+        return await future
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or not self._workers or all(w.done() for w in self._workers):
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._workers = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def _take_batch(self) -> list[ASRRequest]:
+        head = heapq.heappop(self._pending)
+        batch = [head]
+        keep: list[ASRRequest] = []
+        for request in sorted(self._pending):
+            if len(batch) < self.max_batch_size and request.key == head.key:
+                batch.append(request)
+            else:
+                keep.append(request)
+        heapq.heapify(keep)
+        self._pending = keep
+        return batch
+
+    def _drop_stale_partials(self) -> None:
+        now = time.perf_counter()
+        fresh = []
+        for request in self._pending:
+            if request.priority == PRIORITY_PARTIAL and now - request.enqueued > self.partial_max_age:
+                self.stats["dropped_partials"] += 1
+                if not request.future.done():
+                    request.future.set_result(None)
+            else:
+                fresh.append(request)
+        if len(fresh) != len(self._pending):
+            heapq.heapify(fresh)
+            self._pending = fresh
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Give the head request a short window for compatible requests to join its batch
+            head = self._pending[0]
+            remaining = head.enqueued + self.max_wait - time.perf_counter()
+            if remaining > 0 and sum(1 for r in self._pending if r.key == head.key) < self.max_batch_size:
+                await asyncio.sleep(remaining)
+
+            self._drop_stale_partials()
+            if not self._pending:
+                continue
+            batch = self._take_batch()
+            started = time.perf_counter()
+            self.in_flight += len(batch)
+            try:
+                audios, options = [r.audio for r in batch], dict(batch[0].options)
+                if self.executor is not None:
+                    results = await self.executor.run(self._runner, audios, options)
+                else:
+                    results = await asyncio.to_thread(self._runner, audios, options)
+            except Exception as exc:
+                logger.error("asr_batch_failed", scheduler=self.name, batch_size=len(batch), error=str(exc))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+                continue
+            finally:
+                self.in_flight -= len(batch)
+                self.last_used = time.monotonic()
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+            self.stats["wait_ms_total"] += int(sum(started - r.enqueued for r in batch) * 1000)
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+
+    def get_stats(self) -> dict:
+        requests = self.stats["requests"]
+        return {
+            "queue_depth": len(self._pending),
+            "queued_finals": sum(1 for r in self._pending if r.priority == PRIORITY_FINAL),
+            "queued_partials": sum(1 for r in self._pending if r.priority == PRIORITY_PARTIAL),
+            "in_flight": self.in_flight,
+            "requests": requests,
+            "batches": self.stats["batches"],
+            "max_batch_size": self.stats["max_batch_size"],
+            "avg_batch_size": round(requests / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+            "avg_wait_ms": round(self.stats["wait_ms_total"] / requests, 1) if requests else 0.0,
+            "dropped_partials": self.stats["dropped_partials"],
+        }
@@ -3,21 +3,26 @@ Emotion-Aware AI Service
 """
 
 import asyncio
-import io
 import random
+from collections.abc import Awaitable
 
 import numpy as np
 import structlog
 
+from config import settings
+from models.model_executor import ModelExecutor
+from utils.acoustic_features import StreamingFeatures, extract_features
+from utils.text_signals import text_scanner
+
 logger = structlog.get_logger(__name__)
 
-try:
-    import librosa
 
-    LIBROSA_AVAILABLE = True
-except Exception:
-    LIBROSA_AVAILABLE = False
-    logger.warning("librosa_not_available")
+class _SessionStream:
+    def __init__(self):
+        self.features = StreamingFeatures()
+        # Analysis of the latest block; each block waits for the one before it
+        self.pending: asyncio.Future | None = None
+        self.failed = False
 
 
 class EmotionService:
@@ -28,25 +33,98 @@ class EmotionService:
     EXCITEMENT_INDICATORS = {"high_pitch": 220, "fast_speech": 150, "high_energy": 0.07, "low_pauses": 0.08}
     CONFIDENCE_INDICATORS = {"moderate_pitch": (120, 180), "low_variation": 25, "moderate_speech": (100, 140), "moderate_pauses": (0.15, 0.3)}
 
+    # Transcript keywords, registered with the shared text scanner as "emotion.<name>"
+    KEYWORDS = {
+        # High-intensity overrides applied on top of the acoustic scores
+        "override.stressed": ["pain", "hurt", "help", "emergency", "dying", "accident", "stop", "immediate", "urgent"],
+        "override.hostile": ["hate", "hateful", "shut up", "idiot", "stupid", "dumb", "kill", "die", "annoying"],
+        "override.sad": ["sad", "unhappy", "cry", "crying", "lonely", "alone", "depressed", "miserable", "broken"],
+        # Text-only fallback (used when audio feature extraction fails)
+        "distress": ["pain", "help", "hurt", "suicide", "kill myself", "die", "can't go on", "hopeless", "panic", "anxiety", "scared", "terrified"],
+        "hate": ["hate", "hateful", "stupid", "idiot", "worthless", "die", "kill", "shut up"],
+        "stressed": ["stressed", "overwhelmed", "pressure", "exhausted"],
+        "nervous": ["nervous", "anxious", "worried", "scared", "panic"],
+        "excited": ["excited", "amazing", "awesome", "fantastic"],
+        "confident": ["definitely", "absolutely", "certainly", "confident"],
+        "sad": ["sad", "depressed", "upset", "hopeless", "lonely"],
+    }
+
     def __init__(self):
-        self.available = LIBROSA_AVAILABLE
+        for name, words in self.KEYWORDS.items():
+            text_scanner.add_keywords(f"emotion.{name}", words)
+        # Features are computed with NumPy on the raw PCM; nothing optional to load
+        self.available = True
+        # Feature extraction is CPU-heavy; keep it on its own pool so it cannot starve model inference
+        self.executor = ModelExecutor("emotion")
+        self._streams: dict[str, _SessionStream] = {}
+
+    def feed(self, session_id: str, chunk: bytes) -> None:
+        """Accumulate acoustic features for the utterance being streamed by a session.
+
+        Buffering happens here; full blocks of frames are analysed on the emotion pool while
+        the speaker is still talking, so the turn only pays for the final fraction of a second.
+        """
+        stream = self._streams.get(session_id)
+        if stream is None:
+            stream = self._streams[session_id] = _SessionStream()
+        block = stream.features.take(chunk)
+        if block is not None and not stream.failed:
+            stream.pending = asyncio.ensure_future(self._analyze_block(stream, stream.pending, block))
+
+    async def _analyze_block(self, stream: _SessionStream, previous: asyncio.Future | None, block: np.ndarray) -> None:
+        if previous is not None:
+            await asyncio.shield(previous)
+        if stream.failed:
+            return
+        try:
+            await self.executor.run(stream.features.analyze, block)
+        except Exception as exc:
+            stream.failed = True
+            logger.warning("emotion_stream_analysis_failed", error=str(exc))
+
+    def finish_stream(self, session_id: str, audio_bytes_len: int) -> Awaitable[dict | None]:
+        """Finished features for the session's streamed utterance, or None to fall back to batch extraction.
+
+        The stream is detached immediately, so chunks fed afterwards start the next utterance.
+        """
+        return self._finalize_stream(self._streams.pop(session_id, None), audio_bytes_len)
+
+    async def _finalize_stream(self, stream: _SessionStream | None, audio_bytes_len: int) -> dict | None:
+        if stream is None:
+            return None
+        if stream.pending is not None:
+            await stream.pending
+        # Only trust the running statistics if they saw exactly the audio being analysed
+        if stream.failed or stream.features.samples != audio_bytes_len // 2:
+            return None
+        return stream.features.finalize()
 
-    async def analyze_audio(self, audio_bytes: bytes, transcript: str = "") -> dict:
+    def reset_stream(self, session_id: str) -> None:
+        stream = self._streams.pop(session_id, None)
+        if stream is not None and stream.pending is not None:
+            stream.pending.cancel()
+
+    async def analyze_audio(
+        self, audio_bytes: bytes, transcript: str = "", segments: list[dict] | None = None, features: dict | None = None
+    ) -> dict:
+        """Emotion for an utterance; ``features`` from finish_stream skips the acoustic extraction entirely."""
         if not audio_bytes or len(audio_bytes) < 1000:
             return self._text_only_fallback(transcript)
 
-        loop = asyncio.get_event_loop()
-        try:
-            features = await loop.run_in_executor(None, self._extract_audio_features, audio_bytes)
-        except Exception:
-            features = None
+        if features is None:
+            try:
+                features = await self.executor.run(self._extract_audio_features, audio_bytes)
+            except Exception:
+                features = None
 
-        if features is None or not LIBROSA_AVAILABLE:
+        if features is None:
             return self._text_only_fallback(transcript)
 
-        if transcript and features.get("duration", 0) > 0:
+        # Timestamped segments give the time actually spent talking; long recordings are mostly pauses
+        speaking_seconds = sum(max(s["end"] - s["start"], 0.0) for s in segments or []) or features.get("duration", 0)
+        if transcript and speaking_seconds > 0:
             word_count = len(transcript.split())
-            features["speech_rate_wpm"] = (word_count / features["duration"]) * 60
+            features["speech_rate_wpm"] = (word_count / speaking_seconds) * 60
         else:
             features["speech_rate_wpm"] = 120
 
@@ -58,21 +136,16 @@ class EmotionService:
 
         # Post-process: If transcript contains high-intensity keywords, 
         # ensure dominant emotion reflects the sentiment even if audio features are subtle.
-        text_lower = (transcript or "").lower()
-        
-        # High intensity maps
-        stressed_keywords = ["pain", "hurt", "help", "emergency", "dying", "accident", "stop", "immediate", "urgent"]
-        hostile_keywords = ["hate", "hateful", "shut up", "idiot", "stupid", "dumb", "kill", "die", "annoying"]
-        sad_keywords = ["sad", "unhappy", "cry", "crying", "lonely", "alone", "depressed", "miserable", "broken"]
-        
-        if any(w in text_lower for w in stressed_keywords):
+        signals = text_scanner.scan(transcript or "")
+
+        if signals.has("emotion.override.stressed"):
             emotion_scores["stressed"] = 0.9
             emotion_scores["calm"] = 0.0
-        elif any(w in text_lower for w in hostile_keywords):
+        elif signals.has("emotion.override.hostile"):
             emotion_scores["stressed"] = 0.8
             emotion_scores["nervous"] = 0.1
             emotion_scores["calm"] = 0.0
-        elif any(w in text_lower for w in sad_keywords):
+        elif signals.has("emotion.override.sad"):
             emotion_scores["sad"] = 0.9
             emotion_scores["calm"] = 0.0
 
@@ -97,36 +170,12 @@ class EmotionService:
                 "tremor_score": round(features.get("tremor", 0), 3),
             },
             "suggestion": suggestion,
-            "analysis_method": "audio" if LIBROSA_AVAILABLE else "text_fallback",
+            "analysis_method": "audio",
         }
 
-    def _extract_audio_features(self, audio_bytes: bytes) -> dict:
-        y, sr = librosa.load(io.BytesIO(audio_bytes), sr=16000, mono=True)
-        duration = librosa.get_duration(y=y, sr=sr)
-        if duration < 0.5:
-            return None
-        f0, voiced_flag, _ = librosa.pyin(y, fmin=librosa.note_to_hz("C2"), fmax=librosa.note_to_hz("C7"), sr=sr)
-        voiced_f0 = f0[voiced_flag] if voiced_flag is not None else f0[~np.isnan(f0)]
-        if len(voiced_f0) > 0:
-            pitch_mean = float(np.nanmean(voiced_f0))
-            pitch_std = float(np.nanstd(voiced_f0))
-            tremor = float(np.nanmean(np.abs(np.diff(voiced_f0)))) if len(voiced_f0) > 1 else 0.0
-        else:
-            pitch_mean = pitch_std = tremor = 0.0
-        rms = librosa.feature.rms(y=y)[0]
-        energy_rms = float(np.mean(rms))
-        silence_threshold = np.max(rms) * 0.1 if len(rms) else 0
-        pause_ratio = float(np.sum(rms < silence_threshold) / len(rms)) if len(rms) else 0.0
-        spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        return {
-            "pitch_mean": pitch_mean,
-            "pitch_std": pitch_std,
-            "tremor": tremor,
-            "energy_rms": energy_rms,
-            "pause_ratio": pause_ratio,
-            "tone_brightness": float(np.mean(spectral_centroid)),
-            "duration": duration,
-        }
+    def _extract_audio_features(self, audio_bytes: bytes) -> dict | None:
+        # Input is raw 16 kHz Int16 PCM, like everything else on the audio path
+        return extract_features(audio_bytes, max_seconds=settings.EMOTION_MAX_ANALYSIS_SECONDS)
 
     def _score_emotions(self, features: dict) -> dict[str, float]:
         pitch_mean = features.get("pitch_mean", 0)
@@ -196,52 +245,26 @@ class EmotionService:
     def _text_only_fallback(self, transcript: str) -> dict:
         if not transcript:
             return self._neutral_result()
-        text = transcript.lower()
-        # Keyword-driven fallback (used when audio feature extraction fails).
-        distress_terms = [
-            "pain",
-            "help",
-            "hurt",
-            "suicide",
-            "kill myself",
-            "die",
-            "can't go on",
-            "hopeless",
-            "panic",
-            "anxiety",
-            "scared",
-            "terrified",
-        ]
-        hate_terms = [
-            "hate",
-            "hateful",
-            "stupid",
-            "idiot",
-            "worthless",
-            "die",
-            "kill",
-            "shut up",
-        ]
-
-        distress_hits = sum(1 for w in distress_terms if w in text)
-        hate_hits = sum(1 for w in hate_terms if w in text)
+        signals = text_scanner.scan(transcript)
+        distress_hits = signals.count("emotion.distress")
+        hate_hits = signals.count("emotion.hate")
 
         scores = {
             "stressed": min(
-                (sum(w in text for w in ["stressed", "overwhelmed", "pressure", "exhausted"]) * 0.3)
+                (signals.count("emotion.stressed") * 0.3)
                 + (distress_hits * 0.25)
                 + (hate_hits * 0.15),
                 1.0,
             ),
             "nervous": min(
-                (sum(w in text for w in ["nervous", "anxious", "worried", "scared", "panic"]) * 0.3)
+                (signals.count("emotion.nervous") * 0.3)
                 + (distress_hits * 0.2),
                 1.0,
             ),
-            "excited": min(sum(w in text for w in ["excited", "amazing", "awesome", "fantastic"]) * 0.3, 1.0),
-            "confident": min(sum(w in text for w in ["definitely", "absolutely", "certainly", "confident"]) * 0.3, 1.0),
+            "excited": min(signals.count("emotion.excited") * 0.3, 1.0),
+            "confident": min(signals.count("emotion.confident") * 0.3, 1.0),
             "sad": min(
-                (sum(w in text for w in ["sad", "depressed", "upset", "hopeless", "lonely"]) * 0.3)
+                (signals.count("emotion.sad") * 0.3)
                 + (distress_hits * 0.25),
                 1.0,
             ),
@@ -0,0 +1,121 @@
+import asyncio
+import itertools
+
+import numpy as np
+
+from config import settings
+from models.model_ipc import ModelServerError, read_message, write_message
+from utils.logger import get_logger
+
+logger = get_logger("models.model_client")
+
+
+def remote_models() -> bool:
+    """True when Whisper, sentiment and embeddings are served by the model-server process."""
+    return settings.MODEL_SERVER_MODE == "client"
+
+
+class ModelClient:
+    """One multiplexed Unix-socket connection per API worker to the model server.
+
+    Requests are matched to responses by id, so concurrent callers share the
+    connection; it is (re)opened on demand after the server restarts.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.MODEL_SERVER_SOCKET
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock: asyncio.Lock | None = None
+        self._write_lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = {"requests": 0, "errors": 0, "reconnects": 0}
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _ensure_connected(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._connect_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+            self._reader = self._writer = self._reader_task = None
+        if self.connected:
+            return
+        async with self._connect_lock:
+            if self.connected:
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            self._reader_task = loop.create_task(self._read_loop(self._reader, self._writer))
+            self.stats["reconnects"] += 1
+            logger.info("model_server_connected", path=self.path)
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_id, meta, blob = await read_message(reader)
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((meta, blob))
+        except (asyncio.IncompleteReadError, ConnectionError, ModelServerError) as exc:
+            logger.warning("model_server_connection_lost", error=str(exc))
+        finally:
+            # No awaits below: nothing can reconnect until every request on this connection has failed
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ModelServerError("model server connection lost"))
+
+    async def request(
+        self, op: str, meta: dict | None = None, blob: bytes | memoryview = b"", timeout: float | None = None
+    ) -> tuple[dict, bytes]:
+        await self._ensure_connected()
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.stats["requests"] += 1
+        try:
+            async with self._write_lock:
+                await write_message(self._writer, request_id, {"op": op, **(meta or {})}, blob)
+            response, payload = await asyncio.wait_for(future, timeout or settings.MODEL_SERVER_TIMEOUT_SECONDS)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+        if response.get("error"):
+            self.stats["errors"] += 1
+            raise ModelServerError(response["error"])
+        return response, payload
+
+    async def load(self, model: str) -> dict:
+        """Block until the server has the model loaded; returns its status there."""
+        response, _ = await self.request("load", {"model": model}, timeout=settings.MODEL_SERVER_LOAD_TIMEOUT_SECONDS)
+        return response
+
+    async def decode(self, audio: np.ndarray, partial: bool, options: dict) -> dict | None:
+        pcm = np.ascontiguousarray(audio, dtype=np.float32)
+        response, _ = await self.request("asr", {"partial": partial, "options": options}, memoryview(pcm).cast("B"))
+        return response.get("result")
+
+    async def analyze(self, texts: list[str]) -> list[dict]:
+        response, _ = await self.request("sentiment", {"texts": texts})
+        return response["results"]
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        response, blob = await self.request("embed", {"texts": texts})
+        return np.frombuffer(blob, dtype=np.float32).reshape(response["shape"])
+
+    def get_stats(self) -> dict:
+        return {"path": self.path, "connected": self.connected, "in_flight": len(self._pending), **self.stats}
+
+
+model_client = ModelClient()
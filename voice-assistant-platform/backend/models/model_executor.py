@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("models.executor")
+
+try:
+    import torch
+except Exception:  # pragma: no cover
+    torch = None
+
+
+def _init_thread(torch_threads: int) -> None:
+    # With OpenMP builds the intra-op thread count is per calling thread, so each pool keeps its own setting
+    if torch is not None and torch_threads > 0:
+        torch.set_num_threads(torch_threads)
+
+
+class ModelExecutor:
+    """Dedicated, bounded thread pool for one model's inference.
+
+    At most ``threads`` calls run at once and at most ``max_queue`` more wait for a thread;
+    further callers wait on the event loop rather than piling work into a shared pool.
+    """
+
+    def __init__(self, name: str, threads: int | None = None, torch_threads: int | None = None, max_queue: int | None = None):
+        self.name = name
+        self.threads = max(threads or settings.MODEL_EXECUTOR_THREADS.get(name, 1), 1)
+        self.torch_threads = torch_threads if torch_threads is not None else settings.MODEL_TORCH_THREADS.get(name, 0)
+        self.max_queue = max_queue if max_queue is not None else settings.MODEL_EXECUTOR_QUEUE
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.threads,
+            thread_name_prefix=f"model-{name}",
+            initializer=_init_thread,
+            initargs=(self.torch_threads,),
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        # Monotonic time the last call finished; the model's loader reads it for idle unloading
+        self.last_used = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.threads + self.max_queue)
+            self._slots_loop = loop
+        return self._slots
+
+    def _call(self, ticket: dict, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            ticket["started"] = True
+            if not ticket["abandoned"]:
+                self.queued -= 1
+            self.in_flight += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        async with self._semaphore():
+            ticket = {"started": False, "abandoned": False}
+            with self._lock:
+                self.queued += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._pool, self._call, ticket, fn, args, kwargs)
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    if not ticket["started"]:
+                        # Cancelled while still queued; the thread (if it ever runs it) must not count it again
+                        ticket["abandoned"] = True
+                        self.queued -= 1
+                self.last_used = time.monotonic()
+            self.completed += 1
+            return result
+
+    @property
+    def busy(self) -> bool:
+        return self.queued > 0 or self.in_flight > 0
+
+    def get_stats(self) -> dict:
+        return {
+            "threads": self.threads,
+            "torch_threads": self.torch_threads,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,54 @@
+"""
+Framing for the local model-server socket.
+
+Each message is a 12-byte header followed by two payloads:
+
+    request id (u32) | meta length (u32) | blob length (u32) | meta | blob
+
+``meta`` is a small dict (the operation and its arguments, or the result) encoded
+as UTF-8 JSON; ``blob`` carries bulk numeric data untouched — float32 PCM for
+ASR requests, float32 matrices for embedding responses. Requests and responses
+share the request id, so one connection can have many requests in flight.
+"""
+
+import asyncio
+import json
+import struct
+
+import numpy as np
+
+HEADER = struct.Struct("!III")
+MAX_META_BYTES = 16 * 1024 * 1024
+MAX_BLOB_BYTES = 512 * 1024 * 1024
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_message(request_id: int, meta: dict, blob: bytes | memoryview = b"") -> list[bytes | memoryview]:
+    meta_bytes = json.dumps(meta, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return [HEADER.pack(request_id, len(meta_bytes), len(blob)), meta_bytes, blob]
+
+
+async def write_message(writer: asyncio.StreamWriter, request_id: int, meta: dict, blob: bytes | memoryview = b"") -> None:
+    writer.writelines(encode_message(request_id, meta, blob))
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[int, dict, bytes]:
+    """Next message on the stream; raises asyncio.IncompleteReadError at EOF."""
+    request_id, meta_len, blob_len = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if meta_len > MAX_META_BYTES or blob_len > MAX_BLOB_BYTES:
+        raise ModelServerError(f"frame too large (meta={meta_len}, blob={blob_len})")
+    meta = json.loads(await reader.readexactly(meta_len)) if meta_len else {}
+    blob = await reader.readexactly(blob_len) if blob_len else b""
+    return request_id, meta, blob
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from models.model_executor import ModelExecutor
+from models.model_registry import model_registry
+from utils.logger import get_logger
+
+logger = get_logger("models.loader")
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelLoader:
+    """Runs a service's load coroutine at most once and tracks its readiness.
+
+    Any number of callers can ``ensure()`` concurrently; they all wait on the same load.
+    A failed load is not retried automatically, so a broken model does not stall every request.
+    After ``unload()`` the next ``ensure()`` loads the model again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[], Awaitable[None]],
+        is_available: Callable[[], bool],
+        unload: Callable[[], None] | None = None,
+        memory_mb: Callable[[], float] | None = None,
+        executor: ModelExecutor | None = None,
+        is_busy: Callable[[], bool] | None = None,
+        last_used: Callable[[], float] | None = None,
+    ):
+        self.name = name
+        self._load = load
+        self._is_available = is_available
+        self._unload = unload
+        self._memory_mb = memory_mb
+        self._is_busy = is_busy
+        self._last_used = last_used
+        self.executor = executor
+        self._task: asyncio.Task | None = None
+        self.state = NOT_LOADED
+        self.warmed = False
+        self.loaded_at: float | None = None
+        self._touched = time.monotonic()
+        model_registry.register(self)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def can_unload(self) -> bool:
+        return self._unload is not None
+
+    @property
+    def busy(self) -> bool:
+        return bool((self.executor and self.executor.busy) or (self._is_busy and self._is_busy()))
+
+    @property
+    def memory_mb(self) -> float:
+        return self._memory_mb() if self._memory_mb else 0.0
+
+    @property
+    def last_used(self) -> float:
+        """Monotonic time of the latest ``ensure()`` or inference, whichever came last."""
+        used = self._touched
+        if self.executor is not None:
+            used = max(used, self.executor.last_used)
+        if self._last_used is not None:
+            used = max(used, self._last_used())
+        return used
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+    def touch(self) -> None:
+        self._touched = time.monotonic()
+
+    def start(self) -> asyncio.Task:
+        """Begin loading in the background (idempotent) and return the load task."""
+        if self._task is None:
+            self.state = LOADING
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def ensure(self) -> bool:
+        """Load on first use; True once the model is usable."""
+        self.touch()
+        if self.state == READY:
+            return True
+        if self.state == FAILED:
+            return False
+        await asyncio.shield(self.start())
+        return self.state == READY
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self._load()
+        except Exception as exc:
+            logger.error("model_load_failed", model=self.name, error=str(exc))
+        self.state = READY if self._is_available() else FAILED
+        self.loaded_at = time.time()
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        model_registry.record(self.name, "load" if self.ready else "load_failed", elapsed_ms=elapsed_ms, memory_mb=self.memory_mb)
+        if self.ready:
+            await model_registry.enforce_budget(keep=self.name)
+
+    async def unload(self) -> bool:
+        """Drop the model if it is loaded and idle; False if it could not be unloaded."""
+        if self._unload is None or self.state != READY or self.busy:
+            return False
+        self._unload()
+        self.state = NOT_LOADED
+        self._task = None
+        self.warmed = False
+        return True
+
+    def status(self) -> dict:
+        status = {"state": self.state, "warmed": self.warmed, "memory_mb": self.memory_mb, "idle_seconds": int(self.idle_seconds)}
+        if self.executor is not None:
+            status["executor"] = self.executor.get_stats()
+        return status
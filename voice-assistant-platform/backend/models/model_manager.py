@@ -1,89 +1,158 @@
+import asyncio
 import time
 
 from config import settings
+from gml.embedding_service import embedding_service
+from models.model_loader import ModelLoader
+from models.model_registry import model_registry
 from models.openrouter_service import openrouter_service
 from models.sentiment_service import sentiment_service
 from models.tts_service import tts_service
 from models.whisper_service import whisper_service
 from models.emotion_service import emotion_service
+from utils.logger import get_logger
+
+logger = get_logger("models.manager")
 
 
 class ModelManager:
     def __init__(self):
-        self.whisper_status = {"available": False, "model_name": settings.WHISPER_MODEL_SIZE, "load_time_ms": 0, "error": None}
         self.openrouter_status = {"available": False, "model_name": settings.OPENROUTER_MODEL, "load_time_ms": 0, "error": None}
-        self.tts_status = {"available": False, "model_name": settings.TTS_MODEL, "load_time_ms": 0, "error": None}
-        self.sentiment_status = {
-            "available": False,
-            "model_name": "cardiffnlp/twitter-roberta-base-sentiment-latest",
-            "load_time_ms": 0,
-            "error": None,
+        self.loaders: dict[str, ModelLoader] = {
+            "whisper": whisper_service.loader,
+            "tts": tts_service.loader,
+            "sentiment": sentiment_service.loader,
+            "embedding": embedding_service.loader,
         }
-        self.emotion_status = {"available": False, "model_name": "librosa acoustic analysis", "load_time_ms": 0, "error": None}
+        self._background: asyncio.Task | None = None
 
-    async def initialize(self) -> None:
-        ws = time.perf_counter()
-        await whisper_service.load_model()
-        self.whisper_status = {
-            "available": whisper_service.available,
-            "model_name": whisper_service.model_name,
-            "load_time_ms": whisper_service.load_time_ms,
-            "error": whisper_service.error,
-        }
+    async def start(self) -> None:
+        """Bring models up according to MODEL_LOAD_MODE.
 
-        ts = time.perf_counter()
-        await tts_service.load_model()
-        self.tts_status = {
-            "available": tts_service.available,
-            "model_name": tts_service.model_name,
-            "load_time_ms": tts_service.load_time_ms,
-            "error": tts_service.error,
-        }
+        eager: block startup until every model is loaded and warmed (loaded concurrently).
+        background: return immediately; models load and warm concurrently while the API serves.
+        lazy: load each model on its first use, without warmup.
+        """
+        mode = settings.MODEL_LOAD_MODE
+        logger.info("model_startup", mode=mode)
+        model_registry.start_reaper()
+        if mode == "eager":
+            await self.initialize()
+        elif mode == "lazy":
+            await self.check_openrouter()
+        else:
+            self._background = asyncio.create_task(self.initialize())
 
-        ss = time.perf_counter()
-        await sentiment_service.load_model()
-        self.sentiment_status = {
-            "available": sentiment_service.available,
-            "model_name": sentiment_service.model_name,
-            "load_time_ms": sentiment_service.load_time_ms,
-            "error": sentiment_service.error,
-        }
+    async def initialize(self) -> None:
+        started = time.perf_counter()
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self.load_models(list(self.loaders)))
+            tg.create_task(self.check_openrouter())
+        logger.info("models_initialized", elapsed_ms=int((time.perf_counter() - started) * 1000), readiness=self.readiness()["models"])
 
-        os = time.perf_counter()
-        ok = await openrouter_service.check_availability()
+    async def load_models(self, names: list[str]) -> None:
+        """Load and warm the named models concurrently."""
+        async with asyncio.TaskGroup() as tg:
+            for name in names:
+                tg.create_task(self._load_and_warm(name))
+
+    async def _load_and_warm(self, name: str) -> None:
+        loader = self.loaders[name]
+        if not await loader.ensure():
+            return
         try:
-            self.emotion_status = {
-                "available": emotion_service.available,
-                "model_name": "librosa acoustic analysis",
-                "load_time_ms": 0,
-                "error": None if emotion_service.available else "librosa not installed",
-            }
-        except Exception as e:
-            self.emotion_status = {"available": False, "model_name": "librosa acoustic analysis", "load_time_ms": 0, "error": str(e)}
+            await self._warmup(name)
+            loader.warmed = True
+        except Exception as exc:
+            logger.warning("model_warmup_failed", model=name, error=str(exc))
+
+    async def _warmup(self, name: str) -> None:
+        if name == "whisper":
+            await whisper_service.transcribe(tts_service._generate_silent_wav(0.2), trim_silence=False)
+        elif name == "sentiment":
+            await sentiment_service.analyze("This is a test message")
+        elif name == "tts":
+            await tts_service.synthesize("Warmup")
+        elif name == "embedding":
+            await embedding_service.embed("warmup")
+        # Disabled OpenRouter warmup to avoid initial rate limits
 
+    async def check_openrouter(self) -> None:
+        started = time.perf_counter()
+        ok = await openrouter_service.check_availability()
         self.openrouter_status = {
             "available": ok,
             "model_name": openrouter_service.model_name,
-            "load_time_ms": int((time.perf_counter() - os) * 1000),
+            "load_time_ms": int((time.perf_counter() - started) * 1000),
             "error": openrouter_service.error,
         }
 
-    async def warmup_all(self) -> None:
-        if whisper_service.available:
-            await whisper_service.transcribe(tts_service._generate_silent_wav(0.2))
-        # Disabled OpenRouter warmup to avoid initial rate limits
-        if sentiment_service.available:
-            sentiment_service.analyze("This is a test message")
-        if tts_service.available:
-            await tts_service.synthesize("Warmup")
+    def readiness(self) -> dict:
+        models = {name: loader.status() for name, loader in self.loaders.items()}
+        required = [name for name in settings.READY_REQUIRED_MODELS if name in models]
+        return {
+            "ready": all(models[name]["state"] == "ready" for name in required),
+            "required": required,
+            "models": models,
+        }
+
+    def _emotion_status(self) -> dict:
+        try:
+            return {
+                "available": emotion_service.available,
+                "model_name": "numpy acoustic analysis",
+                "load_time_ms": 0,
+                "error": None,
+                "executor": emotion_service.executor.get_stats(),
+            }
+        except Exception as e:
+            return {"available": False, "model_name": "numpy acoustic analysis", "load_time_ms": 0, "error": str(e)}
 
     async def get_health(self) -> dict:
+        # Built from the services on every call: with background/lazy loading the values change after startup
         return {
-            "whisper": self.whisper_status,
+            "whisper": {
+                "available": whisper_service.available,
+                "model_name": whisper_service.model_name,
+                "load_time_ms": whisper_service.load_time_ms,
+                "error": whisper_service.error,
+                "precision": whisper_service.precision,
+                "memory_mb": whisper_service.memory_mb,
+                "readiness": whisper_service.loader.status(),
+                "scheduler": whisper_service.get_execution_stats(),
+                "partial": whisper_service.get_partial_status(),
+                "cache": whisper_service.get_cache_stats(),
+            },
             "openrouter": self.openrouter_status,
-            "tts": self.tts_status,
-            "sentiment": self.sentiment_status,
-            "emotion": self.emotion_status,
+            "tts": {
+                "available": tts_service.available,
+                "model_name": tts_service.model_name,
+                "load_time_ms": tts_service.load_time_ms,
+                "error": tts_service.error,
+                "readiness": tts_service.loader.status(),
+            },
+            "sentiment": {
+                "available": sentiment_service.available,
+                "model_name": sentiment_service.model_name,
+                "load_time_ms": sentiment_service.load_time_ms,
+                "error": sentiment_service.error,
+                "precision": sentiment_service.precision,
+                "backend": sentiment_service.backend,
+                "memory_mb": sentiment_service.memory_mb,
+                "readiness": sentiment_service.loader.status(),
+                "batching": sentiment_service.get_stats(),
+            },
+            "emotion": self._emotion_status(),
+            "embedding": {
+                "available": embedding_service.available,
+                "model_name": embedding_service.MODEL_NAME,
+                "load_time_ms": embedding_service.load_time_ms,
+                "error": embedding_service.error,
+                "precision": embedding_service.precision,
+                "backend": embedding_service.backend,
+                "memory_mb": embedding_service.memory_mb,
+                "readiness": embedding_service.loader.status(),
+            },
         }
 
 
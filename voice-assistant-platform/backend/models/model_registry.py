@@ -0,0 +1,89 @@
+import asyncio
+import gc
+import time
+from collections import deque
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("models.registry")
+
+
+class ModelRegistry:
+    """Every ModelLoader registers here; enforces the RAM budget and unloads idle models.
+
+    Models are evicted least-recently-used first, and never while they have queued or
+    running inference or when listed in MODEL_PINNED. A reload happens on the next use.
+    """
+
+    def __init__(self):
+        self.loaders: dict = {}
+        self.events: deque[dict] = deque(maxlen=100)
+        self._reaper: asyncio.Task | None = None
+
+    def register(self, loader) -> None:
+        self.loaders[loader.name] = loader
+
+    def record(self, model: str, event: str, **fields) -> None:
+        self.events.append({"ts": time.time(), "model": model, "event": event, **fields})
+        logger.info("model_lifecycle_event", model=model, lifecycle_event=event, **fields)
+
+    def loaded_mb(self) -> float:
+        return round(sum(loader.memory_mb for loader in self.loaders.values() if loader.ready), 1)
+
+    def _evictable(self, exclude: str | None = None) -> list:
+        pinned = set(settings.MODEL_PINNED)
+        return sorted(
+            (
+                loader
+                for loader in self.loaders.values()
+                if loader.ready and loader.can_unload and not loader.busy and loader.name != exclude and loader.name not in pinned
+            ),
+            key=lambda loader: loader.last_used,
+        )
+
+    async def enforce_budget(self, keep: str | None = None) -> None:
+        budget = settings.MODEL_MEMORY_BUDGET_MB
+        if budget <= 0:
+            return
+        while self.loaded_mb() > budget:
+            candidates = self._evictable(exclude=keep)
+            if not candidates:
+                logger.warning("model_memory_budget_exceeded", budget_mb=budget, loaded_mb=self.loaded_mb())
+                return
+            await self.unload(candidates[0], reason="memory_budget")
+
+    async def unload(self, loader, reason: str) -> None:
+        freed = loader.memory_mb
+        if await loader.unload():
+            gc.collect()
+            self.record(loader.name, "unload", reason=reason, freed_mb=freed)
+
+    def start_reaper(self) -> None:
+        if settings.MODEL_IDLE_UNLOAD_SECONDS > 0 and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        interval = min(max(settings.MODEL_IDLE_UNLOAD_SECONDS / 4, 5), 60)
+        while True:
+            await asyncio.sleep(interval)
+            await self.unload_idle()
+
+    async def unload_idle(self) -> None:
+        """Unload every evictable model unused for MODEL_IDLE_UNLOAD_SECONDS."""
+        for loader in self._evictable():
+            if loader.idle_seconds >= settings.MODEL_IDLE_UNLOAD_SECONDS:
+                await self.unload(loader, reason="idle")
+
+    def get_stats(self) -> dict:
+        return {
+            "memory_budget_mb": settings.MODEL_MEMORY_BUDGET_MB,
+            "loaded_mb": self.loaded_mb(),
+            "idle_unload_seconds": settings.MODEL_IDLE_UNLOAD_SECONDS,
+            "pinned": list(settings.MODEL_PINNED),
+            "models": {name: loader.status() for name, loader in self.loaders.items()},
+            "events": list(self.events)[-20:],
+        }
+
+
+model_registry = ModelRegistry()
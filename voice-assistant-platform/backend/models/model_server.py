@@ -0,0 +1,204 @@
+"""
+Standalone model server shared by all API workers on a host.
+
+    python -m models.model_server
+
+Loads Whisper, the sentiment classifier and the embedding model once and serves
+them over MODEL_SERVER_SOCKET (framing in models/model_ipc.py). API workers run
+with MODEL_SERVER_MODE=client, so their service singletons forward
+transcribe / analyze / embed here instead of loading their own copies. Requests
+from every worker meet in the same ASR scheduler, sentiment batch queue and
+embedding batcher, so batches form across workers.
+"""
+
+import asyncio
+import os
+import signal
+import time
+
+import numpy as np
+
+from config import settings
+
+# This process owns the models; never forward to ourselves even if the shared .env says "client"
+settings.MODEL_SERVER_MODE = "serve"
+
+from gml.embedding_service import embedding_service  # noqa: E402
+from models.model_ipc import read_message, write_message  # noqa: E402
+from models.model_manager import model_manager  # noqa: E402
+from models.model_registry import model_registry  # noqa: E402
+from models.sentiment_service import sentiment_service  # noqa: E402
+from models.whisper_service import whisper_service  # noqa: E402
+from utils.logger import configure_logging, get_logger  # noqa: E402
+
+logger = get_logger("models.model_server")
+
+SERVED_MODELS = ("whisper", "sentiment", "embedding")
+
+
+class EmbeddingBatcher:
+    """Coalesces embed requests arriving within a few milliseconds into one encode call."""
+
+    def __init__(self, max_texts: int = 64):
+        self.max_texts = max_texts
+        self.wait = settings.MODEL_SERVER_EMBED_BATCH_WAIT_MS / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self.stats = {"requests": 0, "batches": 0, "max_batch_texts": 0}
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.perf_counter() + self.wait
+            while count < self.max_texts and (remaining := deadline - time.perf_counter()) > 0:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = np.asarray(await embedding_service.encode(texts), dtype=np.float32)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch_texts"] = max(self.stats["max_batch_texts"], len(texts))
+            offset = 0
+            for item_texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset : offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+class ModelServer:
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.MODEL_SERVER_SOCKET
+        self.embedder = EmbeddingBatcher()
+        self.connections = 0
+
+    def _model_info(self, name: str) -> dict:
+        loader = model_manager.loaders[name]
+        info = {"ready": loader.ready, **loader.status()}
+        if name == "whisper":
+            info.update(model_name=whisper_service.model_name, two_tier=whisper_service.two_tier, error=whisper_service.error)
+        elif name == "sentiment":
+            info.update(model_name=sentiment_service.model_name, error=sentiment_service.error)
+        elif name == "embedding":
+            info.update(model_name=embedding_service.MODEL_NAME, error=embedding_service.error)
+        return info
+
+    async def _dispatch(self, meta: dict, blob: bytes) -> tuple[dict, bytes]:
+        op = meta.get("op")
+        if op == "load":
+            name = meta.get("model")
+            if name not in SERVED_MODELS:
+                return {"error": f"unknown model {name!r}"}, b""
+            await model_manager.loaders[name].ensure()
+            return self._model_info(name), b""
+        if op == "asr":
+            if not await whisper_service.loader.ensure():
+                return {"error": whisper_service.error or "whisper unavailable"}, b""
+            audio = np.frombuffer(blob, dtype=np.float32)
+            result = await whisper_service.decode(audio, partial=bool(meta.get("partial")), **(meta.get("options") or {}))
+            return {"result": result}, b""
+        if op == "sentiment":
+            # Each text joins the shared sentiment queue, so texts from different workers share batches
+            results = await asyncio.gather(*(sentiment_service.analyze(text) for text in meta.get("texts") or []))
+            return {"results": list(results)}, b""
+        if op == "embed":
+            if not await embedding_service.loader.ensure():
+                return {"error": embedding_service.error or "embedding model unavailable"}, b""
+            vectors = await self.embedder.embed(meta.get("texts") or [])
+            return {"shape": list(vectors.shape)}, memoryview(np.ascontiguousarray(vectors)).cast("B")
+        if op == "stats":
+            return self.get_stats(), b""
+        return {"error": f"unknown op {op!r}"}, b""
+
+    async def _handle_request(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, request_id: int, meta: dict, blob: bytes) -> None:
+        try:
+            response, payload = await self._dispatch(meta, blob)
+        except Exception as exc:
+            logger.error("model_server_request_failed", op=meta.get("op"), error=str(exc))
+            response, payload = {"error": str(exc)}, b""
+        try:
+            async with lock:
+                await write_message(writer, request_id, response, payload)
+        except ConnectionError:
+            pass
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                request_id, meta, blob = await read_message(reader)
+                # Requests on one connection run concurrently; responses go out as they complete
+                task = asyncio.create_task(self._handle_request(writer, lock, request_id, meta, blob))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as exc:
+            logger.warning("model_server_bad_frame", error=str(exc))
+        finally:
+            self.connections -= 1
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "models": {name: self._model_info(name) for name in SERVED_MODELS},
+            "whisper_scheduler": whisper_service.get_execution_stats(),
+            "sentiment_batching": sentiment_service.get_stats(),
+            "embedding_batching": self.embedder.stats,
+            "registry": model_registry.get_stats(),
+        }
+
+    async def serve(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+        os.chmod(self.path, 0o660)
+        logger.info("model_server_listening", path=self.path, models=list(SERVED_MODELS))
+
+        model_registry.start_reaper()
+        if settings.MODEL_LOAD_MODE != "lazy":
+            asyncio.create_task(model_manager.load_models(list(SERVED_MODELS)))
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        async with server:
+            await stop.wait()
+        whisper_service.shutdown()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        logger.info("model_server_stopped")
+
+
+def main() -> None:
+    configure_logging()
+    asyncio.run(ModelServer().serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("models.onnx_backend")
+
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except Exception:  # pragma: no cover
+    ort = None
+    ORTModelForFeatureExtraction = None
+    ORTModelForSequenceClassification = None
+    ORTQuantizer = None
+    AutoQuantizationConfig = None
+    AutoTokenizer = None
+
+PROVIDER = "CPUExecutionProvider"
+
+
+def onnx_available() -> bool:
+    return ort is not None
+
+
+def use_onnx() -> bool:
+    return (settings.TEXT_MODEL_BACKEND or "torch").lower() == "onnx"
+
+
+def _session_options():
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS or os.cpu_count() or 1
+    options.inter_op_num_threads = 1
+    return options
+
+
+def _cache_dir(model_name: str, precision: str) -> Path:
+    return Path(settings.ONNX_CACHE_DIR) / f"{model_name.replace('/', '--')}-{precision}"
+
+
+def _export(model_cls, model_name: str, target: Path) -> None:
+    logger.info("onnx_export_start", model=model_name, target=str(target))
+    model = model_cls.from_pretrained(model_name, export=True, token=settings.HUGGINGFACE_TOKEN or None)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=settings.HUGGINGFACE_TOKEN or None)
+    model.save_pretrained(target)
+    tokenizer.save_pretrained(target)
+
+
+def _quantize(source: Path, target: Path) -> None:
+    # Dynamic int8 on the exported graph; the ONNX counterpart of MODEL_PRECISION=int8 for torch models
+    quantizer = ORTQuantizer.from_pretrained(source)
+    quantizer.quantize(save_dir=target, quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+    AutoTokenizer.from_pretrained(source).save_pretrained(target)
+
+
+def load_ort_model(model_cls, model_name: str, precision: str = "fp32"):
+    """ONNX Runtime model and tokenizer, exporting (and quantizing) on first use.
+
+    Exports are cached under ONNX_CACHE_DIR so later starts only build the inference session.
+    """
+    if ort is None:
+        raise RuntimeError("optimum[onnxruntime] is not installed")
+    fp32_dir = _cache_dir(model_name, "fp32")
+    if not any(fp32_dir.glob("*.onnx")):
+        _export(model_cls, model_name, fp32_dir)
+    model_dir = fp32_dir
+    if precision == "int8":
+        model_dir = _cache_dir(model_name, "int8")
+        if not any(model_dir.glob("*.onnx")):
+            _quantize(fp32_dir, model_dir)
+    file_name = next(model_dir.glob("*.onnx")).name
+    model = model_cls.from_pretrained(model_dir, file_name=file_name, provider=PROVIDER, session_options=_session_options())
+    return model, AutoTokenizer.from_pretrained(model_dir)
+
+
+def load_sequence_classifier(model_name: str, precision: str = "fp32"):
+    return load_ort_model(ORTModelForSequenceClassification, model_name, precision)
+
+
+def onnx_size_mb(model) -> float:
+    path = getattr(model, "model_path", None)
+    if not path or not Path(path).exists():
+        return 0.0
+    return round(Path(path).stat().st_size / (1024 * 1024), 1)
+
+
+class OnnxSentenceEncoder:
+    """The slice of SentenceTransformer.encode that EmbeddingService uses, on ONNX Runtime.
+
+    Mean pooling over the attention mask, as in the all-MiniLM sentence-transformers config.
+    """
+
+    def __init__(self, model_name: str, precision: str = "fp32", max_length: int = 256):
+        self.model, self.tokenizer = load_ort_model(ORTModelForFeatureExtraction, f"sentence-transformers/{model_name}", precision)
+        self.max_length = max_length
+
+    def encode(self, sentences: str | list[str], normalize_embeddings: bool = False, batch_size: int = 32) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out: list[np.ndarray] = []
+        for i in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[i : i + batch_size], padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            hidden = hidden.numpy() if hasattr(hidden, "numpy") else np.asarray(hidden)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out.append(pooled.astype(np.float32))
+        embeddings = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
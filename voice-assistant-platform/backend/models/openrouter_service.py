@@ -1,3 +1,6 @@
+import json
+from collections.abc import AsyncGenerator
+
 import httpx
 
 from config import settings
@@ -56,17 +59,9 @@ class OpenRouterService:
             return "I'm having trouble processing that right now. Please try again."
 
         messages = self._build_messages(transcript, session_history, system_prompt)
-        
-        # Define a prioritized list of models to ensure we get a response.
-        models_to_try = [
-            self.model_name, # google/gemini-2.0-flash-exp:free
-            "meta-llama/llama-3.1-8b-instruct:free",
-            "google/gemini-2.0-flash-lite:free",
-            "mistralai/mistral-7b-instruct:free"
-        ]
 
         async with httpx.AsyncClient(timeout=60) as client:
-            for model in models_to_try:
+            for model in self._models_to_try():
                 try:
                     payload = {"model": model, "messages": messages}
                     logger.info("openrouter_attempt", model=model)
@@ -95,6 +90,69 @@ class OpenRouterService:
 
         return "I'm having trouble processing that right now. Please try again."
 
+    async def chat_stream(
+        self,
+        transcript: str,
+        session_history: list[dict],
+        system_prompt: str = SYSTEM_PROMPT,
+    ) -> AsyncGenerator[str, None]:
+        """Yield response tokens as OpenRouter streams them (SSE).
+
+        Falls through the same model chain as chat() until one model produces a token;
+        once tokens have been yielded the stream is committed to that model.
+        """
+        if not await self.check_availability():
+            yield "I'm having trouble processing that right now. Please try again."
+            return
+
+        messages = self._build_messages(transcript, session_history, system_prompt)
+
+        async with httpx.AsyncClient(timeout=60) as client:
+            for model in self._models_to_try():
+                yielded = False
+                try:
+                    payload = {"model": model, "messages": messages, "stream": True}
+                    logger.info("openrouter_stream_attempt", model=model)
+                    async with client.stream("POST", f"{self.base_url}/chat/completions", headers=self._headers(), json=payload) as r:
+                        if r.status_code != 200:
+                            body = (await r.aread()).decode(errors="replace")
+                            logger.error("openrouter_model_failed", model=model, status_code=r.status_code, response_text=body)
+                            continue
+                        async for line in r.aiter_lines():
+                            # SSE: "data: {...}" lines, ": comment" keep-alives, "data: [DONE]" terminator
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            try:
+                                chunk = json.loads(data)
+                            except json.JSONDecodeError:
+                                continue
+                            content = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+                            if content:
+                                yielded = True
+                                yield content
+                    if yielded:
+                        logger.info("openrouter_success", model=model, streamed=True)
+                        return
+                except Exception as e:
+                    logger.error("openrouter_request_exception", model=model, error=str(e), streamed=True)
+                    if yielded:
+                        # Part of the answer is already with the client; don't splice in another model's
+                        return
+
+        yield "I'm having trouble processing that right now. Please try again."
+
+    def _models_to_try(self) -> list[str]:
+        # Define a prioritized list of models to ensure we get a response.
+        return [
+            self.model_name, # google/gemini-2.0-flash-exp:free
+            "meta-llama/llama-3.1-8b-instruct:free",
+            "google/gemini-2.0-flash-lite:free",
+            "mistralai/mistral-7b-instruct:free"
+        ]
+
     def _build_messages(self, transcript: str, session_history: list[dict], system_prompt: str) -> list[dict]:
         normalized: list[dict] = []
         for m in (session_history or [])[-10:]:
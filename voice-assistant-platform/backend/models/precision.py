@@ -0,0 +1,58 @@
+import resource
+import sys
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("models.precision")
+
+try:
+    import torch
+except Exception:  # pragma: no cover
+    torch = None
+
+SUPPORTED_PRECISIONS = ("fp32", "int8")
+
+
+def model_precision() -> str:
+    precision = (settings.MODEL_PRECISION or "fp32").lower()
+    if precision not in SUPPORTED_PRECISIONS:
+        logger.warning("model_precision_unsupported", precision=precision, using="fp32")
+        return "fp32"
+    return precision
+
+
+def quantize_module(module, precision: str | None = None):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations quantized per batch).
+
+    CPU only; returns the module unchanged for fp32, on GPU, or when torch is unavailable.
+    """
+    precision = precision or model_precision()
+    if precision != "int8" or torch is None or module is None:
+        return module
+    device = next((p.device for p in module.parameters()), None)
+    if device is not None and device.type != "cpu":
+        return module
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def module_size_mb(module) -> float:
+    """Bytes held by a module's state dict, including packed int8 weights that parameters() skips."""
+    if torch is None or module is None:
+        return 0.0
+
+    def tensor_bytes(value) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.element_size() * value.nelement()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(v) for v in value)
+        return 0
+
+    return round(sum(tensor_bytes(v) for v in module.state_dict().values()) / (1024 * 1024), 1)
+
+
+def process_rss_mb() -> float:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
@@ -2,6 +2,11 @@ import asyncio
 import time
 
 from config import settings
+from models.model_client import model_client, remote_models
+from models.model_executor import ModelExecutor
+from models.model_loader import ModelLoader
+from models.onnx_backend import load_sequence_classifier, onnx_available, onnx_size_mb, use_onnx
+from models.precision import model_precision, module_size_mb, quantize_module
 from utils.logger import get_logger
 
 logger = get_logger("models.sentiment")
@@ -21,20 +26,51 @@ class SentimentService:
         self.model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
         self.load_time_ms = 0
         self.error: str | None = None
+        self.precision = model_precision()
+        self.backend = "onnx" if use_onnx() else "torch"
+        self.memory_mb = 0.0
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = {"requests": 0, "batches": 0, "max_batch_size": 0, "rejected": 0}
+        self.executor = ModelExecutor("sentiment")
+        self.loader = ModelLoader(
+            "sentiment",
+            self.load_model,
+            lambda: self.available,
+            unload=self.unload,
+            memory_mb=lambda: self.memory_mb,
+            executor=self.executor,
+            is_busy=lambda: bool(self._queue and self._queue.qsize()),
+        )
 
     async def load_model(self) -> None:
+        if remote_models():
+            await self._connect_model_server()
+            return
         if pipeline is None:
             self.error = "transformers unavailable"
             return
+        if self.backend == "onnx" and not onnx_available():
+            logger.warning("sentiment_onnx_unavailable", fallback="torch")
+            self.backend = "torch"
         start = time.perf_counter()
         try:
-            self.pipeline = await asyncio.to_thread(
-                pipeline,
-                "text-classification",
-                model=self.model_name,
-                top_k=None,
-                token=settings.HUGGINGFACE_TOKEN or None,
-            )
+            if self.backend == "onnx":
+                # Same pipeline API on top of an ONNX Runtime session, so analyze/_analyze_many are unchanged
+                model, tokenizer = await asyncio.to_thread(load_sequence_classifier, self.model_name, self.precision)
+                self.pipeline = await asyncio.to_thread(pipeline, "text-classification", model=model, tokenizer=tokenizer, top_k=None)
+                self.memory_mb = onnx_size_mb(model)
+            else:
+                self.pipeline = await asyncio.to_thread(
+                    pipeline,
+                    "text-classification",
+                    model=self.model_name,
+                    top_k=None,
+                    token=settings.HUGGINGFACE_TOKEN or None,
+                )
+                self.pipeline.model = await asyncio.to_thread(quantize_module, self.pipeline.model, self.precision)
+                self.memory_mb = module_size_mb(self.pipeline.model)
             self.available = True
             self.error = None
             self.load_time_ms = int((time.perf_counter() - start) * 1000)
@@ -42,38 +78,138 @@ class SentimentService:
             self.available = False
             self.error = str(exc)
 
-    def analyze(self, text: str) -> dict:
-        fallback = {
+    async def _connect_model_server(self) -> None:
+        start = time.perf_counter()
+        try:
+            info = await model_client.load("sentiment")
+        except Exception as exc:
+            self.available = False
+            self.error = f"model server: {exc}"
+            return
+        self.available = bool(info.get("ready"))
+        self.error = info.get("error")
+        self.backend = "model_server"
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+
+    async def _analyze_remote(self, texts: list[str]) -> list[dict]:
+        # The server's own batch worker coalesces these with requests from every other API worker
+        try:
+            return await model_client.analyze([(t or "")[:512] for t in texts])
+        except Exception as exc:
+            logger.warning("sentiment_model_server_failed", error=str(exc))
+            return [{**self.fallback_result(), "error": str(exc)} for _ in texts]
+
+    def unload(self) -> None:
+        self.pipeline = None
+        self.available = False
+        self.memory_mb = 0.0
+
+    def fallback_result(self) -> dict:
+        return {
             "sentiment": "neutral",
             "sentiment_score": 0.5,
             "label_scores": {"positive": 0.33, "neutral": 0.34, "negative": 0.33},
         }
+
+    async def analyze(self, text: str) -> dict:
+        """Score one text. Concurrent calls are coalesced into padded batches by a shared worker."""
+        if not self.available:
+            await self.loader.ensure()
+        if remote_models() and self.available:
+            return (await self._analyze_remote([text]))[0]
         if not self.available or self.pipeline is None:
-            return {**fallback, "error": "sentiment model unavailable"}
+            return {**self.fallback_result(), "error": "sentiment model unavailable"}
 
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
         try:
-            clean_text = (text or "")[:512]
-            raw = self.pipeline(clean_text)
-            # pipeline(top_k=None) returns [ [..scores..] ]
-            if raw and isinstance(raw[0], list):
-                scores_raw = raw[0]
-            else:
-                scores_raw = raw
-
-            label_scores = {"positive": 0.0, "neutral": 0.0, "negative": 0.0}
-            for row in scores_raw:
-                label = self.LABEL_MAP.get(str(row.get("label", "")).lower(), str(row.get("label", "")).lower())
-                if label in label_scores:
-                    label_scores[label] = float(row.get("score", 0.0))
-
-            winner = max(label_scores, key=label_scores.get)
-            return {
-                "sentiment": winner,
-                "sentiment_score": float(label_scores[winner]),
-                "label_scores": label_scores,
-            }
+            self._queue.put_nowait(((text or "")[:512], future))
+        except asyncio.QueueFull:
+            # Shed load instead of queueing behind a backlog the caller will not wait for
+            self.stats["rejected"] += 1
+            return {**self.fallback_result(), "error": "sentiment queue full"}
+        return await future
+
+    async def analyze_batch(self, texts: list[str]) -> list[dict]:
+        """Bulk scoring for backfills; bypasses the request queue."""
+        if not self.available:
+            await self.loader.ensure()
+        if remote_models() and self.available:
+            return await self._analyze_remote(texts)
+        if not self.available or self.pipeline is None:
+            return [{**self.fallback_result(), "error": "sentiment model unavailable"} for _ in texts]
+        results: list[dict] = []
+        size = max(settings.SENTIMENT_BATCH_MAX_SIZE, 1)
+        for i in range(0, len(texts), size):
+            batch = [(t or "")[:512] for t in texts[i : i + size]]
+            results.extend(await self.executor.run(self._analyze_many, batch))
+        return results
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=settings.SENTIMENT_QUEUE_SIZE)
+            self._worker = loop.create_task(self._batch_worker())
+
+    async def _batch_worker(self) -> None:
+        wait_s = settings.SENTIMENT_BATCH_WAIT_MS / 1000
+        max_size = max(settings.SENTIMENT_BATCH_MAX_SIZE, 1)
+        while True:
+            batch = [await self._queue.get()]
+            # Collect whatever else arrives within the batching window
+            deadline = time.perf_counter() + wait_s
+            while len(batch) < max_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                results = await self.executor.run(self._analyze_many, texts)
+            except Exception as exc:
+                results = [{**self.fallback_result(), "error": str(exc)} for _ in texts]
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _analyze_many(self, texts: list[str]) -> list[dict]:
+        try:
+            raw = self.pipeline(texts, batch_size=len(texts), truncation=True)
         except Exception as exc:
-            return {**fallback, "error": str(exc)}
+            return [{**self.fallback_result(), "error": str(exc)} for _ in texts]
+        return [self._parse_scores(row) for row in raw]
+
+    def _parse_scores(self, scores_raw: list[dict]) -> dict:
+        # pipeline(top_k=None) returns one list of {label, score} per input text
+        if scores_raw and isinstance(scores_raw[0], list):
+            scores_raw = scores_raw[0]
+        label_scores = {"positive": 0.0, "neutral": 0.0, "negative": 0.0}
+        for row in scores_raw:
+            label = self.LABEL_MAP.get(str(row.get("label", "")).lower(), str(row.get("label", "")).lower())
+            if label in label_scores:
+                label_scores[label] = float(row.get("score", 0.0))
 
+        winner = max(label_scores, key=label_scores.get)
+        return {
+            "sentiment": winner,
+            "sentiment_score": float(label_scores[winner]),
+            "label_scores": label_scores,
+        }
+
+    def get_stats(self) -> dict:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": round(requests / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+        }
 
 sentiment_service = SentimentService()
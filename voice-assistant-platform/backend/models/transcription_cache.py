@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("models.transcription_cache")
+
+
+def audio_key(audio: bytes | memoryview, model_name: str, variant: str = "") -> str:
+    """Content hash of the PCM bytes, scoped to the model (and decode variant) that produced the text."""
+    digest = hashlib.blake2b(audio, digest_size=16)
+    digest.update(f"\0{model_name}\0{variant}".encode())
+    return digest.hexdigest()
+
+
+class DiskStore:
+    """SQLite store shared by every worker on the host (WAL mode, one short transaction per call)."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS transcriptions (key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS transcriptions_created ON transcriptions (created)")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=5.0)
+        return db
+
+    def get(self, key: str) -> dict | None:
+        row = self._connect().execute("SELECT result FROM transcriptions WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: dict) -> None:
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO transcriptions VALUES (?, ?, ?)", (key, json.dumps(result), time.time()))
+            if self.max_entries > 0:
+                db.execute(
+                    "DELETE FROM transcriptions WHERE created < "
+                    "(SELECT created FROM transcriptions ORDER BY created DESC LIMIT 1 OFFSET ?)",
+                    (self.max_entries - 1,),
+                )
+
+
+class TranscriptionCache:
+    """LRU of final transcription results keyed by audio content hash.
+
+    Bounded by the approximate size of the cached results (TRANSCRIPTION_CACHE_MAX_MB).
+    With TRANSCRIPTION_CACHE_PATH set, results are also written to a local SQLite file
+    so retries that land on another worker (or after a restart) still hit.
+    """
+
+    def __init__(self, max_bytes: int | None = None, path: str | None = None):
+        self.max_bytes = int(settings.TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self.bytes = 0
+        self.disk: DiskStore | None = None
+        path = settings.TRANSCRIPTION_CACHE_PATH if path is None else path
+        if path and self.enabled:
+            try:
+                self.disk = DiskStore(path, settings.TRANSCRIPTION_CACHE_DISK_MAX_ENTRIES)
+            except Exception as exc:
+                logger.warning("transcription_cache_disk_unavailable", path=path, error=str(exc))
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return dict(entry[0])
+        if self.disk is not None:
+            try:
+                result = await asyncio.to_thread(self.disk.get, key)
+            except Exception as exc:
+                self.stats["disk_errors"] += 1
+                logger.warning("transcription_cache_disk_read_failed", error=str(exc))
+                result = None
+            if result is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, result)
+                return dict(result)
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, result: dict) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, result)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, key, result)
+            except Exception as exc:
+                self.stats["disk_errors"] += 1
+                logger.warning("transcription_cache_disk_write_failed", error=str(exc))
+
+    def _remember(self, key: str, result: dict) -> None:
+        size = len(key) + len(json.dumps(result))
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self._entries[key] = (dict(result), size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "disk": self.disk.path if self.disk is not None else None,
+            "hit_rate": round((self.stats["hits"] + self.stats["disk_hits"]) / lookups, 3) if lookups else 0.0,
+            **self.stats,
+        }
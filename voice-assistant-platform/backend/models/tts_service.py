@@ -4,13 +4,14 @@ import os
 import re
 import time
 import wave
-import tempfile
+from collections.abc import AsyncIterator
 from pathlib import Path
 from uuid import uuid4
 
 import numpy as np
 import edge_tts
 from config import settings
+from models.model_loader import ModelLoader
 from utils.logger import get_logger
 
 logger = get_logger("models.tts")
@@ -23,34 +24,86 @@ class TTSService:
         self.voice = "en-US-AvaNeural"
         self.load_time_ms = 0
         self.error = None
+        self.loader = ModelLoader("tts", self.load_model, lambda: self.available)
 
     async def load_model(self) -> None:
         self.available = True
         logger.info("edge_tts_initialized", voice=self.voice)
 
+    MAX_CHARS = 500
+
+    def _clean(self, text: str) -> str:
+        return re.sub(r"\*\*|\*|_|#", "", (text or "")).replace("\n", " ").strip()
+
+    async def _stream_audio(self, text: str) -> AsyncIterator[bytes]:
+        # edge-tts streams MP3 frames over its websocket; keep them in memory instead of a temp file
+        communicate = edge_tts.Communicate(text, self.voice)
+        async for chunk in communicate.stream():
+            if chunk.get("type") == "audio" and chunk.get("data"):
+                yield chunk["data"]
+
     async def synthesize(self, text: str) -> bytes:
-        processed = re.sub(r"\*\*|\*|_|#", "", (text or "")).replace("\n", " ").strip()[:500]
+        processed = self._clean(text)[: self.MAX_CHARS]
         if not processed:
             return self._generate_silent_wav(0.5)
 
         try:
-            communicate = edge_tts.Communicate(processed, self.voice)
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-                temp_path = tmp.name
-
-            await communicate.save(temp_path)
-
-            with open(temp_path, "rb") as f:
-                audio_bytes = f.read()
-
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-            return audio_bytes
+            audio = bytearray()
+            async for chunk in self._stream_audio(processed):
+                audio += chunk
+            return bytes(audio)
         except Exception as exc:
             logger.error("tts_synthesis_failed", error=str(exc))
             return self._generate_silent_wav(0.5)
 
+    async def synthesize_stream(self, sentences: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """Synthesize sentences as they arrive and yield audio in sentence order.
+
+        Up to TTS_STREAM_CONCURRENCY sentences are synthesized at once. The head sentence's
+        audio is yielded as edge-tts produces it; later sentences buffer until their turn.
+        """
+        semaphore = asyncio.Semaphore(max(settings.TTS_STREAM_CONCURRENCY, 1))
+        ordered: asyncio.Queue = asyncio.Queue()
+        tasks: list[asyncio.Task] = []
+
+        async def produce(sentence: str, out: asyncio.Queue):
+            async with semaphore:
+                try:
+                    async for chunk in self._stream_audio(sentence):
+                        await out.put(chunk)
+                except Exception as exc:
+                    logger.error("tts_sentence_failed", error=str(exc), chars=len(sentence))
+                finally:
+                    await out.put(None)
+
+        async def feed():
+            budget = self.MAX_CHARS
+            try:
+                async for sentence in sentences:
+                    processed = self._clean(sentence)[:budget]
+                    if not processed:
+                        continue
+                    budget -= len(processed)
+                    out: asyncio.Queue = asyncio.Queue()
+                    tasks.append(asyncio.create_task(produce(processed, out)))
+                    await ordered.put(out)
+                    if budget <= 0:
+                        break
+            finally:
+                await ordered.put(None)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while (out := await ordered.get()) is not None:
+                while (chunk := await out.get()) is not None:
+                    yield chunk
+            # A failed sentence source ends the queue like a finished one; re-raise so the reply is not cut short silently
+            await feeder
+        finally:
+            feeder.cancel()
+            for task in tasks:
+                task.cancel()
+
     async def synthesize_to_file(self, text: str) -> str:
         data = await self.synthesize(text)
         os.makedirs(settings.AUDIO_STORAGE_PATH, exist_ok=True)
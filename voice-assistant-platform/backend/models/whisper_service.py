@@ -2,12 +2,23 @@ import asyncio
 import os
 import tempfile
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable
 from typing import Any
 
 import numpy as np
 
 from config import settings
+from models.asr_process_pool import ASRProcessPool, pipeline_kwargs
+from models.model_client import model_client, remote_models
+from models.model_executor import ModelExecutor
+from models.model_loader import ModelLoader
+from models.asr_scheduler import PRIORITY_FINAL, PRIORITY_PARTIAL, ASRScheduler
+from models.precision import model_precision, module_size_mb, quantize_module
+from models.transcription_cache import TranscriptionCache, audio_key
+from utils.audio_buffer import AudioBuffer
 from utils.logger import get_logger
+from utils.vad import speech_bounds, split_on_silence
 
 logger = get_logger("models.whisper")
 
@@ -24,9 +35,35 @@ except Exception:  # pragma: no cover
     AudioSegment = None
 
 
+class StreamState:
+    """Per-session streaming transcription state: committed text plus the byte offset it covers."""
+
+    def __init__(self):
+        self.committed: list[str] = []
+        self.committed_bytes = 0
+        self.tail_text = ""
+        self.last_decode_ts = 0.0
+        # Committed segments with timestamps relative to the start of the utterance
+        self.segments: list[dict] = []
+
+    @property
+    def text(self) -> str:
+        return " ".join(t for t in [*self.committed, self.tail_text] if t)
+
+
+class SessionContext:
+    """Decode context that outlives a single utterance: the session's language and its last final transcript."""
+
+    def __init__(self):
+        self.language: str | None = None
+        self.language_source: str | None = None  # "client" or "detected"
+        self.last_text = ""
+
+
 class WhisperService:
     SILENCE_THRESHOLD = 0.01
     SAMPLE_RATE = 16000
+    MAX_SESSIONS = 10000
 
     def __init__(self):
         self.pipe = None
@@ -34,35 +71,301 @@ class WhisperService:
         self.model_name = "openai/whisper-base"
         self.load_time_ms = 0
         self.error: str | None = None
-        self._stream_buffers: dict[str, bytes] = {}
-        self._silence_seconds: dict[str, float] = {}
+        self.precision = model_precision()
+        self.memory_mb = 0.0
+        self._streams: dict[str, StreamState] = {}
+        self._sessions: OrderedDict[str, SessionContext] = OrderedDict()
+        self.cache = TranscriptionCache()
+        self.execution_mode = settings.ASR_EXECUTION_MODE
+        self.process_pool: ASRProcessPool | None = None
+        self.executor = ModelExecutor("whisper")
+        self.scheduler = self._make_scheduler("whisper", settings.ASR_CONCURRENCY, self.executor)
+        self._bind_in_process()
+
+        # Live partials / intent detection tier; falls back to the final model when unset or unavailable
+        self.partial_model_name = settings.WHISPER_PARTIAL_MODEL or None
+        self.partial_pipe = None
+        self.partial_load_time_ms = 0
+        self.partial_memory_mb = 0.0
+        self.partial_error: str | None = None
+        self._remote_two_tier = False
+        self.partial_executor = ModelExecutor("whisper_partial")
+        self.partial_scheduler = self._make_scheduler("whisper_partial", settings.ASR_PARTIAL_CONCURRENCY, self.partial_executor)
+        self.partial_scheduler.bind(lambda audios, options: self._run_pipeline(self.partial_pipe, audios, options))
+
+        self.loader = ModelLoader(
+            "whisper",
+            self.load_model,
+            lambda: self.ready,
+            unload=self.unload,
+            memory_mb=lambda: self.memory_mb + self.partial_memory_mb,
+            executor=self.executor,
+            is_busy=lambda: bool(self.scheduler.get_stats()["queue_depth"] or self.scheduler.in_flight),
+            # Process-pool batches bypass the executor, so the schedulers record use themselves
+            last_used=lambda: max(self.scheduler.last_used, self.partial_scheduler.last_used),
+        )
+
+    def _bind_in_process(self) -> None:
+        self.scheduler.executor = self.executor
+        self.scheduler.bind(lambda audios, options: self._run_pipeline(self.pipe, audios, options))
+
+    def _make_scheduler(self, name: str, concurrency: int, executor: ModelExecutor) -> ASRScheduler:
+        return ASRScheduler(
+            name,
+            max_batch_size=settings.ASR_BATCH_MAX_SIZE,
+            max_wait_ms=settings.ASR_BATCH_WAIT_MS,
+            bucket_seconds=settings.ASR_BUCKET_SECONDS,
+            partial_max_age_ms=settings.ASR_PARTIAL_MAX_AGE_MS,
+            concurrency=concurrency,
+            sample_rate=self.SAMPLE_RATE,
+            executor=executor,
+        )
 
     async def load_model(self) -> None:
-        if pipeline is None:
+        if remote_models():
+            await self._connect_model_server()
+            return
+        if self.execution_mode == "process":
+            await self._load_process_pool()
+        elif pipeline is None:
             self.error = "transformers pipeline unavailable"
             return
+        else:
+            start = time.perf_counter()
+            try:
+                self.pipe = await self._load_pipeline(self.model_name, self.precision)
+                self.memory_mb = module_size_mb(self.pipe.model)
+                self.available = True
+                self.error = None
+                self.load_time_ms = int((time.perf_counter() - start) * 1000)
+                logger.info(
+                    "whisper_pipeline_loaded",
+                    model=self.model_name,
+                    precision=self.precision,
+                    memory_mb=self.memory_mb,
+                    load_time_ms=self.load_time_ms,
+                )
+            except Exception as exc:
+                self.error = str(exc)
+                self.available = False
+                logger.error("whisper_load_failed", error=str(exc))
+
+        if self.available and self.partial_model_name and self.partial_model_name != self.model_name:
+            await self._load_partial_model()
+
+    async def _connect_model_server(self) -> None:
         start = time.perf_counter()
         try:
-            # Using transformers pipeline which can handle raw numpy arrays 
-            # and doesn't strictly depend on system-wide ffmpeg for raw inference.
-            device = "cuda" if torch and torch.cuda.is_available() else "cpu"
-            self.pipe = await asyncio.to_thread(
-                pipeline,
-                "automatic-speech-recognition",
-                model=self.model_name,
-                device=device
-            )
-            self.available = True
-            self.error = None
-            self.load_time_ms = int((time.perf_counter() - start) * 1000)
-            logger.info("whisper_pipeline_loaded", model=self.model_name, device=device, load_time_ms=self.load_time_ms)
+            info = await model_client.load("whisper")
+        except Exception as exc:
+            self.available = False
+            self.error = f"model server: {exc}"
+            logger.error("whisper_load_failed", error=self.error, execution_mode="model_server")
+            return
+        self.available = bool(info.get("ready"))
+        self.error = info.get("error")
+        self.model_name = info.get("model_name", self.model_name)
+        self._remote_two_tier = bool(info.get("two_tier"))
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+
+    async def _load_pipeline(self, model_name: str, precision: str):
+        # Using transformers pipeline which can handle raw numpy arrays
+        # and doesn't strictly depend on system-wide ffmpeg for raw inference.
+        device = "cuda" if torch and torch.cuda.is_available() else "cpu"
+        pipe = await asyncio.to_thread(
+            pipeline,
+            "automatic-speech-recognition",
+            model=model_name,
+            device=device
+        )
+        pipe.model = await asyncio.to_thread(quantize_module, pipe.model, precision)
+        return pipe
+
+    async def _load_partial_model(self) -> None:
+        if pipeline is None:
+            self.partial_error = "transformers pipeline unavailable"
+            return
+        start = time.perf_counter()
+        try:
+            precision = "int8" if settings.WHISPER_PARTIAL_QUANTIZE else self.precision
+            self.partial_pipe = await self._load_pipeline(self.partial_model_name, precision)
+            self.partial_memory_mb = module_size_mb(self.partial_pipe.model)
+            self.partial_error = None
+            self.partial_load_time_ms = int((time.perf_counter() - start) * 1000)
+            logger.info("whisper_partial_pipeline_loaded", model=self.partial_model_name, load_time_ms=self.partial_load_time_ms)
         except Exception as exc:
+            self.partial_pipe = None
+            self.partial_error = str(exc)
+            logger.warning("whisper_partial_load_failed", model=self.partial_model_name, error=str(exc))
+
+    async def _load_process_pool(self) -> None:
+        start = time.perf_counter()
+        pool = ASRProcessPool(self.model_name, settings.ASR_WORKERS, self.precision)
+        try:
+            await asyncio.to_thread(pool.start)
+        except Exception as exc:
+            pool.shutdown()
             self.error = str(exc)
             self.available = False
-            logger.error("whisper_load_failed", error=str(exc))
+            logger.error("whisper_load_failed", error=str(exc), execution_mode="process")
+            return
+        self.process_pool = pool
+        # Keep every worker busy: the scheduler needs at least one batch in flight per process
+        self.scheduler.concurrency = max(self.scheduler.concurrency, pool.workers)
+        # Scheduler threads only wait on worker processes here, so they stay off the bounded in-process executor
+        self.scheduler.executor = None
+        self.scheduler.bind(pool.run_batch)
+        self.available = True
+        self.error = None
+        self.load_time_ms = int((time.perf_counter() - start) * 1000)
+        logger.info("whisper_pipeline_loaded", model=self.model_name, execution_mode="process", workers=pool.workers, load_time_ms=self.load_time_ms)
+
+    @property
+    def ready(self) -> bool:
+        if remote_models():
+            return self.available
+        return self.available and (self.pipe is not None or self.process_pool is not None)
+
+    @property
+    def two_tier(self) -> bool:
+        if remote_models():
+            return self._remote_two_tier
+        return self.partial_pipe is not None
 
-    async def transcribe(self, audio_bytes: bytes) -> dict[str, Any]:
-        if not self.available or self.pipe is None:
+    async def decode(self, audio: np.ndarray, partial: bool = False, **options: Any) -> dict | None:
+        """One pipeline decode of float32 PCM, batched with concurrent requests.
+
+        Partials go to the fast tier when one is loaded and may come back None when dropped as stale.
+        In model-server client mode the decode runs in the server process instead.
+        """
+        if remote_models():
+            return await model_client.decode(audio, partial, options)
+        if not partial:
+            return await self.scheduler.submit(audio, PRIORITY_FINAL, **options)
+        scheduler = self.partial_scheduler if self.two_tier else self.scheduler
+        return await scheduler.submit(audio, PRIORITY_PARTIAL, **options)
+
+    def shutdown(self) -> None:
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
+
+    def unload(self) -> None:
+        """Release both pipelines (or the worker processes); the loader reloads them on next use."""
+        self.shutdown()
+        self.pipe = None
+        self.partial_pipe = None
+        self.available = False
+        self.memory_mb = 0.0
+        self.partial_memory_mb = 0.0
+        self._streams.clear()
+        self._bind_in_process()
+
+    def get_execution_stats(self) -> dict:
+        if remote_models():
+            return {"mode": "model_server", "model_server": model_client.get_stats()}
+        stats = {"mode": self.execution_mode, **self.scheduler.get_stats()}
+        if self.process_pool is not None:
+            stats["process_pool"] = self.process_pool.get_stats()
+        return stats
+
+    def get_cache_stats(self) -> dict:
+        return self.cache.get_stats()
+
+    def get_partial_status(self) -> dict:
+        return {
+            "available": self.two_tier,
+            "model_name": self.partial_model_name if self.two_tier else self.model_name,
+            "load_time_ms": self.partial_load_time_ms,
+            "error": self.partial_error,
+            "scheduler": self.partial_scheduler.get_stats() if self.partial_pipe is not None else None,
+            "executor": self.partial_executor.get_stats() if self.partial_pipe is not None else None,
+        }
+
+    @property
+    def multilingual(self) -> bool:
+        # English-only checkpoints reject a language argument
+        return not any((name or "").endswith(".en") for name in (self.model_name, self.partial_model_name))
+
+    def _session(self, session_id: str | None) -> SessionContext | None:
+        if session_id is None:
+            return None
+        context = self._sessions.get(session_id)
+        if context is None:
+            context = self._sessions[session_id] = SessionContext()
+            if len(self._sessions) > self.MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return context
+
+    def set_session_language(self, session_id: str, language: str | None) -> None:
+        """Pin the language a client announced; None or "auto" goes back to detecting it once."""
+        context = self._session(session_id)
+        language = (language or "").strip().lower()
+        if language in ("", "auto"):
+            context.language = context.language_source = None
+        else:
+            context.language, context.language_source = language, "client"
+
+    def _decode_options(self, context: SessionContext | None, prompt: str = "") -> dict:
+        """Per-session language and prompt options; requests without a session keep auto-detection."""
+        if context is None:
+            return {}
+        options: dict[str, Any] = {}
+        if self.multilingual:
+            if context.language:
+                options["language"] = context.language
+            else:
+                # First decode of the session: have the pipeline report what it detected so it can be pinned
+                options.update(return_timestamps=True, return_language=True)
+        if settings.WHISPER_PROMPT_PREVIOUS and prompt:
+            # Keep whole words from the end; Whisper only attends to the last ~224 prompt tokens anyway
+            tail = prompt[-settings.WHISPER_PROMPT_MAX_CHARS :]
+            options["prompt"] = tail if len(prompt) <= settings.WHISPER_PROMPT_MAX_CHARS else tail.partition(" ")[2]
+        return options
+
+    def _pin_detected_language(self, session_id: str | None, context: SessionContext | None, result: dict) -> None:
+        if context is None or context.language:
+            return
+        language = result.get("language") or next((c["language"] for c in result.get("chunks") or [] if c.get("language")), None)
+        if language and language != "unknown":
+            context.language, context.language_source = language, "detected"
+            logger.info("whisper_language_pinned", session_id=session_id, language=language)
+
+    @staticmethod
+    def _run_pipeline(pipe, audios: list[np.ndarray], options: dict) -> list[dict]:
+        options = pipeline_kwargs(pipe, options)
+        if len(audios) == 1:
+            return [pipe(audios[0], **options)]
+        return list(pipe(audios, batch_size=len(audios), **options))
+
+    async def transcribe(
+        self, audio_bytes: bytes, trim_silence: bool = True, session_id: str | None = None, prompt: str | None = None
+    ) -> dict[str, Any]:
+        """Final transcript of a clip.
+
+        With a session_id the session's language is detected on its first decode and pinned
+        for later ones, and (WHISPER_PROMPT_PREVIOUS) its previous transcript, or ``prompt``,
+        conditions the decoder.
+        """
+        context = self._session(session_id)
+        options = self._decode_options(context, context.last_text if prompt is None and context else prompt or "")
+        # Retries and replayed clips are answered from the content-hash cache without touching the model.
+        # The key covers everything that conditions the decode: a clip decoded with another session's
+        # pinned language or prompt must not answer this one.
+        variant = f"trim={trim_silence}\0language={options.get('language', '')}\0prompt={options.get('prompt', '')}"
+        cache_key = audio_key(audio_bytes, self.model_name, variant) if self.cache.enabled and audio_bytes else None
+        if cache_key is not None and (cached := await self.cache.get(cache_key)) is not None:
+            logger.info("whisper_transcribe_cache_hit", bytes_len=len(audio_bytes))
+            self._pin_detected_language(session_id, context, cached)
+            if context is not None and cached.get("text"):
+                context.last_text = cached["text"]
+            return cached
+
+        if not self.ready:
+            await self.loader.ensure()
+        if not self.ready:
             logger.error("whisper_transcribe_aborted", reason="not_available")
             return {"text": "", "error": "Whisper unavailable", "duration_seconds": 0}
 
@@ -72,59 +375,227 @@ class WhisperService:
             # The frontend now sends raw 16kHz Int16 PCM data.
             # No need for pydub or ffmpeg decoding.
             
-            # Convert bytes to numpy int16, then normalize to float32 [-1, 1]
-            audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-            
-            if len(audio_np) == 0:
+            samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
+            if len(samples) == 0:
                 return {"text": "", "error": "Empty audio data", "duration_seconds": 0}
 
-            duration_seconds = len(audio_np) / self.SAMPLE_RATE
-            logger.info("whisper_audio_received", duration=duration_seconds, sample_count=len(audio_np))
+            duration_seconds = len(samples) / self.SAMPLE_RATE
+            offset = 0
+            if trim_silence:
+                # Leading/trailing silence costs decode time and invites hallucinated words
+                start, end = speech_bounds(samples, self.SILENCE_THRESHOLD, self.SAMPLE_RATE)
+                if start is None:
+                    logger.info("whisper_no_speech", duration=duration_seconds)
+                    return {"text": "", "error": "No speech detected", "duration_seconds": duration_seconds}
+                samples, offset = samples[start:end], start
+            logger.info("whisper_audio_received", duration=duration_seconds, sample_count=len(samples))
 
-            # Use transformers pipeline for transcription
-            result = await asyncio.to_thread(self.pipe, audio_np)
-            text = (result.get("text") or "").strip()
+            if len(samples) > settings.WHISPER_LONGFORM_WINDOW_SECONDS * self.SAMPLE_RATE:
+                segments = await self._decode_long(samples, offset, options, session_id, context)
+                text = " ".join(segment["text"] for segment in segments)
+            else:
+                # Normalize to float32 [-1, 1]
+                audio_np = samples.astype(np.float32) / 32768.0
+                # Finals jump ahead of queued streaming partials and share forward passes with other sessions
+                result = await self.decode(audio_np, **options)
+                self._pin_detected_language(session_id, context, result)
+                text = (result.get("text") or "").strip()
+                segments = self._segments(result, offset / self.SAMPLE_RATE, len(samples) / self.SAMPLE_RATE)
+            if context is not None and text:
+                context.last_text = text
             
             logger.info("whisper_transcribe_success", text_len=len(text), text_preview=text[:50])
 
-            return {
+            transcript = {
                 "text": text,
-                "language": "unknown",
-                "segments": [],
+                "language": context.language if context and context.language else "unknown",
+                "segments": segments,
                 "duration_seconds": duration_seconds,
                 "word_count": len(text.split()),
             }
+            if cache_key is not None:
+                await self.cache.put(cache_key, transcript)
+            return transcript
         except Exception as exc:
             logger.error("whisper_transcribe_failed", error=str(exc), exc_info=True)
             return {"text": "", "error": str(exc), "duration_seconds": 0}
 
-    async def transcribe_stream(self, audio_chunk: bytes, session_id: str) -> str:
-        previous = self._stream_buffers.get(session_id, b"")
-        self._stream_buffers[session_id] = previous + audio_chunk
-        buffer = self._stream_buffers[session_id]
+    @staticmethod
+    def _segments(result: dict, offset: float, duration: float) -> list[dict]:
+        """Timestamped segments (seconds from the start of the clip) from a pipeline result.
+
+        Without chunk timestamps the whole decoded span becomes a single segment.
+        """
+        chunks = [c for c in (result.get("chunks") or []) if (c.get("text") or "").strip()]
+        if not chunks:
+            text = (result.get("text") or "").strip()
+            return [{"start": round(offset, 2), "end": round(offset + duration, 2), "text": text}] if text else []
+        segments = []
+        for chunk in chunks:
+            start, end = chunk.get("timestamp") or (None, None)
+            start = 0.0 if start is None else float(start)
+            end = duration if end is None else min(float(end), duration)
+            segments.append({"start": round(offset + start, 2), "end": round(offset + end, 2), "text": chunk["text"].strip()})
+        return segments
+
+    async def _decode_long(
+        self, samples: np.ndarray, offset: int, options: dict, session_id: str | None, context: SessionContext | None
+    ) -> list[dict]:
+        """Long-form decode: windows cut in pauses, decoded a batch at a time, stitched by timestamp.
+
+        Only one batch of windows is converted to float32 at a time, which keeps memory flat for long uploads.
+        """
+        rate = self.SAMPLE_RATE
+        windows = split_on_silence(
+            samples,
+            self.SILENCE_THRESHOLD,
+            int(settings.WHISPER_LONGFORM_WINDOW_SECONDS * rate),
+            int(settings.WHISPER_LONGFORM_OVERLAP_SECONDS * rate),
+            rate,
+        )
+        options = {**options, "return_timestamps": True}
+        segments: list[dict] = []
+        batch_size = max(settings.ASR_BATCH_MAX_SIZE, 1)
+        for i in range(0, len(windows), batch_size):
+            group = windows[i : i + batch_size]
+            # Same options and similar lengths: the scheduler runs each group as one batched forward pass
+            results = await asyncio.gather(
+                *(self.decode(samples[start:end].astype(np.float32) / 32768.0, **options) for start, end, _, _ in group)
+            )
+            for (start, end, keep_start, keep_end), result in zip(group, results):
+                self._pin_detected_language(session_id, context, result)
+                for segment in self._segments(result, 0.0, (end - start) / rate):
+                    # Where windows overlap, each keeps the segments centred on its side of the hand-over point
+                    if keep_start <= start + (segment["start"] + segment["end"]) / 2 * rate < keep_end:
+                        segment["start"] = round((offset + start) / rate + segment["start"], 2)
+                        segment["end"] = round((offset + start) / rate + segment["end"], 2)
+                        segments.append(segment)
+        logger.info("whisper_longform_decoded", windows=len(windows), segments=len(segments), duration=round(len(samples) / rate, 1))
+        return segments
+
+    async def transcribe_stream(self, session_id: str, buffer: AudioBuffer) -> str:
+        """Live partial transcript for a session.
+
+        Only the audio after the committed offset is decoded. Segments that end before the
+        unstable tail are committed and never decoded again, which keeps the decode window
+        bounded regardless of utterance length.
+        """
+        # The session buffer is owned by the WebSocket connection manager; we only read views of it.
+        if not self.ready:
+            # Partials are best-effort: start a lazy load but never hold the audio loop for it
+            self.loader.start()
+            return ""
+        state = self._streams.setdefault(session_id, StreamState())
+        context = self._session(session_id)
 
         # Use a small "processing window" to detect intents mid-prompt
         # Process every ~1.5s of new audio
         chunk_threshold = self.SAMPLE_RATE * 2 * 1.5
-        if len(buffer) < chunk_threshold:
+        if len(buffer) - state.committed_bytes < chunk_threshold:
             return ""
 
         # Avoid overwhelming with too many transcriptions
-        last_process_time = self._silence_seconds.get(f"{session_id}_last_ts", 0)
-        if time.time() - last_process_time < 1.0:
+        if time.time() - state.last_decode_ts < settings.WHISPER_STREAM_INTERVAL_SECONDS:
             return ""
         
         try:
-            # Decode and transcribe the current buffer
-            audio_np = np.frombuffer(buffer, dtype=np.int16).astype(np.float32) / 32768.0
-            result = await asyncio.to_thread(self.pipe, audio_np)
-            text = (result.get("text") or "").strip()
-            
-            self._silence_seconds[f"{session_id}_last_ts"] = time.time()
-            return text
+            # as_int16 is a zero-copy view of the uncommitted tail; only the float conversion allocates
+            samples = buffer.as_int16(state.committed_bytes)
+            start, _ = speech_bounds(samples, self.SILENCE_THRESHOLD, self.SAMPLE_RATE)
+            if start is None:
+                # Nothing but silence since the last commit; no point waking the decoder
+                return state.text
+            if start > 0:
+                # Leading silence is committed as empty so it never enters a decode window again
+                state.committed_bytes += start * 2
+                samples = samples[start:]
+            window = samples.astype(np.float32) / 32768.0
+            # Text already committed for this utterance (or the previous utterance) keeps the tail decode consistent
+            options = self._decode_options(context, " ".join(state.committed) or context.last_text)
+            result = await self.decode(window, partial=True, **{**options, "return_timestamps": True})
+            state.last_decode_ts = time.time()
+            if result is None:
+                # Dropped by the scheduler as stale under load; the next chunk will retry
+                return state.text
+            self._pin_detected_language(session_id, context, result)
+            self._commit_stable_segments(state, result, len(window) / self.SAMPLE_RATE)
+            return state.text
         except Exception as exc:
             logger.error("whisper_stream_failed", error=str(exc))
             return ""
 
+    def _commit_stable_segments(self, state: StreamState, result: dict, window_seconds: float) -> None:
+        chunks = [c for c in (result.get("chunks") or []) if (c.get("text") or "").strip()]
+        if not chunks:
+            state.tail_text = (result.get("text") or "").strip()
+            return
+
+        stable_until = window_seconds - settings.WHISPER_STREAM_UNSTABLE_SECONDS
+        commit_count = 0
+        for i, chunk in enumerate(chunks):
+            end = (chunk.get("timestamp") or (None, None))[1]
+            if end is None or end > stable_until:
+                break
+            commit_count = i + 1
+
+        commit_end = chunks[commit_count - 1]["timestamp"][1] if commit_count else 0.0
+        if not commit_count and window_seconds > settings.WHISPER_STREAM_WINDOW_SECONDS * 2:
+            # No segment boundary inside a runaway window: commit it wholesale to keep the window bounded
+            commit_count, commit_end = len(chunks), window_seconds
+
+        if commit_count:
+            state.segments.extend(self._segments({"chunks": chunks[:commit_count]}, state.committed_bytes / 2 / self.SAMPLE_RATE, window_seconds))
+            state.committed.extend(c["text"].strip() for c in chunks[:commit_count])
+            state.committed_bytes += int(commit_end * self.SAMPLE_RATE) * 2
+        state.tail_text = " ".join(c["text"].strip() for c in chunks[commit_count:])
+
+    def finish_stream(self, session_id: str, audio_bytes: bytes) -> Awaitable[dict[str, Any]]:
+        """Final transcript for an utterance that was streamed through transcribe_stream.
+
+        Committed segments are reused as-is; only the audio after the committed offset is decoded.
+        With a separate partial model the committed text came from the fast tier, so the whole
+        utterance is decoded again by the final model instead.
+
+        The stream state is taken synchronously, so partials for the next utterance start fresh
+        even while this decode is still pending.
+        """
+        return self._finish_stream(self._streams.pop(session_id, None), session_id, audio_bytes)
+
+    async def _finish_stream(self, state: StreamState | None, session_id: str, audio_bytes: bytes) -> dict[str, Any]:
+        if state is None or self.two_tier or not state.committed or state.committed_bytes >= len(audio_bytes):
+            return await self.transcribe(audio_bytes, session_id=session_id)
+
+        tail = memoryview(audio_bytes)[state.committed_bytes :]
+        committed_text = " ".join(state.committed)
+        if len(tail) >= self.SAMPLE_RATE * 2 * 0.2:
+            tail_result = await self.transcribe(tail, session_id=session_id, prompt=committed_text)
+        else:
+            tail_result = {"text": ""}
+        if tail_result.get("error") and not tail_result.get("text"):
+            logger.warning("whisper_stream_tail_failed", session_id=session_id, error=tail_result["error"])
+        text = " ".join(t for t in [*state.committed, (tail_result.get("text") or "").strip()] if t)
+        logger.info("whisper_stream_finalized", session_id=session_id, committed_segments=len(state.committed), tail_bytes=len(tail))
+        context = self._session(session_id)
+        context.last_text = text
+        tail_offset = state.committed_bytes / 2 / self.SAMPLE_RATE
+        tail_segments = [
+            {**segment, "start": round(segment["start"] + tail_offset, 2), "end": round(segment["end"] + tail_offset, 2)}
+            for segment in tail_result.get("segments") or []
+        ]
+        return {
+            "text": text,
+            "language": context.language or "unknown",
+            "segments": [*state.segments, *tail_segments],
+            "duration_seconds": len(audio_bytes) / (self.SAMPLE_RATE * 2),
+            "word_count": len(text.split()),
+        }
+
+    def reset_stream(self, session_id: str) -> None:
+        self._streams.pop(session_id, None)
+
+    def end_session(self, session_id: str) -> None:
+        """Forget the session's stream state, pinned language and prompt context."""
+        self._streams.pop(session_id, None)
+        self._sessions.pop(session_id, None)
 
 whisper_service = WhisperService()
@@ -1,19 +1,36 @@
 from datetime import datetime, timezone
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 from config import settings
 from database.mongo import ping_database
 from models.model_manager import model_manager
+from models.model_registry import model_registry
+from models.precision import model_precision, process_rss_mb
 from gml.embedding_service import embedding_service
 
 router = APIRouter(prefix="/api", tags=["health"])
 
 
+@router.get("/health/live")
+async def liveness():
+    # The process is up and serving; says nothing about models
+    return {"status": "alive", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/health/ready")
+async def readiness():
+    state = model_manager.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
 @router.get("/health")
 async def health_check():
     db_ok, ping_ms = await ping_database()
     model_status = await model_manager.get_health()
+    # Embeddings are reported under "gml" and do not count towards the model quorum
+    embedding_status = model_status.pop("embedding", {})
 
     whatsapp_missing = [
         var
@@ -44,6 +61,10 @@ async def health_check():
                 "available": model_status["whisper"]["available"],
                 "model": model_status["whisper"]["model_name"],
                 "load_time_ms": model_status["whisper"]["load_time_ms"],
+                "precision": model_status["whisper"].get("precision"),
+                "memory_mb": model_status["whisper"].get("memory_mb"),
+                "scheduler": model_status["whisper"].get("scheduler", {}),
+                "partial": model_status["whisper"].get("partial", {}),
             },
             "openrouter": {
                 "available": model_status.get("openrouter", {}).get("available"),
@@ -59,13 +80,24 @@ async def health_check():
                 "available": model_status["sentiment"]["available"],
                 "model": model_status["sentiment"]["model_name"],
                 "load_time_ms": model_status["sentiment"]["load_time_ms"],
+                "precision": model_status["sentiment"].get("precision"),
+                "backend": model_status["sentiment"].get("backend"),
+                "memory_mb": model_status["sentiment"].get("memory_mb"),
+                "batching": model_status["sentiment"].get("batching", {}),
             },
             "emotion": model_status.get("emotion", {}),
         },
+        "readiness": model_manager.readiness(),
+        "model_registry": model_registry.get_stats(),
+        "runtime": {"model_precision": model_precision(), "process_rss_mb": process_rss_mb()},
         "integrations": integrations,
         "gml": {
             "available": embedding_service.available,
             "embedding_model": embedding_service.MODEL_NAME,
             "dimensions": embedding_service.DIMENSIONS,
+            "load_time_ms": embedding_status.get("load_time_ms", 0),
+            "precision": embedding_status.get("precision"),
+            "backend": embedding_status.get("backend"),
+            "memory_mb": embedding_status.get("memory_mb"),
         },
     }
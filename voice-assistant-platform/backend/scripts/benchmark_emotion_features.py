@@ -0,0 +1,128 @@
+"""Compare the NumPy acoustic feature extractor with the previous librosa/pyin path.
+
+Run from the backend directory:
+
+    python -m scripts.benchmark_emotion_features [--audio-dir DIR] [--repeats N]
+
+With --audio-dir every 16 kHz mono ``*.wav`` in it is used; otherwise a synthetic
+corpus of harmonic "voices" with vibrato, pauses and noise is generated. Reports the
+median latency of both paths per clip length and how far the NumPy features are
+from the librosa ones. The librosa section is skipped when librosa is not installed.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from utils.acoustic_features import SAMPLE_RATE, extract_features
+
+FEATURES = ("pitch_mean", "pitch_std", "tremor", "energy_rms", "pause_ratio", "tone_brightness")
+
+
+def timed(fn, repeats: int) -> tuple[object, float]:
+    """Result of the last run and the median latency in ms (after one untimed warmup)."""
+    result = fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def librosa_features(pcm: np.ndarray) -> dict | None:
+    """The extraction EmotionService used before, on the same PCM decoded to float."""
+    import librosa
+
+    y = pcm.astype(np.float32) / 32768.0
+    sr = SAMPLE_RATE
+    duration = librosa.get_duration(y=y, sr=sr)
+    if duration < 0.5:
+        return None
+    f0, voiced_flag, _ = librosa.pyin(y, fmin=librosa.note_to_hz("C2"), fmax=librosa.note_to_hz("C7"), sr=sr)
+    voiced_f0 = f0[voiced_flag] if voiced_flag is not None else f0[~np.isnan(f0)]
+    if len(voiced_f0) > 0:
+        pitch_mean = float(np.nanmean(voiced_f0))
+        pitch_std = float(np.nanstd(voiced_f0))
+        tremor = float(np.nanmean(np.abs(np.diff(voiced_f0)))) if len(voiced_f0) > 1 else 0.0
+    else:
+        pitch_mean = pitch_std = tremor = 0.0
+    rms = librosa.feature.rms(y=y)[0]
+    silence_threshold = np.max(rms) * 0.1 if len(rms) else 0
+    return {
+        "pitch_mean": pitch_mean,
+        "pitch_std": pitch_std,
+        "tremor": tremor,
+        "energy_rms": float(np.mean(rms)),
+        "pause_ratio": float(np.sum(rms < silence_threshold) / len(rms)) if len(rms) else 0.0,
+        "tone_brightness": float(np.mean(librosa.feature.spectral_centroid(y=y, sr=sr)[0])),
+        "duration": duration,
+    }
+
+
+def synthetic_clip(seconds: float, base_hz: float, rng: np.random.Generator) -> np.ndarray:
+    """Harmonic tone with vibrato, alternating ~1.2 s phrases and ~0.4 s pauses, plus light noise."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = base_hz * (1 + 0.03 * np.sin(2 * np.pi * 5 * t)) * (1 + 0.1 * np.sin(2 * np.pi * 0.3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    gate = (np.mod(t, 1.6) < 1.2).astype(np.float32)
+    y = 0.2 * voice * gate + 0.005 * rng.standard_normal(len(t))
+    return np.clip(y * 32767, -32768, 32767).astype(np.int16)
+
+
+def load_corpus(audio_dir: Path | None) -> list[tuple[str, np.ndarray]]:
+    if audio_dir is None:
+        rng = np.random.default_rng(0)
+        return [(f"synthetic_{int(s)}s_{int(hz)}hz", synthetic_clip(s, hz, rng)) for s in (2, 10, 60) for hz in (110, 210)]
+    import soundfile as sf
+
+    corpus = []
+    for wav in sorted(audio_dir.glob("*.wav")):
+        samples, sample_rate = sf.read(wav, dtype="int16")
+        if sample_rate != SAMPLE_RATE or samples.ndim != 1:
+            raise SystemExit(f"{wav}: expected 16 kHz mono audio")
+        corpus.append((wav.stem, samples))
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio-dir", type=Path, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=0.0, help="analysis cap for the NumPy path (0 = whole clip)")
+    args = parser.parse_args()
+
+    try:
+        import librosa  # noqa: F401
+
+        have_librosa = True
+    except Exception:
+        have_librosa = False
+
+    clips = []
+    for name, pcm in load_corpus(args.audio_dir):
+        pcm_bytes = pcm.tobytes()
+        numpy_result, numpy_ms = timed(lambda: extract_features(pcm_bytes, max_seconds=args.max_seconds), args.repeats)
+        clip = {"clip": name, "seconds": round(len(pcm) / SAMPLE_RATE, 1), "numpy_ms": round(numpy_ms, 2)}
+        if have_librosa:
+            librosa_result, librosa_ms = timed(lambda: librosa_features(pcm), args.repeats)
+            clip["librosa_ms"] = round(librosa_ms, 1)
+            clip["speedup"] = round(librosa_ms / max(numpy_ms, 1e-6), 1)
+            if numpy_result and librosa_result:
+                clip["abs_diff"] = {k: round(abs(numpy_result[k] - librosa_result[k]), 4) for k in FEATURES}
+        clip["numpy_features"] = {k: round(v, 4) for k, v in (numpy_result or {}).items()}
+        clips.append(clip)
+
+    report = {"clips": clips, "librosa": "available" if have_librosa else "not installed; NumPy timings only"}
+    if have_librosa:
+        report["median_speedup"] = round(statistics.median(c["speedup"] for c in clips), 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Compare fp32 and int8 (dynamic quantization) latency and accuracy for the local models.
+
+Run from the backend directory:
+
+    python -m scripts.benchmark_precision [--audio-dir DIR] [--repeats N]
+
+Text models use the fixed corpus below. Whisper needs --audio-dir with 16 kHz mono
+``*.wav`` files and a ``<name>.txt`` reference transcript next to each; without it the
+Whisper section is skipped.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from gml.embedding_service import EmbeddingService
+from models.precision import module_size_mb, quantize_module
+from models.sentiment_service import SentimentService
+from models.whisper_service import WhisperService
+
+SENTIMENT_CORPUS = [
+    ("Thank you so much, that fixed it right away.", "positive"),
+    ("The agent was friendly and the refund arrived on time.", "positive"),
+    ("Great, everything works perfectly now.", "positive"),
+    ("I love how quick the new app is.", "positive"),
+    ("I'd like to check the balance on my savings account.", "neutral"),
+    ("My address changed last month, can you update it?", "neutral"),
+    ("What are your opening hours on Saturday?", "neutral"),
+    ("Please send the statement to my email.", "neutral"),
+    ("This is the third time I've called and nobody has helped me.", "negative"),
+    ("Someone took money from my account and I'm furious.", "negative"),
+    ("Your service is terrible and the card still doesn't work.", "negative"),
+    ("I was charged twice and I want it fixed now.", "negative"),
+]
+
+
+def timed(fn, repeats: int) -> tuple[object, float]:
+    """Result of the last run and the median latency in ms (after one untimed warmup)."""
+    result = fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref = re.findall(r"[\w']+", reference.lower())
+    hyp = re.findall(r"[\w']+", hypothesis.lower())
+    if not ref:
+        return float(bool(hyp))
+    dist = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, dist[0] = dist[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, dist[j] = dist[j], min(dist[j] + 1, dist[j - 1] + 1, prev + (r != h))
+    return dist[-1] / len(ref)
+
+
+def bench_sentiment(repeats: int) -> dict:
+    service = SentimentService()
+    service.precision = "fp32"
+    asyncio.run(service.load_model())
+    if not service.available:
+        return {"skipped": service.error}
+    texts = [t for t, _ in SENTIMENT_CORPUS]
+    fp32 = service.pipeline.model
+    report = {}
+    labels_by_precision = {}
+    for precision in ("fp32", "int8"):
+        service.pipeline.model = quantize_module(fp32, precision)
+        raw, latency = timed(lambda: service._analyze_many(texts), repeats)
+        labels = [r["sentiment"] for r in raw]
+        labels_by_precision[precision] = labels
+        report[precision] = {
+            "batch_latency_ms": round(latency, 1),
+            "memory_mb": module_size_mb(service.pipeline.model),
+            "accuracy": round(sum(p == g for p, (_, g) in zip(labels, SENTIMENT_CORPUS)) / len(texts), 3),
+        }
+    report["int8_label_agreement"] = round(
+        sum(a == b for a, b in zip(labels_by_precision["fp32"], labels_by_precision["int8"])) / len(texts), 3
+    )
+    return report
+
+
+def bench_embedding(repeats: int) -> dict:
+    service = EmbeddingService()
+    service.precision = "fp32"
+    asyncio.run(service.load())
+    if not service.available:
+        return {"skipped": service.error}
+    texts = [t for t, _ in SENTIMENT_CORPUS]
+    fp32 = service.model
+    report = {}
+    vectors = {}
+    for precision in ("fp32", "int8"):
+        model = quantize_module(fp32, precision)
+        vectors[precision], latency = timed(lambda: model.encode(texts, normalize_embeddings=True, batch_size=32), repeats)
+        report[precision] = {"batch_latency_ms": round(latency, 1), "memory_mb": module_size_mb(model)}
+    cosines = np.sum(np.asarray(vectors["fp32"]) * np.asarray(vectors["int8"]), axis=1)
+    report["int8_cosine_to_fp32"] = {"mean": round(float(cosines.mean()), 4), "min": round(float(cosines.min()), 4)}
+    return report
+
+
+def bench_whisper(audio_dir: Path | None, repeats: int) -> dict:
+    if audio_dir is None:
+        return {"skipped": "no --audio-dir given"}
+    import soundfile as sf
+
+    corpus = []
+    for wav in sorted(audio_dir.glob("*.wav")):
+        reference = wav.with_suffix(".txt")
+        if reference.exists():
+            samples, sample_rate = sf.read(wav, dtype="float32")
+            if sample_rate != WhisperService.SAMPLE_RATE or samples.ndim != 1:
+                raise SystemExit(f"{wav}: expected 16 kHz mono audio")
+            corpus.append((samples, reference.read_text().strip()))
+    if not corpus:
+        return {"skipped": f"no .wav/.txt pairs in {audio_dir}"}
+
+    service = WhisperService()
+    pipe = asyncio.run(service._load_pipeline(service.model_name, "fp32"))
+    fp32 = pipe.model
+    report = {"clips": len(corpus)}
+    hypotheses = {}
+    for precision in ("fp32", "int8"):
+        pipe.model = quantize_module(fp32, precision)
+        latencies, texts = [], []
+        for samples, _ in corpus:
+            result, latency = timed(lambda: pipe(samples), repeats)
+            latencies.append(latency)
+            texts.append(result["text"])
+        hypotheses[precision] = texts
+        report[precision] = {
+            "median_latency_ms": round(statistics.median(latencies), 1),
+            "memory_mb": module_size_mb(pipe.model),
+            "wer": round(statistics.mean(word_error_rate(ref, hyp) for (_, ref), hyp in zip(corpus, texts)), 3),
+        }
+    report["int8_wer_vs_fp32"] = round(
+        statistics.mean(word_error_rate(a, b) for a, b in zip(hypotheses["fp32"], hypotheses["int8"])), 3
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio-dir", type=Path, default=None)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {
+        "sentiment": bench_sentiment(args.repeats),
+        "embedding": bench_embedding(args.repeats),
+        "whisper": bench_whisper(args.audio_dir, args.repeats),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
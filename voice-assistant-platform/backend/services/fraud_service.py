@@ -1,7 +1,59 @@
-import re
+from collections import Counter, OrderedDict, deque
 
 from config import settings
 from utils.helpers import calculate_levenshtein_similarity
+from utils.text_signals import text_scanner
+
+
+TOPICS = ("otp", "account", "sensitive", "financial")
+
+
+class SessionFraudState:
+    """Rolling history signals of one session, advanced once per stored message.
+
+    Holds exactly what the history heuristics look at (OTP mentions in the last
+    OTP_WINDOW messages, topics of the last TOPIC_WINDOW user messages, text of the last
+    REPETITION_WINDOW user messages), so a turn never re-scans earlier transcripts.
+    """
+
+    OTP_WINDOW = 10
+    TOPIC_WINDOW = 5
+    REPETITION_WINDOW = 3
+
+    def __init__(self):
+        self.ids: deque = deque(maxlen=self.OTP_WINDOW)
+        self.otp_flags: deque[bool] = deque(maxlen=self.OTP_WINDOW)
+        self.otp_count = 0
+        self.topics: deque[tuple[str, ...]] = deque(maxlen=self.TOPIC_WINDOW)
+        self.topic_counts: Counter = Counter()
+        self.texts: deque[str] = deque(maxlen=self.REPETITION_WINDOW)
+
+    def push(self, message_id, role: str, transcript: str, features: dict) -> None:
+        is_user = role == "user"
+        if len(self.otp_flags) == self.OTP_WINDOW:
+            self.otp_count -= self.otp_flags[0]
+        flag = is_user and bool(features.get("otp"))
+        self.otp_flags.append(flag)
+        self.otp_count += flag
+        self.ids.append(message_id)
+        if is_user:
+            if len(self.topics) == self.TOPIC_WINDOW:
+                self.topic_counts.subtract(self.topics[0])
+            topics = tuple(topic for topic in TOPICS if features.get(topic))
+            self.topics.append(topics)
+            self.topic_counts.update(topics)
+            self.texts.append((transcript or "").lower())
+
+    def matches(self, history: list[dict]) -> bool:
+        """Whether the state was built from exactly the tail of this history (same message ids)."""
+        tail = history[-self.OTP_WINDOW :]
+        if len(tail) != len(self.ids):
+            return False
+        return all(msg.get("_id") is not None and msg.get("_id") == message_id for msg, message_id in zip(tail, self.ids))
+
+    @property
+    def topic_count(self) -> int:
+        return sum(1 for count in self.topic_counts.values() if count > 0)
 
 
 class FraudService:
@@ -24,92 +76,146 @@ class FraudService:
         r"\b\d{4}[\s-]\d{4}[\s-]\d{4}[\s-]\d{4}\b",
         r"\b(pin|password|passcode)\s*:?\s*\d{4,}\b",
     ]
-
-    def _count_pattern_matches(self, text: str, patterns: list[str]) -> tuple[int, list[str]]:
-        found_signals = []
-        total = 0
-        for p in patterns:
-            matches = re.findall(p, text, flags=re.IGNORECASE)
-            if matches:
-                total += len(matches)
-                found_signals.append(p)
-        return total, found_signals
-
-    def _check_repetition(self, current_text: str, history: list[dict]) -> float:
-        user_msgs = [m for m in history if m.get("role") == "user"][-3:]
-        if not user_msgs:
+    FINANCIAL_KEYWORDS = ["bank", "account", "login", "password", "social security", "card number", "cvv", "routing"]
+    FINANCIAL_TOPIC_KEYWORDS = ["refund", "money", "transfer", "payment", "bank"]
+    PATTERN_CATEGORIES = ("fraud.otp", "fraud.account_takeover", "fraud.sensitive")
+    TOPIC_CATEGORIES = {"otp": "fraud.otp", "account": "fraud.account_takeover", "sensitive": "fraud.sensitive", "financial": "fraud.financial_topic"}
+    MAX_SESSIONS = 10000
+
+    def __init__(self):
+        self._sessions: OrderedDict[str, SessionFraudState] = OrderedDict()
+        text_scanner.add_patterns("fraud.otp", self.OTP_PATTERNS)
+        text_scanner.add_patterns("fraud.account_takeover", self.ACCOUNT_TAKEOVER_PATTERNS)
+        text_scanner.add_patterns("fraud.sensitive", self.SENSITIVE_DATA_PATTERNS)
+        text_scanner.add_keywords("fraud.financial", self.FINANCIAL_KEYWORDS)
+        text_scanner.add_keywords("fraud.financial_topic", self.FINANCIAL_TOPIC_KEYWORDS)
+
+    def _flag_segments(self, segments: list[dict]) -> list[dict]:
+        """Timestamped segments that contain pattern matches, so long recordings can be reviewed at the right spot."""
+        flagged = []
+        for segment in segments:
+            scanned = text_scanner.scan(segment.get("text") or "")
+            signals = [signal for category in self.PATTERN_CATEGORIES for signal in scanned.pattern_matches(category)[1]]
+            if signals:
+                flagged.append({"start": segment.get("start"), "end": segment.get("end"), "signals": signals})
+        return flagged
+
+    def message_features(self, transcript: str) -> dict:
+        """Per-message signal vector stored on the message document and fed to the session state."""
+        scanned = text_scanner.scan(transcript or "")
+        return {topic: scanned.has(category) for topic, category in self.TOPIC_CATEGORIES.items()}
+
+    def _build_state(self, history: list[dict]) -> SessionFraudState:
+        state = SessionFraudState()
+        for msg in history:
+            features = msg.get("fraud_features")
+            if features is None:
+                # Messages stored before signal vectors were recorded
+                features = self.message_features(msg.get("transcript", "") or "")
+            state.push(msg.get("_id"), msg.get("role"), msg.get("transcript", ""), features)
+        return state
+
+    def _state(self, session_id: str | None, history: list[dict]) -> SessionFraudState:
+        """The session's rolling state, rebuilt from history only when it is missing or out of step."""
+        if session_id is None:
+            return self._build_state(history)
+        state = self._sessions.get(session_id)
+        if state is not None and state.matches(history):
+            self._sessions.move_to_end(session_id)
+            return state
+        # New to this worker, evicted, or messages were stored elsewhere (another worker or a concurrent turn)
+        state = self._sessions[session_id] = self._build_state(history)
+        self._sessions.move_to_end(session_id)
+        if len(self._sessions) > self.MAX_SESSIONS:
+            self._sessions.popitem(last=False)
+        return state
+
+    def record_message(self, session_id: str, message_id, role: str, transcript: str, features: dict) -> None:
+        """Advance the session state with a message that was just stored."""
+        state = self._sessions.get(session_id)
+        if state is not None:
+            state.push(message_id, role, transcript, features)
+
+    def end_session(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def _check_repetition(self, current_text: str, state: SessionFraudState) -> float:
+        if not state.texts:
             return 0.0
-        sims = [calculate_levenshtein_similarity(current_text.lower(), (m.get("transcript", "")).lower()) for m in user_msgs]
+        current = current_text.lower()
+        sims = [calculate_levenshtein_similarity(current, text) for text in state.texts]
         if any(s > 0.85 for s in sims):
             return 0.25
         if sims and (sum(sims) / len(sims)) > 0.6:
             return 0.15
         return 0.0
 
-    def _detect_topic_switching(self, history: list[dict]) -> float:
-        user_msgs = [m for m in history if m.get("role") == "user"][-5:]
-        topics = set()
-        for msg in user_msgs:
-            t = (msg.get("transcript", "") or "").lower()
-            if self._count_pattern_matches(t, self.OTP_PATTERNS)[0] > 0:
-                topics.add("otp")
-            if self._count_pattern_matches(t, self.ACCOUNT_TAKEOVER_PATTERNS)[0] > 0:
-                topics.add("account")
-            if self._count_pattern_matches(t, self.SENSITIVE_DATA_PATTERNS)[0] > 0:
-                topics.add("sensitive")
-            if any(k in t for k in ["refund", "money", "transfer", "payment", "bank"]):
-                topics.add("financial")
-        if len(topics) >= 3:
+    def _detect_topic_switching(self, state: SessionFraudState) -> float:
+        topics = state.topic_count
+        if topics >= 3:
             return 0.2
-        if len(topics) == 2:
+        if topics == 2:
             return 0.1
         return 0.0
 
-    def evaluate(self, transcript: str, session_history: list[dict], audio_features: dict = None) -> dict:
+    def evaluate(
+        self,
+        transcript: str,
+        session_history: list[dict],
+        audio_features: dict = None,
+        segments: list[dict] = None,
+        session_id: str | None = None,
+        duplicate: dict | None = None,
+    ) -> dict:
+        """Score one user message.
+
+        ``duplicate`` is a near-duplicate of this message from another of the user's recent
+        sessions (NearDuplicateIndex.find), if any.
+        """
         score = 0.0
         signals = []
+        state = self._state(session_id, session_history)
 
-        # Convert to lowercase once
-        text_lower = (transcript or "").lower()
+        # One scan of the transcript serves every keyword list and pattern below (and urgency/emotion)
+        scanned = text_scanner.scan(transcript or "")
 
         # 1. Pattern matching (Text-based)
-        otp_count, otp_signals = self._count_pattern_matches(text_lower, self.OTP_PATTERNS)
+        otp_count, otp_signals = scanned.pattern_matches("fraud.otp")
         if otp_count > 0:
-            history_otp_count = sum(
-                1
-                for msg in session_history[-10:]
-                if msg.get("role") == "user" and self._count_pattern_matches((msg.get("transcript", "") or "").lower(), self.OTP_PATTERNS)[0] > 0
-            )
-            score += 0.5 + (history_otp_count * 0.2)
+            score += 0.5 + (state.otp_count * 0.2)
             signals.extend(otp_signals)
 
-        at_count, at_signals = self._count_pattern_matches(text_lower, self.ACCOUNT_TAKEOVER_PATTERNS)
+        at_count, at_signals = scanned.pattern_matches("fraud.account_takeover")
         if at_count > 0:
             score += 0.4 + (at_count * 0.2)
             signals.extend(at_signals)
 
-        sd_count, sd_signals = self._count_pattern_matches(text_lower, self.SENSITIVE_DATA_PATTERNS)
+        sd_count, sd_signals = scanned.pattern_matches("fraud.sensitive")
         if sd_count > 0:
             score += 0.6 + (sd_count * 0.2)
             signals.extend(sd_signals)
 
         # High-risk financial keywords
-        financial_keywords = ["bank", "account", "login", "password", "social security", "card number", "cvv", "routing"]
-        if any(kw in text_lower for kw in financial_keywords):
+        if scanned.has("fraud.financial"):
             score += 0.3
             signals.append("financial_terms_detected")
 
         # 2. History-based heuristics
-        rep_score = self._check_repetition(transcript, session_history)
+        rep_score = self._check_repetition(transcript, state)
         if rep_score > 0:
             score += rep_score
             signals.append("repeated_similar_queries")
 
-        ts_score = self._detect_topic_switching(session_history)
+        ts_score = self._detect_topic_switching(state)
         if ts_score > 0:
             score += ts_score
             signals.append("abnormal_topic_switching")
 
+        # Scripts replayed across fresh sessions evade the per-session repetition check
+        if duplicate:
+            score += 0.3
+            signals.append("cross_session_repetition")
+
         # 3. Audio-based stress signals
         if audio_features:
             tremor = audio_features.get("tremor", 0)
@@ -126,6 +232,10 @@ class FraudService:
             "fraud_risk": round(fraud_risk, 3),
             "fraud_signals": list(set(signals)),
             "escalation_required": fraud_risk >= settings.FRAUD_ALERT_THRESHOLD,
+            # Only worth locating when the transcript as a whole matched something
+            "flagged_segments": self._flag_segments(segments) if segments and (otp_count or at_count or sd_count) else [],
+            "message_features": self.message_features(transcript),
+            "cross_session_match": duplicate,
         }
 
 
@@ -0,0 +1,193 @@
+"""
+Per-user near-duplicate index over recent transcripts (MinHash signatures + LSH banding).
+
+Answers "has this user said something about this similar in another session during the
+last FRAUD_DUPLICATE_WINDOW_DAYS days?" from memory: a lookup hashes the transcript's
+character shingles into a NUM_PERM-value signature, reads the BANDS buckets it falls
+into and compares only those candidates. Signatures (never the text) are persisted to
+the ``fraud_fingerprints`` collection, each with an ``expires_at`` one window ahead for
+the TTL index. A user's recent signatures are loaded on first use and topped up every
+FRAUD_DUPLICATE_REFRESH_SECONDS, so sessions handled by other workers are seen too.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from bson import ObjectId
+
+from config import settings
+from utils.logger import get_logger
+
+logger = get_logger("services.near_duplicate_index")
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_CHARS = 4
+# Short replies ("yes", "okay thanks") repeat innocently across sessions
+MIN_CHARS = 16
+
+# Fixed seed: signatures are persisted and compared across workers and restarts
+_rng = np.random.default_rng(0x5EED)
+_MUL = _rng.integers(1, 2**64, NUM_PERM, dtype=np.uint64, endpoint=False) | np.uint64(1)
+_ADD = _rng.integers(0, 2**64, NUM_PERM, dtype=np.uint64, endpoint=False)
+
+
+def fingerprint(text: str) -> np.ndarray | None:
+    """MinHash signature (NUM_PERM uint32) of the normalized text, or None when it is too short to compare."""
+    normalized = re.sub(r"[\W_]+", " ", (text or "").lower()).strip()
+    if len(normalized) < MIN_CHARS:
+        return None
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    count = len(codes) - SHINGLE_CHARS + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_CHARS):
+        shingles = shingles * np.uint64(1_000_003) + codes[offset : offset + count]
+    shingles = np.unique(shingles)
+    # Multiply-shift hashing (wraps mod 2**64); the high 32 bits are one permutation each
+    hashed = (_MUL[:, None] * shingles[None, :] + _ADD[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(signature: np.ndarray) -> list[tuple[int, bytes]]:
+    return [(band, signature[band * ROWS : (band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class _UserIndex:
+    def __init__(self):
+        # fingerprint id -> (session_id, created epoch seconds, signature), oldest first
+        self.entries: OrderedDict[ObjectId, tuple[str, float, np.ndarray]] = OrderedDict()
+        self.buckets: dict[tuple[int, bytes], set[ObjectId]] = {}
+        self.synced_at = 0.0  # monotonic time of the last Mongo load
+        self.synced_until: datetime | None = None  # newest created_at the last load asked for
+
+
+class NearDuplicateIndex:
+    MAX_USERS = 10000
+    # Overlap between consecutive loads, for writes that land just after a load's cutoff
+    SYNC_SLACK = timedelta(seconds=5)
+
+    def __init__(self):
+        self._users: OrderedDict[str, _UserIndex] = OrderedDict()
+        self.stats = {"queries": 0, "matches": 0, "loads": 0, "load_errors": 0, "write_errors": 0}
+
+    @property
+    def window_seconds(self) -> float:
+        return settings.FRAUD_DUPLICATE_WINDOW_DAYS * 86400
+
+    def _insert(self, index: _UserIndex, entry_id: ObjectId, session_id: str, created: float, signature: np.ndarray) -> None:
+        if entry_id in index.entries:
+            return
+        index.entries[entry_id] = (session_id, created, signature)
+        for key in _band_keys(signature):
+            index.buckets.setdefault(key, set()).add(entry_id)
+        while len(index.entries) > settings.FRAUD_DUPLICATE_MAX_PER_USER:
+            self._remove(index, next(iter(index.entries)))
+
+    def _remove(self, index: _UserIndex, entry_id: ObjectId) -> None:
+        _, _, signature = index.entries.pop(entry_id)
+        for key in _band_keys(signature):
+            bucket = index.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del index.buckets[key]
+
+    def _expire(self, index: _UserIndex, cutoff: float) -> None:
+        while index.entries:
+            entry_id, (_, created, _) = next(iter(index.entries.items()))
+            if created >= cutoff:
+                break
+            self._remove(index, entry_id)
+
+    async def _load(self, db, user_id: str, index: _UserIndex) -> None:
+        now = datetime.now(timezone.utc)
+        since = index.synced_until - self.SYNC_SLACK if index.synced_until else now - timedelta(seconds=self.window_seconds)
+        try:
+            # Newest first, so a capped load keeps the most recent signatures
+            docs = await db.fraud_fingerprints.find({"user_id": user_id, "created_at": {"$gt": since}}).sort("created_at", -1).to_list(
+                length=settings.FRAUD_DUPLICATE_MAX_PER_USER
+            )
+        except Exception as exc:
+            self.stats["load_errors"] += 1
+            logger.warning("fingerprint_load_failed", user_id=user_id, error=str(exc))
+            return
+        for doc in reversed(docs):
+            created = doc["created_at"]
+            if created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            signature = np.frombuffer(doc["signature"], dtype=np.uint32)
+            if len(signature) == NUM_PERM:
+                self._insert(index, doc["_id"], doc.get("session_id"), created.timestamp(), signature)
+        index.synced_at = time.monotonic()
+        index.synced_until = now
+        self.stats["loads"] += 1
+
+    async def _user(self, db, user_id: str) -> _UserIndex:
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = _UserIndex()
+            if len(self._users) > self.MAX_USERS:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        if time.monotonic() - index.synced_at > settings.FRAUD_DUPLICATE_REFRESH_SECONDS:
+            await self._load(db, user_id, index)
+        return index
+
+    async def find(self, db, user_id: str, text: str, exclude_session: str | None = None) -> dict | None:
+        """Closest earlier utterance of the user (outside ``exclude_session``) at or above FRAUD_DUPLICATE_THRESHOLD."""
+        signature = fingerprint(text)
+        if signature is None:
+            return None
+        index = await self._user(db, user_id)
+        cutoff = time.time() - self.window_seconds
+        self._expire(index, cutoff)
+        self.stats["queries"] += 1
+
+        candidates: set[ObjectId] = set()
+        for key in _band_keys(signature):
+            candidates.update(index.buckets.get(key, ()))
+        best = None
+        for entry_id in candidates:
+            session_id, created, other = index.entries[entry_id]
+            if session_id == exclude_session or created < cutoff:
+                continue
+            similarity = float(np.count_nonzero(other == signature)) / NUM_PERM
+            if best is None or similarity > best["similarity"]:
+                best = {"session_id": session_id, "similarity": round(similarity, 3), "timestamp": created}
+        if best is None or best["similarity"] < settings.FRAUD_DUPLICATE_THRESHOLD:
+            return None
+        self.stats["matches"] += 1
+        return best
+
+    async def add(self, db, user_id: str, session_id: str, text: str) -> None:
+        signature = fingerprint(text)
+        if signature is None:
+            return
+        now = datetime.now(timezone.utc)
+        doc = {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "session_id": session_id,
+            "signature": signature.tobytes(),
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.window_seconds),
+        }
+        index = self._users.get(user_id)
+        if index is not None:
+            self._insert(index, doc["_id"], session_id, now.timestamp(), signature)
+        try:
+            await db.fraud_fingerprints.insert_one(doc)
+        except Exception as exc:
+            self.stats["write_errors"] += 1
+            logger.warning("fingerprint_write_failed", user_id=user_id, error=str(exc))
+
+    def get_stats(self) -> dict:
+        return {"users": len(self._users), "entries": sum(len(index.entries) for index in self._users.values()), **self.stats}
+
+
+near_duplicate_index = NearDuplicateIndex()
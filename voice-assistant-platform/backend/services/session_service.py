@@ -1,6 +1,9 @@
 import asyncio
 import os
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -15,15 +18,42 @@ from models.sentiment_service import sentiment_service
 from models.tts_service import tts_service
 from models.whisper_service import whisper_service
 from services.fraud_service import fraud_service
+from services.near_duplicate_index import near_duplicate_index
 from services.n8n_service import n8n_service
 from services import urgency_service
+from utils.action_parser import ActionStreamParser, extract_actions
 from utils.helpers import generate_uuid
 from utils.logger import get_logger
+from utils.sentence_splitter import SentenceSplitter
 
 logger = get_logger("services.session")
 
+EventSink = Callable[[dict], Awaitable[None]]
+
+
+def _discard_result(task: asyncio.Task) -> None:
+    # Retrieve the outcome of a stage abandoned on timeout so asyncio doesn't warn about it
+    if not task.cancelled():
+        task.exception()
+
+
+def _remember(cache: OrderedDict, key: str, value, limit: int) -> None:
+    # Per-session caches outlive sessions that disconnect without end_session; keep the newest `limit`
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > limit:
+        cache.popitem(last=False)
+
 
 class SessionService:
+    MAX_SESSIONS = 10000
+
+    def __init__(self):
+        # Last successful memory recall per session, served when a recall overruns its budget
+        self._memory_cache: OrderedDict[str, str] = OrderedDict()
+        # Owner of each active session (user id as a string), looked up once per session
+        self._user_ids: OrderedDict[str, str | None] = OrderedDict()
+
     async def create_session(self, user_id: str, channel: str) -> dict:
         db = await get_database()
         session_id = generate_uuid()
@@ -44,7 +74,21 @@ class SessionService:
         await db.voice_sessions.insert_one(payload)
         return {"session_id": session_id, "websocket_url": f"/ws/audio/{session_id}"}
 
-    async def process_audio_message(self, session_id: str, audio_bytes: bytes) -> dict:
+    async def process_audio_message(
+        self,
+        session_id: str,
+        audio_bytes: bytes,
+        transcription: dict | None = None,
+        on_event: EventSink | None = None,
+        audio_features: dict | None = None,
+    ) -> dict:
+        """Run one voice turn.
+
+        With ``on_event`` the reply is streamed: the transcript, ``response_chunk`` tokens,
+        ``execute_actions`` and per-sentence ``audio_chunk`` bytes are pushed to the sink as
+        they become available. ``audio_features`` are acoustic features already accumulated
+        while the audio streamed in (EmotionService.finish_stream).
+        """
         start_time = time.time()
 
         # Input validation for audio_bytes
@@ -75,8 +119,12 @@ class SessionService:
         except Exception as exc:
             logger.warning("audio_save_failed", session_id=session_id, error=str(exc))
 
-        transcription = await whisper_service.transcribe(audio_bytes)
+        timings: dict[str, int] = {}
+        degraded: list[str] = []
+        if transcription is None:
+            transcription = await self._timed(timings, "transcription", whisper_service.transcribe(audio_bytes, session_id=session_id))
         transcript = transcription.get("text", "")
+        segments = transcription.get("segments") or []
         
         if not transcript.strip():
             # Check if there was an error in transcription result
@@ -84,28 +132,51 @@ class SessionService:
             logger.warning("transcription_empty", session_id=session_id, error=error_msg)
             return {"error": error_msg, "transcript": ""}
 
-        db = await get_database()
-        history = await self.get_session_history(session_id)
+        if on_event is not None:
+            await on_event({"type": "transcript_chunk", "text": transcript, "final": True})
+
+        # Stage graph: history/memory/sentiment/emotion only need the transcript or the audio, so
+        # they start together; the LLM waits on history, fraud on history + emotion features.
+        # The deadline covers only these stages, so a slow upload or decode cannot starve them.
+        budget = self._budget(timings, degraded, time.perf_counter() + settings.TURN_DEADLINE_MS / 1000)
+        async with asyncio.TaskGroup() as tg:
+            # Required input (LLM context, fraud state), so it is awaited in full rather than budgeted
+            history_task = tg.create_task(self._timed(timings, "history", self.get_session_history(session_id)))
+            memory_task = tg.create_task(budget("memory", self._recall_memory(session_id, transcript), lambda: self._memory_cache.get(session_id, "")))
+            sentiment_task = tg.create_task(budget("sentiment", sentiment_service.analyze(transcript), sentiment_service.fallback_result))
+            emotion_task = tg.create_task(
+                budget("emotion", emotion_service.analyze_audio(audio_bytes, transcript, segments, audio_features), lambda: emotion_service._text_only_fallback(transcript))
+            )
+            duplicate_task = tg.create_task(budget("duplicates", self._find_duplicate(session_id, transcript), lambda: None))
 
-        session_doc = await db.voice_sessions.find_one({"session_id": session_id})
-        uid = str(session_doc.get("user_id")) if session_doc else None
-        memory_context = ""
-        if uid:
-            try:
-                memory_context = (await memory_engine.recall(db, uid, transcript, top_k=3)).get("memory_context", "")
-            except Exception:
-                memory_context = ""
-        response_text = await openrouter_service.chat(transcript, await self._build_ollama_history(history), SYSTEM_PROMPT)
+            speech_queue: asyncio.Queue | None = None
+            speech_task = None
+            if on_event is not None:
+                # Sentences are synthesized while the LLM is still generating the rest of the reply
+                speech_queue = asyncio.Queue()
+                speech_task = tg.create_task(self._timed(timings, "tts", self._stream_speech(speech_queue, on_event)))
 
-        sentiment_result = sentiment_service.analyze(transcript)
-        urgency_score = urgency_service.score(transcript, sentiment_result)
-        emotion_result = await emotion_service.analyze_audio(audio_bytes, transcript)
-        
-        # Pass audio features to fraud service for better detection
-        audio_features = emotion_result.get("audio_features", {})
-        fraud_result = fraud_service.evaluate(transcript, history, audio_features)
+            history = await history_task
+            llm_task = tg.create_task(self._timed(timings, "llm", self._generate_response(transcript, history, on_event, speech_queue)))
+
+            async def fraud_stage():
+                # Pass audio features to fraud service for better detection
+                audio_features = (await emotion_task).get("audio_features", {})
+                duplicate = await duplicate_task
+                return self._timed_call(timings, "fraud", fraud_service.evaluate, transcript, history, audio_features, segments, session_id, duplicate)
 
-        audio_response_bytes = await tts_service.synthesize(response_text)
+            fraud_task = tg.create_task(fraud_stage())
+
+            response_text, clean_response, actions = await llm_task
+            if speech_task is None:
+                speech_task = tg.create_task(self._timed(timings, "tts", tts_service.synthesize(clean_response)))
+
+        sentiment_result = sentiment_task.result()
+        urgency_score = urgency_service.score(transcript, sentiment_result)
+        emotion_result = emotion_task.result()
+        fraud_result = fraud_task.result()
+        memory_context = memory_task.result()
+        audio_response_bytes = speech_task.result()
 
         analysis = {
             "sentiment": sentiment_result["sentiment"],
@@ -115,9 +186,11 @@ class SessionService:
             "urgency_label": urgency_service.get_urgency_label(urgency_score),
             "fraud_risk": fraud_result["fraud_risk"],
             "fraud_signals": fraud_result["fraud_signals"],
+            "fraud_segments": fraud_result["flagged_segments"],
             "escalation_required": fraud_result["escalation_required"] or urgency_score > settings.URGENCY_ALERT_THRESHOLD,
             "emotion": emotion_result,
             "memory_context": memory_context,
+            "degraded_stages": degraded,
         }
 
         message_id = await self._store_message(
@@ -127,7 +200,9 @@ class SessionService:
             response=response_text,
             analysis=analysis,
             audio_path=str(audio_path) if audio_path else None,
+            fraud_features=fraud_result["message_features"],
         )
+        asyncio.create_task(self._remember_utterance(session_id, transcript))
 
         await self._update_session_peaks(session_id, analysis)
 
@@ -142,38 +217,50 @@ class SessionService:
             asyncio.create_task(n8n_service.trigger_alert(session_id, trigger_reason, analysis, {"channel": "web"}))
 
         processing_time_ms = int((time.time() - start_time) * 1000)
+        logger.info("turn_complete", session_id=session_id, processing_time_ms=processing_time_ms, stage_timings_ms=timings, degraded_stages=degraded)
         return {
             "message_id": str(message_id),
             "transcript": transcript,
             "response_text": response_text,
+            "clean_response": clean_response,
+            "actions": actions,
             "audio_bytes": audio_response_bytes,
             "analysis": analysis,
             "processing_time_ms": processing_time_ms,
+            "stage_timings_ms": timings,
+            "degraded_stages": degraded,
             "transcription_meta": {
                 "language": transcription.get("language"),
                 "duration_seconds": transcription.get("duration_seconds"),
                 "word_count": transcription.get("word_count"),
+                "segments": segments,
             },
         }
 
     async def process_text_message(self, session_id: str, text: str) -> dict:
         start_time = time.time()
         transcript = text
-        db = await get_database()
-        history = await self.get_session_history(session_id)
-        session_doc = await db.voice_sessions.find_one({"session_id": session_id})
-        uid = str(session_doc.get("user_id")) if session_doc else None
-        memory_context = ""
-        if uid:
-            try:
-                memory_context = (await memory_engine.recall(db, uid, transcript, top_k=3)).get("memory_context", "")
-            except Exception:
-                memory_context = ""
-        response_text = await openrouter_service.chat(transcript, await self._build_ollama_history(history), SYSTEM_PROMPT)
-        sentiment_result = sentiment_service.analyze(transcript)
+        timings: dict[str, int] = {}
+        degraded: list[str] = []
+        budget = self._budget(timings, degraded, time.perf_counter() + settings.TURN_DEADLINE_MS / 1000)
+        async with asyncio.TaskGroup() as tg:
+            # Required input (LLM context, fraud state), so it is awaited in full rather than budgeted
+            history_task = tg.create_task(self._timed(timings, "history", self.get_session_history(session_id)))
+            memory_task = tg.create_task(budget("memory", self._recall_memory(session_id, transcript), lambda: self._memory_cache.get(session_id, "")))
+            sentiment_task = tg.create_task(budget("sentiment", sentiment_service.analyze(transcript), sentiment_service.fallback_result))
+            duplicate_task = tg.create_task(budget("duplicates", self._find_duplicate(session_id, transcript), lambda: None))
+            history = await history_task
+            llm_task = tg.create_task(
+                self._timed(timings, "llm", openrouter_service.chat(transcript, await self._build_ollama_history(history), SYSTEM_PROMPT))
+            )
+            duplicate = await duplicate_task
+            fraud_result = self._timed_call(timings, "fraud", fraud_service.evaluate, transcript, history, None, None, session_id, duplicate)
+            emotion_result = self._timed_call(timings, "emotion", emotion_service._text_only_fallback, transcript)
+
+        response_text = llm_task.result()
+        memory_context = memory_task.result()
+        sentiment_result = sentiment_task.result()
         urgency_score = urgency_service.score(transcript, sentiment_result)
-        fraud_result = fraud_service.evaluate(transcript, history)
-        emotion_result = emotion_service._text_only_fallback(transcript)
 
         analysis = {
             "sentiment": sentiment_result["sentiment"],
@@ -186,9 +273,11 @@ class SessionService:
             "escalation_required": fraud_result["escalation_required"] or urgency_score > settings.URGENCY_ALERT_THRESHOLD,
             "emotion": emotion_result,
             "memory_context": memory_context,
+            "degraded_stages": degraded,
         }
 
-        message_id = await self._store_message(session_id, "user", transcript, response_text, analysis, None)
+        message_id = await self._store_message(session_id, "user", transcript, response_text, analysis, None, fraud_result["message_features"])
+        asyncio.create_task(self._remember_utterance(session_id, transcript))
         await self._update_session_peaks(session_id, analysis)
 
         if analysis["escalation_required"]:
@@ -201,9 +290,152 @@ class SessionService:
             "audio_bytes": None,
             "analysis": analysis,
             "processing_time_ms": int((time.time() - start_time) * 1000),
+            "stage_timings_ms": timings,
+            "degraded_stages": degraded,
         }
 
+    async def _timed(self, timings: dict[str, int], stage: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = int((time.perf_counter() - start) * 1000)
+
+    def _budget(self, timings: dict[str, int], degraded: list[str], deadline: float):
+        """Bind a turn's bookkeeping; returns ``run(stage, awaitable, fallback)``.
+
+        A stage gets min(its STAGE_BUDGETS_MS entry, time left before ``deadline``). On overrun the
+        stage keeps running in the background (so e.g. the memory cache still refreshes) and the
+        turn continues with ``fallback()``.
+        """
+
+        async def run(stage: str, awaitable, fallback: Callable[[], Any]):
+            task = asyncio.ensure_future(self._timed(timings, stage, awaitable))
+            stage_budget = settings.STAGE_BUDGETS_MS.get(stage)
+            if stage_budget is None:
+                return await task
+            timeout = max(min(stage_budget / 1000, deadline - time.perf_counter()), 0)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), timeout)
+            except TimeoutError:
+                task.add_done_callback(_discard_result)
+                degraded.append(stage)
+                logger.warning("turn_stage_degraded", stage=stage, budget_ms=int(timeout * 1000))
+                return fallback()
+
+        return run
+
+    def _timed_call(self, timings: dict[str, int], stage: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[stage] = int((time.perf_counter() - start) * 1000)
+
+    async def _session_user_id(self, session_id: str) -> str | None:
+        if session_id in self._user_ids:
+            self._user_ids.move_to_end(session_id)
+            return self._user_ids[session_id]
+        db = await get_database()
+        session_doc = await db.voice_sessions.find_one({"session_id": session_id})
+        uid = str(session_doc.get("user_id")) if session_doc and session_doc.get("user_id") else None
+        _remember(self._user_ids, session_id, uid, self.MAX_SESSIONS)
+        return uid
+
+    async def _find_duplicate(self, session_id: str, transcript: str) -> dict | None:
+        """Near-duplicate of this utterance from one of the user's other recent sessions."""
+        uid = await self._session_user_id(session_id)
+        if not uid:
+            return None
+        return await near_duplicate_index.find(await get_database(), uid, transcript, exclude_session=session_id)
+
+    async def _remember_utterance(self, session_id: str, transcript: str) -> None:
+        uid = await self._session_user_id(session_id)
+        if uid:
+            await near_duplicate_index.add(await get_database(), uid, session_id, transcript)
+
+    async def _recall_memory(self, session_id: str, transcript: str) -> str:
+        db = await get_database()
+        uid = await self._session_user_id(session_id)
+        if not uid:
+            return ""
+        try:
+            memory_context = (await memory_engine.recall(db, uid, transcript, top_k=3)).get("memory_context", "")
+        except Exception:
+            return self._memory_cache.get(session_id, "")
+        _remember(self._memory_cache, session_id, memory_context, self.MAX_SESSIONS)
+        return memory_context
+
+    async def _generate_response(
+        self,
+        transcript: str,
+        history: list[dict],
+        on_event: EventSink | None = None,
+        speech_queue: asyncio.Queue | None = None,
+    ) -> tuple[str, str, list[dict]]:
+        """Returns (raw response, response with action tags stripped, actions).
+
+        When streaming, completed sentences of the clean text are pushed onto ``speech_queue``
+        (terminated by ``None``) for synthesis.
+        """
+        ollama_history = await self._build_ollama_history(history)
+        if on_event is None:
+            response_text = await openrouter_service.chat(transcript, ollama_history, SYSTEM_PROMPT)
+            clean_response, actions = extract_actions(response_text)
+            return response_text, clean_response, actions
+
+        parser = ActionStreamParser()
+        splitter = SentenceSplitter()
+        raw_parts: list[str] = []
+        clean_parts: list[str] = []
+
+        async def forward(text: str):
+            clean_parts.append(text)
+            await on_event({"type": "response_chunk", "text": text})
+            if speech_queue is not None:
+                for sentence in splitter.feed(text):
+                    speech_queue.put_nowait(sentence)
+
+        try:
+            async for token in openrouter_service.chat_stream(transcript, ollama_history, SYSTEM_PROMPT):
+                raw_parts.append(token)
+                text, found = parser.feed(token)
+                if found:
+                    await on_event({"type": "execute_actions", "actions": found})
+                if text:
+                    await forward(text)
+            tail = parser.flush()
+            if tail:
+                await forward(tail)
+        finally:
+            if speech_queue is not None:
+                for sentence in splitter.flush():
+                    speech_queue.put_nowait(sentence)
+                speech_queue.put_nowait(None)
+        return "".join(raw_parts), "".join(clean_parts).strip(), parser.actions
+
+    async def _stream_speech(self, speech_queue: asyncio.Queue, on_event: EventSink) -> bytes:
+        """Synthesize queued sentences in order, emitting audio as it is produced; returns the full audio."""
+
+        async def sentences():
+            while (sentence := await speech_queue.get()) is not None:
+                yield sentence
+
+        audio = bytearray()
+        async for chunk in tts_service.synthesize_stream(sentences()):
+            audio += chunk
+            await on_event({"type": "audio_chunk", "data": chunk})
+        if not audio:
+            silence = tts_service._generate_silent_wav(0.5)
+            await on_event({"type": "audio_chunk", "data": silence})
+            return silence
+        return bytes(audio)
+
     async def end_session(self, session_id: str) -> dict:
+        self._memory_cache.pop(session_id, None)
+        self._user_ids.pop(session_id, None)
+        whisper_service.end_session(session_id)
+        fraud_service.end_session(session_id)
         db = await get_database()
         messages = await db.messages.find({"session_id": session_id, "role": "user"}).sort("timestamp", 1).to_list(length=500)
         final_sentiment = messages[-1]["sentiment"] if messages else "neutral"
@@ -235,7 +467,16 @@ class SessionService:
                 history.append({"role": "assistant", "content": msg.get("transcript", "")})
         return history[-20:]
 
-    async def _store_message(self, session_id: str, role: str, transcript: str, response: str, analysis: dict, audio_path: str | None):
+    async def _store_message(
+        self,
+        session_id: str,
+        role: str,
+        transcript: str,
+        response: str,
+        analysis: dict,
+        audio_path: str | None,
+        fraud_features: dict | None = None,
+    ):
         db = await get_database()
         now = datetime.now(timezone.utc)
         user_doc = {
@@ -249,12 +490,15 @@ class SessionService:
             "urgency_score": analysis["urgency_score"],
             "fraud_risk": analysis["fraud_risk"],
             "fraud_signals": analysis.get("fraud_signals", []),
+            # Topic flags of this message, so later turns never re-scan it (see FraudService.record_message)
+            "fraud_features": fraud_features if fraud_features is not None else fraud_service.message_features(transcript),
             "emotion": analysis.get("emotion"),
             "escalation_required": analysis["escalation_required"],
             "processing_time_ms": 0,
             "timestamp": now,
         }
         result = await db.messages.insert_one(user_doc)
+        fraud_service.record_message(session_id, result.inserted_id, role, transcript, user_doc["fraud_features"])
         return result.inserted_id
 
     async def _update_session_peaks(self, session_id: str, analysis: dict):
@@ -1,3 +1,5 @@
+from utils.text_signals import text_scanner
+
 CRITICAL_KEYWORDS = [
     "emergency", "urgent", "critical", "immediately", "right now", "dying", "heart attack", "can't breathe", "fire", "danger", "help me", "please hurry", "asap", "life or death",
 ]
@@ -5,22 +7,20 @@ HIGH_KEYWORDS = ["important", "serious", "worried", "scared", "panicking", "need
 MEDIUM_KEYWORDS = ["problem", "issue", "concerned", "worried", "trouble", "not working", "broken", "failed", "error", "wrong"]
 TIME_PRESSURE_PHRASES = ["by tonight", "before tomorrow", "in the next hour", "deadline", "running out of time", "limited time", "expires soon"]
 
+text_scanner.add_keywords("urgency.critical", CRITICAL_KEYWORDS)
+text_scanner.add_keywords("urgency.high", HIGH_KEYWORDS)
+text_scanner.add_keywords("urgency.medium", MEDIUM_KEYWORDS)
+text_scanner.add_keywords("urgency.time_pressure", TIME_PRESSURE_PHRASES)
+
 
 def score(transcript: str, sentiment_result: dict) -> float:
-    text_lower = (transcript or "").lower()
+    signals = text_scanner.scan(transcript or "")
     value = 0.0
 
-    critical_matches = [kw for kw in CRITICAL_KEYWORDS if kw in text_lower]
-    value += min(len(critical_matches) * 0.4, 0.8)
-
-    high_matches = [kw for kw in HIGH_KEYWORDS if kw in text_lower]
-    value += min(len(high_matches) * 0.2, 0.4)
-
-    medium_matches = [kw for kw in MEDIUM_KEYWORDS if kw in text_lower]
-    value += min(len(medium_matches) * 0.1, 0.2)
-
-    time_matches = [p for p in TIME_PRESSURE_PHRASES if p in text_lower]
-    value += min(len(time_matches) * 0.15, 0.3)
+    value += min(signals.count("urgency.critical") * 0.4, 0.8)
+    value += min(signals.count("urgency.high") * 0.2, 0.4)
+    value += min(signals.count("urgency.medium") * 0.1, 0.2)
+    value += min(signals.count("urgency.time_pressure") * 0.15, 0.3)
 
     if transcript.count("!") >= 3:
         value += 0.1
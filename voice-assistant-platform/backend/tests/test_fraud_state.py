@@ -0,0 +1,152 @@
+import itertools
+import random
+
+import pytest
+
+from services.fraud_service import FraudService, SessionFraudState
+
+WORDS = (
+    "help me I need the otp code 123456 bank account password verify your identity refund transfer "
+    "card number cvv send it right away locked pin 4821 ssn one time reset change weather today"
+).split()
+_ids = itertools.count(1)
+
+
+@pytest.fixture
+def service():
+    return FraudService()
+
+
+@pytest.fixture
+def builds(service, monkeypatch):
+    """Counts how often the session state is rebuilt from history."""
+    calls = []
+    original = service._build_state
+
+    def counting(history):
+        calls.append(len(history))
+        return original(history)
+
+    monkeypatch.setattr(service, "_build_state", counting)
+    return calls
+
+
+def message(service: FraudService, transcript: str, role: str = "user", with_features: bool = True) -> dict:
+    doc = {"_id": next(_ids), "role": role, "transcript": transcript}
+    if with_features:
+        doc["fraud_features"] = service.message_features(transcript)
+    return doc
+
+
+def store(service: FraudService, session_id: str, history: list[dict], doc: dict) -> None:
+    """What SessionService._store_message does after the insert."""
+    history.append(doc)
+    service.record_message(session_id, doc["_id"], doc["role"], doc["transcript"], doc["fraud_features"])
+
+
+def without_features(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k != "message_features"}
+
+
+def test_incremental_state_scores_like_a_rebuild(service, builds):
+    reference = FraudService()
+    rng = random.Random(3)
+    for session in range(30):
+        session_id, history = f"s{session}", []
+        for _ in range(rng.randint(1, 25)):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+            incremental = service.evaluate(text, history, session_id=session_id)
+            rebuilt = reference.evaluate(text, history)
+            assert without_features(incremental) == without_features(rebuilt)
+            store(service, session_id, history, message(service, text, role=rng.choice(["user", "user", "assistant"])))
+    # Each session is built once, from its empty history, then only advanced
+    assert builds == [0] * 30
+
+
+def test_state_is_reused_while_in_step(service, builds):
+    history = []
+    for text in ["hello there", "please send the otp", "my account is locked"]:
+        service.evaluate(text, history, session_id="s")
+        store(service, "s", history, message(service, text))
+    assert builds == [0]
+
+
+def test_otp_history_window_counts_user_messages_in_the_last_ten(service):
+    history = [message(service, "read me the otp") for _ in range(12)]
+    history[-1] = message(service, "read me the otp", role="assistant")
+    state = service._state("s", history)
+    assert state.otp_count == 9
+    result = service.evaluate("the otp is 1234", history, session_id="s")
+    assert result["fraud_risk"] == 1.0
+    assert service._state("s", history) is state
+
+
+def test_topics_only_cover_the_last_five_user_messages(service):
+    history = [message(service, "send the otp"), message(service, "verify your identity")]
+    history += [message(service, "weather today please") for _ in range(4)]
+    history.append(message(service, "I want a refund"))
+    state = service._state("s", history)
+    assert set(+state.topic_counts) == {"financial"}
+    assert state.topic_count == 1
+
+    history.append(message(service, "reset my password"))
+    assert service._state("s", history).topic_count == 2
+
+
+def test_repetition_compares_the_last_three_user_messages(service):
+    history = [message(service, "what is my balance please")]
+    history += [message(service, f"unrelated question number {i}") for i in range(3)]
+    assert "repeated_similar_queries" not in service.evaluate("what is my balance please", history, session_id="s")["fraud_signals"]
+    history.append(message(service, "what is my balance please"))
+    assert "repeated_similar_queries" in service.evaluate("what is my balance please", history, session_id="s")["fraud_signals"]
+
+
+def test_messages_stored_by_another_worker_trigger_a_rebuild(service, builds):
+    history = []
+    service.evaluate("hello", history, session_id="s")
+    store(service, "s", history, message(service, "hello"))
+    # Stored elsewhere: this worker never saw record_message for it
+    history.append(message(service, "send the otp now"))
+    result = service.evaluate("the otp", history, session_id="s")
+    assert builds == [0, 2]
+    assert without_features(result) == without_features(service.evaluate("the otp", history))
+
+
+def test_history_without_ids_is_never_trusted(service, builds):
+    history = [{"role": "user", "transcript": "send the otp"}]
+    service.evaluate("hi", history, session_id="s")
+    service.evaluate("hi", history, session_id="s")
+    assert builds == [1, 1]
+
+
+def test_stored_features_are_used_instead_of_rescanning(service):
+    flagged = {"otp": True, "account": False, "sensitive": False, "financial": False}
+    history = [{"_id": next(_ids), "role": "user", "transcript": "nothing suspicious", "fraud_features": flagged}]
+    assert service._state("s", history).otp_count == 1
+    legacy = [message(service, "send the otp", with_features=False)]
+    assert service._state("legacy", legacy).otp_count == 1
+
+
+def test_record_message_ignores_unknown_sessions(service):
+    service.record_message("unknown", 1, "user", "send the otp", service.message_features("send the otp"))
+    assert "unknown" not in service._sessions
+
+
+def test_sessions_are_bounded_and_can_be_ended(service, monkeypatch):
+    monkeypatch.setattr(FraudService, "MAX_SESSIONS", 2)
+    for session_id in ("a", "b", "c"):
+        service._state(session_id, [])
+    assert list(service._sessions) == ["b", "c"]
+    service.end_session("b")
+    assert list(service._sessions) == ["c"]
+
+
+def test_window_eviction_keeps_counters_consistent():
+    state = SessionFraudState()
+    features = [{"otp": i % 3 == 0, "financial": i % 2 == 0} for i in range(40)]
+    for i, feature in enumerate(features):
+        state.push(i, "user", f"message {i}", feature)
+    assert state.otp_count == sum(f["otp"] for f in features[-SessionFraudState.OTP_WINDOW :])
+    recent = features[-SessionFraudState.TOPIC_WINDOW :]
+    assert state.topic_count == len({topic for f in recent for topic, on in f.items() if on})
+    assert list(state.texts) == [f"message {i}" for i in range(37, 40)]
@@ -0,0 +1,99 @@
+import asyncio
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from config import settings
+from models.asr_scheduler import ASRScheduler
+from models.model_executor import ModelExecutor
+from models.model_loader import ModelLoader
+from models.model_registry import model_registry
+
+_names = itertools.count()
+
+
+class FakeModel:
+    def __init__(self, executor=None, **loader_options):
+        self.loaded = False
+        self.loads = 0
+        self.loader = ModelLoader(
+            f"fake-{next(_names)}",
+            self.load,
+            lambda: self.loaded,
+            unload=self.unload,
+            memory_mb=lambda: 100.0 if self.loaded else 0.0,
+            executor=executor,
+            **loader_options,
+        )
+
+    async def load(self):
+        self.loaded = True
+        self.loads += 1
+
+    def unload(self):
+        self.loaded = False
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_IDLE_UNLOAD_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "MODEL_MEMORY_BUDGET_MB", 0)
+    monkeypatch.setattr(settings, "MODEL_PINNED", [])
+    before = dict(model_registry.loaders)
+    yield model_registry
+    model_registry.loaders = before
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_model_in_steady_use_survives_the_idle_reaper(registry):
+    model = FakeModel(ModelExecutor("fake", threads=1))
+
+    async def scenario():
+        await model.loader.ensure()
+        # Requests keep arriving for well past the idle timeout, always through the executor
+        for _ in range(10):
+            await model.loader.executor.run(time.sleep, 0.01)
+            await asyncio.sleep(0.04)
+            await registry.unload_idle()
+            assert model.loader.ready
+        await asyncio.sleep(0.25)
+        await registry.unload_idle()
+
+    run(scenario())
+    assert not model.loaded and model.loads == 1
+
+
+def test_process_pool_batches_count_as_use(registry):
+    scheduler = ASRScheduler("fake", max_wait_ms=0)
+    scheduler.bind(lambda audios, options: [{"text": ""} for _ in audios])
+    model = FakeModel(last_used=lambda: scheduler.last_used)
+
+    async def scenario():
+        await model.loader.ensure()
+        for _ in range(10):
+            await scheduler.submit(np.zeros(16000, dtype=np.float32))
+            await asyncio.sleep(0.04)
+            await registry.unload_idle()
+            assert model.loader.ready
+
+    run(scenario())
+
+
+def test_budget_evicts_the_least_recently_used_model(registry, monkeypatch):
+    first, second = FakeModel(ModelExecutor("first")), FakeModel(ModelExecutor("second"))
+
+    async def scenario():
+        await first.loader.ensure()
+        await second.loader.ensure()
+        # Loaded first but used last
+        await first.loader.executor.run(lambda: None)
+        monkeypatch.setattr(settings, "MODEL_MEMORY_BUDGET_MB", 150)
+        await registry.enforce_budget()
+
+    run(scenario())
+    assert first.loaded and not second.loaded
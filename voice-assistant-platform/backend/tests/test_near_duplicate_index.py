@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import settings
+from services import near_duplicate_index as ndi
+from services.near_duplicate_index import NUM_PERM, NearDuplicateIndex, fingerprint
+
+BASE = "please transfer five hundred dollars from my savings account to the new payee today"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query):
+        since = query["created_at"]["$gt"]
+        return FakeCursor([d for d in self.docs if d["user_id"] == query["user_id"] and d["created_at"] > since])
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+
+class FakeDb:
+    def __init__(self):
+        self.fraud_fingerprints = FakeCollection()
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_THRESHOLD", 0.8)
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_WINDOW_DAYS", 7)
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_MAX_PER_USER", 100)
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_REFRESH_SECONDS", 60)
+
+
+def shingles(text: str) -> set[str]:
+    normalized = " ".join(text.lower().split())
+    return {normalized[i : i + 4] for i in range(len(normalized) - 3)}
+
+
+def test_short_text_has_no_fingerprint():
+    assert fingerprint("yes okay thanks") is None
+    assert fingerprint("!!! ??? ... ,,, ;;; :::") is None
+
+
+def test_fingerprint_is_deterministic_and_ignores_case_and_punctuation():
+    signature = fingerprint(BASE)
+    assert signature.shape == (NUM_PERM,)
+    assert (signature == fingerprint(BASE.upper() + "!!")).all()
+
+
+def test_signature_agreement_estimates_shingle_jaccard():
+    variants = [BASE.replace("five hundred", "five thousand"), BASE + " before noon", BASE.replace("savings", "checking")]
+    for other in variants:
+        true = len(shingles(BASE) & shingles(other)) / len(shingles(BASE) | shingles(other))
+        estimate = (fingerprint(BASE) == fingerprint(other)).mean()
+        # Standard error at 64 permutations is about 0.06
+        assert abs(estimate - true) < 0.2
+    assert (fingerprint(BASE) == fingerprint("what is the weather going to be like in paris tomorrow")).mean() < 0.2
+
+
+def test_finds_repeats_from_other_sessions_only():
+    db, index = FakeDb(), NearDuplicateIndex()
+    run(index.add(db, "u1", "s1", BASE))
+    match = run(index.find(db, "u1", BASE + " please", exclude_session="s2"))
+    assert match["session_id"] == "s1"
+    assert match["similarity"] >= settings.FRAUD_DUPLICATE_THRESHOLD
+    assert run(index.find(db, "u1", BASE, exclude_session="s1")) is None
+    assert run(index.find(db, "u2", BASE, exclude_session="s2")) is None
+
+
+def test_threshold_is_respected(monkeypatch):
+    db, index = FakeDb(), NearDuplicateIndex()
+    run(index.add(db, "u1", "s1", BASE))
+    similar = BASE.replace("savings", "checking")
+    similarity = round(float((fingerprint(BASE) == fingerprint(similar)).mean()), 3)
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_THRESHOLD", similarity)
+    assert run(index.find(db, "u1", similar, exclude_session="s2"))["similarity"] == similarity
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_THRESHOLD", similarity + 0.01)
+    assert run(index.find(db, "u1", similar, exclude_session="s2")) is None
+
+
+def test_add_persists_the_signature_with_a_ttl():
+    db, index = FakeDb(), NearDuplicateIndex()
+    run(index.add(db, "u1", "s1", BASE))
+    run(index.add(db, "u1", "s1", "too short"))
+    (doc,) = db.fraud_fingerprints.docs
+    assert "text" not in doc and doc["signature"] == fingerprint(BASE).tobytes()
+    assert doc["expires_at"] - doc["created_at"] == timedelta(days=7)
+
+
+def test_other_workers_see_writes_after_a_refresh(monkeypatch):
+    db, writer, reader = FakeDb(), NearDuplicateIndex(), NearDuplicateIndex()
+    assert run(reader.find(db, "u1", BASE, exclude_session="s2")) is None
+    run(writer.add(db, "u1", "s1", BASE))
+    # Within the refresh interval the reader still answers from memory
+    assert run(reader.find(db, "u1", BASE, exclude_session="s2")) is None
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_REFRESH_SECONDS", -1)
+    assert run(reader.find(db, "u1", BASE, exclude_session="s2"))["session_id"] == "s1"
+    assert reader.get_stats()["loads"] == 2
+
+
+def test_load_ignores_fingerprints_outside_the_window():
+    db, index = FakeDb(), NearDuplicateIndex()
+    old = datetime.now(timezone.utc) - timedelta(days=8)
+    run(db.fraud_fingerprints.insert_one({"_id": 1, "user_id": "u1", "session_id": "s1", "signature": fingerprint(BASE).tobytes(), "created_at": old}))
+    assert run(index.find(db, "u1", BASE, exclude_session="s2")) is None
+
+
+def test_entries_expire_from_memory(monkeypatch):
+    db, index = FakeDb(), NearDuplicateIndex()
+    run(index.find(db, "u1", BASE, exclude_session="s2"))
+    run(index.add(db, "u1", "s1", BASE))
+    later = ndi.time.time() + 8 * 86400
+    monkeypatch.setattr(ndi.time, "time", lambda: later)
+    assert run(index.find(db, "u1", BASE, exclude_session="s2")) is None
+    assert index.get_stats()["entries"] == 0
+    assert index._users["u1"].buckets == {}
+
+
+def test_per_user_cap_drops_the_oldest_entries(monkeypatch):
+    monkeypatch.setattr(settings, "FRAUD_DUPLICATE_MAX_PER_USER", 2)
+    db, index = FakeDb(), NearDuplicateIndex()
+    run(index.find(db, "u1", BASE, exclude_session="s0"))
+    texts = [BASE, "what is the weather going to be like in paris tomorrow", "remind me to call my sister on sunday evening"]
+    for i, text in enumerate(texts):
+        run(index.add(db, "u1", f"s{i}", text))
+    user = index._users["u1"]
+    assert [session for session, _, _ in user.entries.values()] == ["s1", "s2"]
+    assert run(index.find(db, "u1", BASE, exclude_session="s9")) is None
+    assert set().union(*user.buckets.values()) == set(user.entries)
+
+
+def test_users_are_bounded(monkeypatch):
+    monkeypatch.setattr(NearDuplicateIndex, "MAX_USERS", 2)
+    db, index = FakeDb(), NearDuplicateIndex()
+    for user_id in ("a", "b", "c"):
+        run(index.find(db, user_id, BASE))
+    assert list(index._users) == ["b", "c"]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from ws import protocol
+
+
+def test_audio_frame_round_trip():
+    frame = protocol.encode_audio(b"\x01\x02\x03\x04", seq=7, final=True)
+    kind, flags, seq, payload = protocol.decode_frame(frame)
+    assert (kind, flags, seq) == (protocol.KIND_AUDIO, protocol.FLAG_END, 7)
+    assert bytes(payload) == b"\x01\x02\x03\x04"
+
+
+def test_header_layout_is_big_endian():
+    frame = protocol.encode_frame(protocol.KIND_AUDIO, b"", seq=0x01020304, flags=0)
+    assert frame == bytes([protocol.KIND_AUDIO, 0, 1, 2, 3, 4])
+
+
+def test_sequence_wraps_at_32_bits():
+    _, _, seq, _ = protocol.decode_frame(protocol.encode_audio(b"", seq=protocol.MAX_SEQUENCE + 6))
+    assert seq == 5
+
+
+def test_decode_payload_is_a_view_not_a_copy():
+    frame = bytearray(protocol.encode_audio(b"abc", seq=1))
+    _, _, _, payload = protocol.decode_frame(frame)
+    frame[-1] = ord("z")
+    assert bytes(payload) == b"abz"
+
+
+@pytest.mark.parametrize("data", [b"", b"\x01\x00\x00"])
+def test_short_frame_is_rejected(data):
+    with pytest.raises(protocol.FrameError):
+        protocol.decode_frame(data)
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(protocol.FrameError):
+        protocol.decode_frame(protocol.encode_frame(0x7F, b"", seq=0))
+
+
+def test_control_round_trip():
+    message = {"type": "hello", "protocol": "binary", "n": 3}
+    kind, flags, _, payload = protocol.decode_frame(protocol.encode_control(message, seq=1))
+    assert kind == protocol.KIND_CONTROL
+    assert protocol.decode_control(payload, flags) == message
+
+
+def test_control_falls_back_to_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(protocol, "msgpack", None)
+    assert protocol.control_codec() == protocol.PROTOCOL_JSON
+    _, flags, _, payload = protocol.decode_frame(protocol.encode_control({"type": "ping"}, seq=2))
+    assert flags & protocol.FLAG_JSON
+    assert json.loads(bytes(payload)) == {"type": "ping"}
+    assert protocol.decode_control(payload, flags) == {"type": "ping"}
+
+
+def test_json_flag_is_honoured_even_with_msgpack():
+    payload = json.dumps({"type": "end_stream"}).encode()
+    assert protocol.decode_control(payload, protocol.FLAG_JSON) == {"type": "end_stream"}
+
+
+def test_msgpack_control_round_trip_with_bytes():
+    msgpack = pytest.importorskip("msgpack")
+    message = {"type": "audio_chunk", "data": b"\x00\xff"}
+    _, flags, _, payload = protocol.decode_frame(protocol.encode_control(message, seq=3))
+    assert not flags & protocol.FLAG_JSON
+    assert msgpack.unpackb(payload, raw=False) == message
+    assert protocol.decode_control(payload, flags) == message
+
+
+@pytest.mark.parametrize("payload", [b"\xff\xfe not json", json.dumps([1, 2]).encode()])
+def test_bad_control_payload_is_rejected(payload):
+    with pytest.raises(protocol.FrameError):
+        protocol.decode_control(payload, protocol.FLAG_JSON)
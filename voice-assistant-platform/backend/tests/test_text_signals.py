@@ -0,0 +1,112 @@
+import random
+import re
+
+import pytest
+
+from services import urgency_service
+from services.fraud_service import FraudService
+from utils import text_signals
+from utils.text_signals import KeywordAutomaton, TextScanner
+
+FRAUD_PATTERNS = {
+    "fraud.otp": FraudService.OTP_PATTERNS,
+    "fraud.account_takeover": FraudService.ACCOUNT_TAKEOVER_PATTERNS,
+    "fraud.sensitive": FraudService.SENSITIVE_DATA_PATTERNS,
+}
+WORDS = (
+    "send me the otp code one time password verify your identity reset my password ssn 123-45-6789 "
+    "4111 1111 1111 1111 pin 48213 help me emergency right now worried not working deadline bank "
+    "cvv number full card number mother maiden forgot account the a please it"
+).split()
+
+
+def random_texts(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 20))) for _ in range(count)]
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    monkeypatch.setattr(text_signals, "ahocorasick", None)
+
+
+def test_fallback_automaton_matches_substring_search(pure_python):
+    rng = random.Random(1)
+    keywords = ["he", "she", "his", "hers", "a", "ab", "bab", "abab", "b"]
+    automaton = KeywordAutomaton(keywords)
+    for _ in range(500):
+        text = "".join(rng.choice("abhers ") for _ in range(rng.randint(0, 30)))
+        assert set(automaton.iter(text)) == {kw for kw in keywords if kw in text}
+
+
+def test_fallback_automaton_reports_every_occurrence(pure_python):
+    assert sorted(KeywordAutomaton(["aa", "a"]).iter("aaa")) == ["a", "a", "a", "aa", "aa"]
+
+
+def test_empty_automaton_matches_nothing(pure_python):
+    assert list(KeywordAutomaton([]).iter("anything")) == []
+
+
+def test_pattern_counts_match_findall_per_pattern():
+    scanner = TextScanner()
+    for category, patterns in FRAUD_PATTERNS.items():
+        scanner.add_patterns(category, patterns)
+    for text in random_texts(1000):
+        signals = scanner.scan(text)
+        for category, patterns in FRAUD_PATTERNS.items():
+            expected = {p: len(re.findall(p, text.lower(), flags=re.IGNORECASE)) for p in patterns}
+            expected = {p: n for p, n in expected.items() if n}
+            assert signals.pattern_matches(category) == (sum(expected.values()), list(expected))
+            assert signals.has(category) == bool(expected)
+
+
+def test_overlapping_patterns_are_counted_independently():
+    scanner = TextScanner()
+    scanner.add_patterns("fraud.otp", FraudService.OTP_PATTERNS)
+    total, matched = scanner.scan("please send the otp").pattern_matches("fraud.otp")
+    assert total == 2
+    assert matched == FraudService.OTP_PATTERNS[:2]
+
+
+def test_keyword_counts_match_distinct_substring_hits(pure_python):
+    scanner = TextScanner()
+    lists = {
+        "urgency.critical": urgency_service.CRITICAL_KEYWORDS,
+        "urgency.high": urgency_service.HIGH_KEYWORDS,
+        "urgency.medium": urgency_service.MEDIUM_KEYWORDS,
+    }
+    for category, words in lists.items():
+        scanner.add_keywords(category, words)
+    for text in random_texts(1000, seed=2):
+        signals = scanner.scan(text)
+        for category, words in lists.items():
+            # Shared keywords ("worried" is high and medium) count in every category that lists them
+            assert signals.count(category) == sum(w in text.lower() for w in set(words))
+
+
+def test_scan_is_case_insensitive_and_cached():
+    scanner = TextScanner()
+    scanner.add_keywords("urgency.critical", ["help me"])
+    first = scanner.scan("HELP ME please")
+    assert first.hits("urgency.critical") == ["help me"]
+    assert scanner.scan("HELP ME please") is first
+
+
+def test_registering_more_words_invalidates_cached_scans():
+    scanner = TextScanner()
+    scanner.add_keywords("a", ["alpha"])
+    assert not scanner.scan("beta").has("b")
+    scanner.add_keywords("b", ["beta"])
+    assert scanner.scan("beta").has("b")
+
+
+def test_registering_the_same_patterns_twice_does_not_double_counts():
+    scanner = TextScanner()
+    scanner.add_patterns("fraud.otp", FraudService.OTP_PATTERNS)
+    scanner.add_patterns("fraud.otp", FraudService.OTP_PATTERNS)
+    assert scanner.scan("otp").pattern_matches("fraud.otp")[0] == 1
+
+
+def test_unknown_category_is_empty():
+    signals = TextScanner().scan("anything")
+    assert (signals.count("missing"), signals.has("missing"), signals.pattern_matches("missing")) == (0, False, (0, []))
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+from models import transcription_cache
+from models.transcription_cache import DiskStore, TranscriptionCache, audio_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def entry_size(key: str, result: dict) -> int:
+    return len(key) + len(json.dumps(result))
+
+
+def test_audio_key_depends_on_audio_model_and_variant():
+    audio = b"\x01\x02" * 100
+    key = audio_key(audio, "whisper-base", "trim=True")
+    assert key == audio_key(memoryview(audio), "whisper-base", "trim=True")
+    assert key != audio_key(audio + b"\x00\x00", "whisper-base", "trim=True")
+    assert key != audio_key(audio, "whisper-tiny", "trim=True")
+    assert key != audio_key(audio, "whisper-base", "trim=False")
+
+
+def test_audio_key_fields_cannot_run_together():
+    assert audio_key(b"pcm", "model", "ab") != audio_key(b"pcm", "modela", "b")
+
+
+def test_miss_then_hit_returns_a_copy():
+    cache = TranscriptionCache(max_bytes=10_000, path="")
+    assert run(cache.get("k")) is None
+    run(cache.put("k", {"text": "hello"}))
+    first = run(cache.get("k"))
+    first["text"] = "changed"
+    assert run(cache.get("k")) == {"text": "hello"}
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.667)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    result = {"text": "x" * 20}
+    cache = TranscriptionCache(max_bytes=3 * entry_size("a", result), path="")
+    for key in "abc":
+        run(cache.put(key, result))
+    run(cache.get("a"))  # "b" is now the oldest
+    run(cache.put("d", result))
+    assert run(cache.get("b")) is None
+    assert all(run(cache.get(key)) is not None for key in "acd")
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_replacing_a_key_does_not_double_count_bytes():
+    cache = TranscriptionCache(max_bytes=10_000, path="")
+    run(cache.put("k", {"text": "short"}))
+    run(cache.put("k", {"text": "a bit longer"}))
+    assert cache.bytes == entry_size("k", {"text": "a bit longer"})
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_entry_larger_than_the_cache_is_not_stored():
+    cache = TranscriptionCache(max_bytes=50, path="")
+    run(cache.put("k", {"text": "x" * 100}))
+    assert cache.bytes == 0
+    assert run(cache.get("k")) is None
+
+
+def test_zero_size_disables_the_cache(tmp_path):
+    cache = TranscriptionCache(max_bytes=0, path=str(tmp_path / "cache.sqlite"))
+    assert not cache.enabled
+    assert cache.disk is None
+    run(cache.put("k", {"text": "hello"}))
+    assert run(cache.get("k")) is None
+
+
+def test_disk_store_is_shared_between_caches(tmp_path):
+    path = str(tmp_path / "nested" / "cache.sqlite")
+    writer = TranscriptionCache(max_bytes=10_000, path=path)
+    run(writer.put("k", {"text": "hello", "language": "en"}))
+
+    reader = TranscriptionCache(max_bytes=10_000, path=path)
+    assert run(reader.get("k")) == {"text": "hello", "language": "en"}
+    assert run(reader.get("k")) == {"text": "hello", "language": "en"}
+    stats = reader.get_stats()
+    assert (stats["disk_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_memory_clear_keeps_disk_entries(tmp_path):
+    cache = TranscriptionCache(max_bytes=10_000, path=str(tmp_path / "cache.sqlite"))
+    run(cache.put("k", {"text": "hello"}))
+    cache.clear()
+    assert cache.bytes == 0
+    assert run(cache.get("k")) == {"text": "hello"}
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_disk_store_keeps_only_the_newest_entries(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(transcription_cache.time, "time", lambda: float(next(clock)))
+    store = DiskStore(str(tmp_path / "cache.sqlite"), max_entries=3)
+    for i in range(5):
+        store.put(f"k{i}", {"text": str(i)})
+    assert [store.get(f"k{i}") for i in range(5)] == [None, None, {"text": "2"}, {"text": "3"}, {"text": "4"}]
+
+
+def test_unusable_disk_path_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = TranscriptionCache(max_bytes=10_000, path=str(blocker / "cache.sqlite"))
+    assert cache.disk is None
+    run(cache.put("k", {"text": "hello"}))
+    assert run(cache.get("k")) == {"text": "hello"}
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from models.tts_service import TTSService
+
+
+@pytest.fixture
+def tts(monkeypatch):
+    service = TTSService()
+
+    async def stream_audio(sentence):
+        for word in sentence.split():
+            await asyncio.sleep(0)
+            yield word.encode()
+
+    monkeypatch.setattr(service, "_stream_audio", stream_audio)
+    return service
+
+
+async def collect(stream) -> list[bytes]:
+    return [chunk async for chunk in stream]
+
+
+def test_audio_is_yielded_in_sentence_order(tts):
+    async def sentences():
+        for sentence in ["one two", "three", "four five"]:
+            yield sentence
+
+    assert asyncio.run(collect(tts.synthesize_stream(sentences()))) == [b"one", b"two", b"three", b"four", b"five"]
+
+
+def test_failing_sentence_source_raises_after_the_audio_so_far(tts):
+    chunks = []
+
+    async def sentences():
+        yield "first sentence"
+        raise RuntimeError("upstream reply failed")
+
+    async def consume():
+        async for chunk in tts.synthesize_stream(sentences()):
+            chunks.append(chunk)
+
+    with pytest.raises(RuntimeError, match="upstream reply failed"):
+        asyncio.run(consume())
+    assert chunks == [b"first", b"sentence"]
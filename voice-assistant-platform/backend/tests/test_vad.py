@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from utils.vad import SAMPLE_RATE, split_on_silence
+
+THRESHOLD = 0.01
+
+
+def speech(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 3000).astype(np.int16)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def check_covers(windows, total: int, max_samples: int) -> None:
+    """Windows stay within max_samples and their keep ranges tile [0, total) exactly."""
+    assert windows[0][2] == 0
+    assert windows[-1][1] == windows[-1][3] == total
+    for start, end, keep_start, keep_end in windows:
+        assert 0 <= start < end <= total
+        assert end - start <= max_samples
+        assert start <= keep_start < keep_end <= end
+    for previous, following in zip(windows, windows[1:]):
+        assert previous[3] == following[2]
+
+
+def test_short_audio_is_a_single_window():
+    samples = speech(5)
+    assert split_on_silence(samples, THRESHOLD, 10 * SAMPLE_RATE, SAMPLE_RATE) == [(0, len(samples), 0, len(samples))]
+
+
+def test_cuts_inside_a_pause():
+    samples = np.concatenate([speech(7), silence(1), speech(6, seed=1)])
+    max_samples = 10 * SAMPLE_RATE
+    windows = split_on_silence(samples, THRESHOLD, max_samples, SAMPLE_RATE)
+    check_covers(windows, len(samples), max_samples)
+    assert len(windows) == 2
+    cut = windows[0][1]
+    assert 7 * SAMPLE_RATE <= cut <= 8 * SAMPLE_RATE
+    # Windows cut in a pause meet exactly, without overlap
+    assert windows[1][0] == cut
+
+
+def test_short_pause_is_not_a_boundary():
+    samples = np.concatenate([speech(7), silence(0.1), speech(6, seed=1)])
+    windows = split_on_silence(samples, THRESHOLD, 10 * SAMPLE_RATE, SAMPLE_RATE, min_silence_ms=300)
+    assert windows[0][1] == 10 * SAMPLE_RATE
+
+
+def test_overlaps_without_a_pause():
+    samples = speech(25)
+    max_samples, overlap = 10 * SAMPLE_RATE, 2 * SAMPLE_RATE
+    windows = split_on_silence(samples, THRESHOLD, max_samples, overlap)
+    check_covers(windows, len(samples), max_samples)
+    for previous, following in zip(windows, windows[1:]):
+        assert previous[1] - following[0] == overlap
+        # Hand-over in the middle of the overlap
+        assert previous[3] == previous[1] - overlap // 2
+
+
+def test_long_recording_with_regular_pauses_only_cuts_in_pauses():
+    phrase = np.concatenate([speech(4), silence(0.6)])
+    samples = np.tile(phrase, 20)
+    max_samples = 10 * SAMPLE_RATE
+    windows = split_on_silence(samples, THRESHOLD, max_samples, SAMPLE_RATE)
+    check_covers(windows, len(samples), max_samples)
+    period = len(phrase)
+    for _, end, _, _ in windows[:-1]:
+        assert end % period >= 4 * SAMPLE_RATE
+
+
+@pytest.mark.parametrize("overlap", [10 * SAMPLE_RATE, 12 * SAMPLE_RATE, -1])
+def test_rejects_overlap_that_would_not_advance(overlap):
+    with pytest.raises(ValueError):
+        split_on_silence(speech(25), THRESHOLD, 10 * SAMPLE_RATE, overlap)
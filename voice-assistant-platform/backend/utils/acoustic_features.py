@@ -0,0 +1,265 @@
+"""
+Acoustic features for emotion scoring, computed directly on 16 kHz Int16 PCM.
+
+Pitch uses a frame-vectorized YIN (FFT difference function, cumulative mean
+normalisation, parabolic refinement) instead of librosa's pyin, which decodes
+an HMM over every frame and costs more CPU than transcription. Frame sizes match
+the librosa defaults the scoring thresholds were tuned with (2048-sample frames,
+hop 512), so the features stay comparable.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+FMIN = 65.41  # C2
+FMAX = 2093.0  # C7
+YIN_THRESHOLD = 0.1
+# Frames whose best CMND dip stays above this are treated as unvoiced
+VOICING_THRESHOLD = 0.35
+# Frames quieter than this (RMS on a [-1, 1] scale) are never voiced
+SILENCE_RMS = 0.005
+MIN_DURATION_SECONDS = 0.5
+
+
+def pcm_to_float(audio: bytes | memoryview | np.ndarray) -> np.ndarray:
+    samples = audio if isinstance(audio, np.ndarray) else np.frombuffer(audio, dtype=np.int16, count=len(audio) // 2)
+    return samples.astype(np.float32) / 32768.0
+
+
+def cap_duration(y: np.ndarray, max_samples: int, block_samples: int) -> np.ndarray:
+    """At most max_samples of y, taken as evenly spaced blocks so long recordings are sampled end to end."""
+    if max_samples <= 0 or len(y) <= max_samples:
+        return y
+    blocks = max(max_samples // block_samples, 1)
+    starts = np.linspace(0, len(y) - block_samples, blocks).astype(int)
+    return np.concatenate([y[s : s + block_samples] for s in starts])
+
+
+def frames(y: np.ndarray, frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """(n_frames, frame_length) strided view; no copy, no padding."""
+    if len(y) < frame_length:
+        return np.zeros((0, frame_length), dtype=y.dtype)
+    return sliding_window_view(y, frame_length)[::hop_length]
+
+
+def yin_f0(
+    y: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    fmin: float = FMIN,
+    fmax: float = FMAX,
+    frame_length: int = FRAME_LENGTH,
+    hop_length: int = HOP_LENGTH,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame F0 in Hz and a voiced mask, all frames processed in one batch of FFTs."""
+    framed = frames(y, frame_length, hop_length)
+    if not len(framed):
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=bool)
+    min_period = max(int(np.floor(sample_rate / fmax)), 1)
+    max_period = min(int(np.ceil(sample_rate / fmin)), frame_length // 2 - 1)
+    win = frame_length - max_period - 1
+
+    # Cross-correlation of each frame's first `win` samples with the frame at every lag
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + win)))
+    spectrum = np.fft.rfft(framed, n_fft, axis=1)
+    acf = np.fft.irfft(spectrum * np.conj(np.fft.rfft(framed[:, :win], n_fft, axis=1)), n_fft, axis=1)[:, : max_period + 1]
+
+    # Energy of the window starting at each lag, from a running sum of squares
+    power = np.concatenate([np.zeros((len(framed), 1), dtype=np.float64), np.cumsum(framed.astype(np.float64) ** 2, axis=1)], axis=1)
+    lags = np.arange(max_period + 1)
+    energy = power[:, lags + win] - power[:, lags]
+
+    diff = np.maximum(energy[:, :1] + energy - 2 * acf, 0.0)
+    # Cumulative mean normalised difference; d'(0) = 1
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+
+    search = cmnd[:, min_period : max_period + 1]
+    # First dip under the threshold that is a local minimum, else the global minimum
+    dips = (search[:, :-1] < YIN_THRESHOLD) & (search[:, :-1] <= search[:, 1:])
+    has_dip = dips.any(axis=1)
+    best = np.where(has_dip, dips.argmax(axis=1), search.argmin(axis=1))
+    rows = np.arange(len(framed))
+    tau = best + min_period
+
+    # Parabolic interpolation around the chosen lag
+    left = cmnd[rows, np.maximum(tau - 1, 1)]
+    centre = cmnd[rows, tau]
+    right = cmnd[rows, np.minimum(tau + 1, max_period)]
+    curvature = left - 2 * centre + right
+    shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (left - right) / np.where(curvature == 0, 1, curvature), 0.0)
+    refined = tau + np.clip(shift, -1.0, 1.0)
+
+    rms = np.sqrt(energy[:, 0] / win)
+    voiced = (centre < VOICING_THRESHOLD) & (rms > SILENCE_RMS)
+    f0 = (sample_rate / refined).astype(np.float32)
+    return np.where(voiced, f0, np.nan).astype(np.float32), voiced
+
+
+def rms_and_centroid(
+    y: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame RMS energy and spectral centroid (Hz, Hann-windowed magnitude spectrum)."""
+    framed = frames(y, frame_length, hop_length)
+    if not len(framed):
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    rms = np.sqrt(np.mean(np.square(framed, dtype=np.float32), axis=1))
+    magnitude = np.abs(np.fft.rfft(framed * np.hanning(frame_length).astype(np.float32), axis=1))
+    freqs = np.fft.rfftfreq(frame_length, 1.0 / sample_rate)
+    total = magnitude.sum(axis=1)
+    centroid = np.where(total > 0, magnitude @ freqs / np.maximum(total, 1e-12), 0.0)
+    return rms, centroid.astype(np.float32)
+
+
+def extract_features(audio: bytes | memoryview | np.ndarray, sample_rate: int = SAMPLE_RATE, max_seconds: float = 0.0) -> dict | None:
+    """Feature dict consumed by EmotionService._score_emotions, or None for clips under half a second.
+
+    ``duration`` is always the full clip length; with max_seconds set, the frame features are
+    computed on evenly spaced 5 s blocks totalling at most that much audio.
+    """
+    y = pcm_to_float(audio)
+    duration = len(y) / sample_rate
+    if duration < MIN_DURATION_SECONDS:
+        return None
+    y = cap_duration(y, int(max_seconds * sample_rate), 5 * sample_rate)
+
+    f0, voiced = yin_f0(y, sample_rate)
+    voiced_f0 = f0[voiced]
+    if len(voiced_f0):
+        pitch_mean = float(np.mean(voiced_f0))
+        pitch_std = float(np.std(voiced_f0))
+        tremor = float(np.mean(np.abs(np.diff(voiced_f0)))) if len(voiced_f0) > 1 else 0.0
+    else:
+        pitch_mean = pitch_std = tremor = 0.0
+
+    rms, centroid = rms_and_centroid(y, sample_rate)
+    silence_threshold = float(rms.max()) * 0.1 if len(rms) else 0.0
+    return {
+        "pitch_mean": pitch_mean,
+        "pitch_std": pitch_std,
+        "tremor": tremor,
+        "energy_rms": float(rms.mean()) if len(rms) else 0.0,
+        "pause_ratio": float(np.mean(rms < silence_threshold)) if len(rms) else 0.0,
+        "tone_brightness": float(centroid.mean()) if len(centroid) else 0.0,
+        "duration": duration,
+    }
+
+
+class RunningStat:
+    """Welford running mean / variance."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Merge a batch of values (Chan et al. parallel form of Welford's update)."""
+        n = len(values)
+        if not n:
+            return
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+
+class StreamingFeatures:
+    """extract_features() computed incrementally while the audio arrives.
+
+    ``feed`` takes Int16 PCM chunks of any size and analyses the complete frames among
+    them (the same frames the batch extractor sees); only running statistics are kept.
+    Pause ratio needs the loudest frame of the whole clip, so frame energies go into a
+    fixed log-spaced histogram. ``finalize`` only has the last unprocessed samples left to analyse.
+
+    ``take`` and ``analyze`` split ``feed`` so the cheap buffering can stay on the event
+    loop while the frame analysis runs elsewhere; blocks must be analysed in order.
+    """
+
+    RMS_BINS = np.logspace(-6, 0, 121)
+    MIN_BATCH_SAMPLES = SAMPLE_RATE // 2
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.samples = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self.pitch = RunningStat()
+        self.energy = RunningStat()
+        self.centroid = RunningStat()
+        self._tremor_sum = 0.0
+        self._tremor_count = 0
+        self._last_f0: float | None = None
+        self._rms_hist = np.zeros(len(self.RMS_BINS) + 1, dtype=np.int64)
+        self._rms_max = 0.0
+
+    def feed(self, chunk: bytes | memoryview) -> None:
+        block = self.take(chunk)
+        if block is not None:
+            self.analyze(block)
+
+    def take(self, chunk: bytes | memoryview) -> np.ndarray | None:
+        """Buffer a chunk; returns a block of whole frames once enough audio has accumulated."""
+        y = pcm_to_float(chunk)
+        self.samples += len(y)
+        self._pending = np.concatenate([self._pending, y]) if len(self._pending) else y
+        # Analysing a few dozen frames at a time amortises the per-call overhead
+        if len(self._pending) >= max(self.MIN_BATCH_SAMPLES, FRAME_LENGTH):
+            return self._take_frames()
+        return None
+
+    def _take_frames(self) -> np.ndarray | None:
+        n_frames = (len(self._pending) - FRAME_LENGTH) // HOP_LENGTH + 1 if len(self._pending) >= FRAME_LENGTH else 0
+        if n_frames <= 0:
+            return None
+        # Samples up to the last frame's end; the next frame starts at n_frames * hop
+        y = self._pending[: (n_frames - 1) * HOP_LENGTH + FRAME_LENGTH]
+        self._pending = self._pending[n_frames * HOP_LENGTH :].copy()
+        return y
+
+    def analyze(self, y: np.ndarray) -> None:
+        f0, voiced = yin_f0(y, self.sample_rate)
+        voiced_f0 = f0[voiced].astype(np.float64)
+        self.pitch.update(voiced_f0)
+        if len(voiced_f0):
+            steps = np.abs(np.diff(voiced_f0 if self._last_f0 is None else np.concatenate([[self._last_f0], voiced_f0])))
+            self._tremor_sum += float(steps.sum())
+            self._tremor_count += len(steps)
+            self._last_f0 = float(voiced_f0[-1])
+
+        rms, centroid = rms_and_centroid(y, self.sample_rate)
+        self.energy.update(rms.astype(np.float64))
+        self.centroid.update(centroid.astype(np.float64))
+        self._rms_hist += np.bincount(np.searchsorted(self.RMS_BINS, rms), minlength=len(self._rms_hist))
+        self._rms_max = max(self._rms_max, float(rms.max()))
+
+    def finalize(self) -> dict | None:
+        """The feature dict for everything fed so far (same keys as extract_features)."""
+        block = self._take_frames()
+        if block is not None:
+            self.analyze(block)
+        duration = self.samples / self.sample_rate
+        if duration < MIN_DURATION_SECONDS:
+            return None
+        frames_seen = int(self._rms_hist.sum())
+        quiet = int(self._rms_hist[: np.searchsorted(self.RMS_BINS, self._rms_max * 0.1)].sum())
+        return {
+            "pitch_mean": self.pitch.mean,
+            "pitch_std": self.pitch.std,
+            "tremor": self._tremor_sum / self._tremor_count if self._tremor_count else 0.0,
+            "energy_rms": self.energy.mean,
+            "pause_ratio": quiet / frames_seen if frames_seen else 0.0,
+            "tone_brightness": self.centroid.mean,
+            "duration": duration,
+        }
@@ -0,0 +1,56 @@
+import re
+
+# Extract [ACTION:TYPE|VALUE]
+ACTION_PATTERN = r"\[ACTION:([^\|\]]+)\|([^\]]+)\]"
+ACTION_RE = re.compile(ACTION_PATTERN)
+ACTION_PREFIX = "[ACTION:"
+
+
+def extract_actions(text: str) -> tuple[str, list[dict]]:
+    """Split a complete response into the text to show/speak and the actions it requested."""
+    actions = [{"type": action_type, "value": action_value} for action_type, action_value in ACTION_RE.findall(text or "")]
+    return ACTION_RE.sub("", text or "").strip(), actions
+
+
+class ActionStreamParser:
+    """Incremental version of extract_actions for token streams.
+
+    Text is released as soon as it cannot be part of an action tag; a partial
+    ``[ACTION:...`` is held back until it closes (or grows past MAX_TAG_LENGTH).
+    """
+
+    MAX_TAG_LENGTH = 512
+
+    def __init__(self):
+        self._pending = ""
+        self.actions: list[dict] = []
+
+    def feed(self, token: str) -> tuple[str, list[dict]]:
+        self._pending += token or ""
+        out: list[str] = []
+        found: list[dict] = []
+        while self._pending:
+            start = self._pending.find("[")
+            if start < 0:
+                out.append(self._pending)
+                self._pending = ""
+                break
+            out.append(self._pending[:start])
+            rest = self._pending[start:]
+            match = ACTION_RE.match(rest)
+            if match:
+                found.append({"type": match.group(1), "value": match.group(2)})
+                self._pending = rest[match.end() :]
+                continue
+            could_be_tag = rest.startswith(ACTION_PREFIX) if len(rest) >= len(ACTION_PREFIX) else ACTION_PREFIX.startswith(rest)
+            if could_be_tag and "]" not in rest and len(rest) <= self.MAX_TAG_LENGTH:
+                self._pending = rest
+                break
+            out.append("[")
+            self._pending = rest[1:]
+        self.actions.extend(found)
+        return "".join(out), found
+
+    def flush(self) -> str:
+        rest, self._pending = self._pending, ""
+        return rest
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class AudioBuffer:
+    """Growable PCM buffer shared by the WebSocket ingest path and the streaming transcriber.
+
+    Appends write into preallocated capacity (doubling on overflow), so an utterance costs
+    amortised O(1) per chunk instead of re-copying everything received so far.
+    """
+
+    SAMPLE_WIDTH = 2
+    DEFAULT_CAPACITY = 16000 * 2 * 10  # 10s of 16kHz Int16 mono
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._initial_capacity = max(int(capacity), 1)
+        self._data = bytearray(self._initial_capacity)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, chunk: bytes) -> None:
+        size = len(chunk)
+        if not size:
+            return
+        end = self._length + size
+        if end > len(self._data):
+            self._grow(end)
+        self._data[self._length : end] = chunk
+        self._length = end
+
+    def _grow(self, required: int) -> None:
+        capacity = len(self._data)
+        while capacity < required:
+            capacity *= 2
+        # Allocate a fresh backing store instead of resizing in place: numpy views handed
+        # out for an in-flight transcription keep the old one alive and valid.
+        grown = bytearray(capacity)
+        grown[: self._length] = memoryview(self._data)[: self._length]
+        self._data = grown
+
+    def view(self, start: int = 0, end: int | None = None) -> memoryview:
+        end = self._length if end is None else min(end, self._length)
+        return memoryview(self._data)[start:end]
+
+    def as_int16(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Zero-copy Int16 sample view over a byte range of the buffer."""
+        start -= start % self.SAMPLE_WIDTH
+        view = self.view(start, end)
+        usable = len(view) - len(view) % self.SAMPLE_WIDTH
+        return np.frombuffer(view[:usable], dtype=np.int16)
+
+    def detach(self) -> bytearray:
+        """Hand the buffered audio to the caller and start a fresh, empty buffer."""
+        data, length = self._data, self._length
+        self._data = bytearray(self._initial_capacity)
+        self._length = 0
+        try:
+            del data[length:]
+        except BufferError:
+            # Still exported to a reader (e.g. a partial transcription thread); fall back to a copy.
+            return bytearray(memoryview(data)[:length])
+        return data
@@ -8,6 +8,11 @@ from typing import Generator, Iterable
 
 from passlib.context import CryptContext
 
+try:
+    from Levenshtein import distance as _levenshtein_distance
+except Exception:  # pragma: no cover
+    _levenshtein_distance = None
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
@@ -44,6 +49,8 @@ def calculate_levenshtein_similarity(s1: str, s2: str) -> float:
         return 1.0
     if not s1 or not s2:
         return 0.0
+    if _levenshtein_distance is not None:
+        return max(0.0, 1.0 - (_levenshtein_distance(s1, s2) / max(len(s1), len(s2))))
     rows = len(s1) + 1
     cols = len(s2) + 1
     dist = [[0] * cols for _ in range(rows)]
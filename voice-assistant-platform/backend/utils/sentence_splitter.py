@@ -0,0 +1,47 @@
+import re
+
+# Sentence end: terminal punctuation (optionally followed by closing quotes/brackets) then whitespace, or a newline
+SENTENCE_END_RE = re.compile(r"[.!?;:][\"')\]]*\s+|\n+")
+
+
+class SentenceSplitter:
+    """Turns a stream of text fragments into complete sentences as soon as they close.
+
+    Very long runs without punctuation are cut at the last space before ``max_chars``
+    so speech synthesis never waits on an unbounded sentence.
+    """
+
+    def __init__(self, min_chars: int = 2, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._pending = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._pending += text or ""
+        sentences: list[str] = []
+        search_from = 0
+        while True:
+            match = SENTENCE_END_RE.search(self._pending, search_from)
+            if match:
+                sentence = self._pending[: match.end()].strip()
+                if len(sentence) < self.min_chars:
+                    # Too short to be worth a synthesis request on its own; merge it with the next one
+                    search_from = match.end()
+                    continue
+                sentences.append(sentence)
+                self._pending = self._pending[match.end() :]
+                search_from = 0
+                continue
+            if len(self._pending) > self.max_chars:
+                cut = self._pending.rfind(" ", 0, self.max_chars)
+                cut = cut if cut > 0 else self.max_chars
+                sentences.append(self._pending[:cut].strip())
+                self._pending = self._pending[cut:].lstrip()
+                search_from = 0
+                continue
+            break
+        return [s for s in sentences if s]
+
+    def flush(self) -> list[str]:
+        rest, self._pending = self._pending.strip(), ""
+        return [rest] if rest else []
@@ -0,0 +1,157 @@
+"""
+Single-pass keyword and pattern scanning shared by the urgency, fraud and emotion scorers.
+
+Scorers register their vocabularies by category at import time:
+
+    text_scanner.add_keywords("urgency.critical", ["emergency", "help me", ...])
+    text_scanner.add_patterns("fraud.otp", [r"\\b(otp|one.?time.?password)\\b", ...])
+
+``text_scanner.scan(text)`` then walks the lowercased text once with an Aho-Corasick
+automaton for every literal keyword (substring semantics, like ``kw in text``) and
+with a single compiled alternation of all patterns, and returns the hits per category.
+The alternation only gates the patterns: most transcripts match none and are done in
+one pass, the rest are counted per pattern exactly as ``re.findall`` did. Results are
+cached per text, so the scorers of one turn, and the history messages re-scanned on
+every turn, share the same pass.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except Exception:  # pragma: no cover
+    ahocorasick = None
+
+
+class KeywordAutomaton:
+    """Aho-Corasick over a fixed set of keywords; reports every (possibly overlapping) occurrence."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(keywords))
+        if ahocorasick is not None:
+            self._native = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._native.add_word(keyword, keyword)
+            if self.keywords:
+                self._native.make_automaton()
+            return
+        self._native = None
+        # Pure-Python fallback: trie transitions, failure links and merged outputs per state
+        self._goto: list[dict[str, int]] = [{}]
+        self._output: list[list[str]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(keyword)
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[str]:
+        if not self.keywords:
+            return
+        if self._native is not None:
+            for _, keyword in self._native.iter(text):
+                yield keyword
+            return
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+
+
+class TextSignals:
+    """Hits of one scan: distinct keywords and per-pattern match counts, by category."""
+
+    __slots__ = ("keywords", "patterns")
+
+    def __init__(self, keywords: dict[str, list[str]], patterns: dict[str, dict[str, int]]):
+        self.keywords = keywords
+        self.patterns = patterns
+
+    def hits(self, category: str) -> list[str]:
+        return self.keywords.get(category, [])
+
+    def count(self, category: str) -> int:
+        """Number of distinct keywords of the category found (what ``sum(kw in text ...)`` counted)."""
+        return len(self.keywords.get(category, ()))
+
+    def has(self, category: str) -> bool:
+        return category in self.keywords or category in self.patterns
+
+    def pattern_matches(self, category: str) -> tuple[int, list[str]]:
+        """Total matches and the patterns that matched, for a pattern category."""
+        counts = self.patterns.get(category, {})
+        return sum(counts.values()), list(counts)
+
+
+class TextScanner:
+    def __init__(self, cache_size: int = 1024):
+        self._keyword_categories: dict[str, set[str]] = {}
+        self._patterns: list[tuple[str, re.Pattern]] = []
+        self._automaton: KeywordAutomaton | None = None
+        self._regex: re.Pattern | None = None
+        self.scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    def add_keywords(self, category: str, keywords: Iterable[str]) -> None:
+        for keyword in keywords:
+            self._keyword_categories.setdefault(keyword.lower(), set()).add(category)
+        self._invalidate()
+
+    def add_patterns(self, category: str, patterns: Iterable[str]) -> None:
+        # Idempotent like add_keywords: registering a scorer twice must not double its counts
+        known = {(known_category, pattern.pattern) for known_category, pattern in self._patterns}
+        for pattern in patterns:
+            if (category, pattern) not in known:
+                known.add((category, pattern))
+                self._patterns.append((category, re.compile(pattern, re.IGNORECASE)))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._automaton = self._regex = None
+        self.scan.cache_clear()
+
+    def _compile(self) -> None:
+        self._automaton = KeywordAutomaton(self._keyword_categories)
+        # Non-capturing wrappers keep each pattern's own groups and alternations intact
+        combined = "|".join(f"(?:{pattern.pattern})" for _, pattern in self._patterns)
+        self._regex = re.compile(combined, re.IGNORECASE) if combined else None
+
+    def _scan(self, text: str) -> TextSignals:
+        if self._automaton is None:
+            self._compile()
+        text = (text or "").lower()
+        keywords: dict[str, list[str]] = {}
+        for keyword in set(self._automaton.iter(text)):
+            for category in self._keyword_categories[keyword]:
+                keywords.setdefault(category, []).append(keyword)
+        patterns: dict[str, dict[str, int]] = {}
+        if self._regex is not None and self._regex.search(text):
+            for category, pattern in self._patterns:
+                matches = sum(1 for _ in pattern.finditer(text))
+                if matches:
+                    patterns.setdefault(category, {})[pattern.pattern] = matches
+        return TextSignals(keywords, patterns)
+
+
+text_scanner = TextScanner()
@@ -0,0 +1,141 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+# Unvoiced consonants (s, f, sh) are quiet but cross zero often; count them as speech
+# when they are at least this loud relative to the energy threshold.
+ZCR_SPEECH_RATE = 0.25
+ZCR_ENERGY_FACTOR = 0.5
+
+
+def frame_features(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame RMS energy (on a [-1, 1] scale) and zero-crossing rate for Int16 samples."""
+    frame_len = sample_rate * frame_ms // 1000
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_len - 1)
+    return rms, zcr
+
+
+def speech_mask(samples: np.ndarray, threshold: float, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    rms, zcr = frame_features(samples, sample_rate, frame_ms)
+    return (rms >= threshold) | ((rms >= threshold * ZCR_ENERGY_FACTOR) & (zcr >= ZCR_SPEECH_RATE))
+
+
+def speech_bounds(
+    samples: np.ndarray,
+    threshold: float,
+    sample_rate: int = SAMPLE_RATE,
+    padding_ms: int = 150,
+) -> tuple[int | None, int | None]:
+    """Sample range [start, end) spanning detected speech plus padding, or (None, None) if there is none."""
+    mask = speech_mask(samples, threshold, sample_rate)
+    voiced = np.flatnonzero(mask)
+    if len(voiced) == 0:
+        return None, None
+    frame_len = sample_rate * FRAME_MS // 1000
+    pad = sample_rate * padding_ms // 1000
+    start = max(int(voiced[0]) * frame_len - pad, 0)
+    end = min((int(voiced[-1]) + 1) * frame_len + pad, len(samples))
+    return start, end
+
+
+def split_on_silence(
+    samples: np.ndarray,
+    threshold: float,
+    max_samples: int,
+    overlap_samples: int,
+    sample_rate: int = SAMPLE_RATE,
+    min_silence_ms: int = 300,
+) -> list[tuple[int, int, int, int]]:
+    """Split long audio into windows of at most max_samples, cutting in pauses where possible.
+
+    Returns (start, end, keep_start, keep_end) sample offsets per window. Windows cut in a
+    pause meet exactly at the cut. Where no pause of min_silence_ms exists in the second half
+    of a window, the next window starts overlap_samples early and the hand-over point is the
+    middle of the overlap. A segment decoded from a window is kept when its midpoint lies in
+    [keep_start, keep_end).
+
+    Raises ValueError unless 0 <= overlap_samples < max_samples; otherwise a window
+    without a pause would never advance.
+    """
+    if not 0 <= overlap_samples < max_samples:
+        raise ValueError(f"overlap_samples ({overlap_samples}) must be >= 0 and smaller than max_samples ({max_samples})")
+    total = len(samples)
+    if total <= max_samples:
+        return [(0, total, 0, total)]
+    frame_len = sample_rate * FRAME_MS // 1000
+    silent = ~speech_mask(samples, threshold, sample_rate)
+    min_run = max(min_silence_ms // FRAME_MS, 1)
+
+    windows = []
+    start = keep_start = 0
+    while total - start > max_samples:
+        limit = start + max_samples
+        # Latest pause long enough to be a phrase boundary, searched in the second half of the window
+        lo, hi = (start + max_samples // 2) // frame_len, limit // frame_len
+        run, cut = 0, None
+        for frame in range(hi - 1, lo - 1, -1):
+            run = run + 1 if silent[frame] else 0
+            if run >= min_run:
+                cut = (frame + run // 2) * frame_len
+                break
+        if cut is not None:
+            windows.append((start, cut, keep_start, cut))
+            start = keep_start = cut
+        else:
+            handover = limit - overlap_samples // 2
+            windows.append((start, limit, keep_start, handover))
+            start, keep_start = limit - overlap_samples, handover
+    windows.append((start, total, keep_start, total))
+    return windows
+
+
+class VoiceActivityDetector:
+    """Streaming end-of-speech detector fed with raw Int16 PCM chunks of any size."""
+
+    def __init__(
+        self,
+        threshold: float,
+        end_silence_ms: int = 800,
+        min_speech_ms: int = 300,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.threshold = threshold
+        self.end_silence_ms = end_silence_ms
+        self.min_speech_ms = min_speech_ms
+        self.sample_rate = sample_rate
+        self._frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self.reset()
+
+    def reset(self) -> None:
+        self._pending = b""
+        self.speech_ms = 0
+        self.trailing_silence_ms = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self.speech_ms >= self.min_speech_ms
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a chunk; True once enough speech was followed by end_silence_ms of silence."""
+        data = self._pending + bytes(chunk)
+        usable = len(data) - len(data) % self._frame_bytes
+        self._pending = data[usable:]
+        if not usable:
+            return False
+
+        mask = speech_mask(np.frombuffer(data[:usable], dtype=np.int16), self.threshold, self.sample_rate)
+        voiced = np.flatnonzero(mask)
+        if len(voiced):
+            self.speech_ms += len(voiced) * FRAME_MS
+            # Only the frames after the last voiced one count as trailing silence
+            self.trailing_silence_ms = (len(mask) - 1 - int(voiced[-1])) * FRAME_MS
+        else:
+            self.trailing_silence_ms += len(mask) * FRAME_MS
+
+        return self.in_speech and self.trailing_silence_ms >= self.end_silence_ms
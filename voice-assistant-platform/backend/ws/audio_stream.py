@@ -1,15 +1,19 @@
 import asyncio
 import base64
 import json
-import re
 import time
 from typing import Dict
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
 
+from config import settings
+from models.emotion_service import emotion_service
 from models.whisper_service import whisper_service
 from services.session_service import session_service
+from utils.audio_buffer import AudioBuffer
 from utils.logger import get_logger
+from utils.vad import VoiceActivityDetector
+from ws import protocol
 
 router = APIRouter()
 logger = get_logger("ws.audio")
@@ -18,50 +22,354 @@ logger = get_logger("ws.audio")
 class ConnectionManager:
     def __init__(self):
         self.active: Dict[str, WebSocket] = {}
-        self.audio_buffers: Dict[str, bytes] = {}
+        self.audio_buffers: Dict[str, AudioBuffer] = {}
         self.audio_chunks: Dict[str, int] = {}
         self.last_ping: Dict[str, float] = {}
+        self.protocols: Dict[str, str] = {}
+        self.send_seq: Dict[str, int] = {}
+        self.recv_seq: Dict[str, int] = {}
+        self.vads: Dict[str, VoiceActivityDetector] = {}
+        self.audio_pending: Dict[str, bytes] = {}
+        self.audio_index: Dict[str, int] = {}
+        self.auto_endpointed: Dict[str, bool] = {}
+        # Running turn per session; a new turn waits for it so replies never interleave
+        self.turns: Dict[str, asyncio.Task] = {}
 
     async def connect(self, session_id: str, ws: WebSocket):
         await ws.accept()
         self.active[session_id] = ws
-        self.audio_buffers[session_id] = b""
+        self.audio_buffers[session_id] = AudioBuffer()
         self.audio_chunks[session_id] = 0
         self.last_ping[session_id] = time.time()
+        self.protocols[session_id] = protocol.PROTOCOL_JSON
+        self.send_seq[session_id] = 0
+        if settings.VAD_ENABLED:
+            self.vads[session_id] = VoiceActivityDetector(
+                threshold=whisper_service.SILENCE_THRESHOLD,
+                end_silence_ms=settings.VAD_END_SILENCE_MS,
+                min_speech_ms=settings.VAD_MIN_SPEECH_MS,
+                sample_rate=whisper_service.SAMPLE_RATE,
+            )
 
     async def disconnect(self, session_id: str):
         self.active.pop(session_id, None)
         self.audio_buffers.pop(session_id, None)
         self.audio_chunks.pop(session_id, None)
         self.last_ping.pop(session_id, None)
+        self.protocols.pop(session_id, None)
+        self.send_seq.pop(session_id, None)
+        self.recv_seq.pop(session_id, None)
+        self.vads.pop(session_id, None)
+        self.audio_pending.pop(session_id, None)
+        self.audio_index.pop(session_id, None)
+        self.auto_endpointed.pop(session_id, None)
+        turn = self.turns.pop(session_id, None)
+        if turn is not None:
+            turn.cancel()
+        whisper_service.end_session(session_id)
+        emotion_service.reset_stream(session_id)
+
+    def set_protocol(self, session_id: str, mode: str):
+        self.protocols[session_id] = mode
+
+    def is_binary(self, session_id: str) -> bool:
+        return self.protocols.get(session_id) == protocol.PROTOCOL_BINARY
+
+    def _next_seq(self, session_id: str) -> int:
+        seq = self.send_seq.get(session_id, 0)
+        self.send_seq[session_id] = (seq + 1) & protocol.MAX_SEQUENCE
+        return seq
 
     async def send(self, session_id: str, data: dict):
         ws = self.active.get(session_id)
         if ws:
             try:
-                await ws.send_json(data)
+                if self.is_binary(session_id):
+                    await ws.send_bytes(protocol.encode_control(data, self._next_seq(session_id)))
+                else:
+                    await ws.send_json(data)
             except Exception:
                 await self.disconnect(session_id)
 
+    async def send_audio(self, session_id: str, audio: bytes, final: bool = True, chunk_size: int = 32768):
+        """Send TTS audio; with final=False more audio for the same reply follows in later calls."""
+        ws = self.active.get(session_id)
+        if not ws:
+            return
+        try:
+            if self.is_binary(session_id):
+                view = memoryview(audio)
+                if not len(view):
+                    if final:
+                        await ws.send_bytes(protocol.encode_audio(b"", self._next_seq(session_id), final=True))
+                    return
+                for i in range(0, len(view), chunk_size):
+                    last = final and i + chunk_size >= len(view)
+                    await ws.send_bytes(protocol.encode_audio(view[i : i + chunk_size], self._next_seq(session_id), final=last))
+            else:
+                # Legacy clients join the base64 strings before decoding, so every piece except the
+                # reply's last must cover a multiple of 3 bytes; the remainder waits for the next call.
+                data = self.audio_pending.pop(session_id, b"") + bytes(audio)
+                if not final:
+                    cut = len(data) - len(data) % 3
+                    data, self.audio_pending[session_id] = data[:cut], data[cut:]
+                raw_chunk = chunk_size // 4 * 3
+                for i in range(0, len(data), raw_chunk):
+                    index = self.audio_index.get(session_id, 0)
+                    self.audio_index[session_id] = index + 1
+                    await ws.send_json({"type": "audio_chunk", "data": base64.b64encode(data[i : i + raw_chunk]).decode(), "index": index})
+                if final:
+                    self.audio_index.pop(session_id, None)
+        except Exception:
+            await self.disconnect(session_id)
+
+    def track_inbound_seq(self, session_id: str, seq: int) -> None:
+        expected = self.recv_seq.get(session_id)
+        if expected is not None and seq != expected:
+            logger.warning("ws_audio_seq_gap", session_id=session_id, expected=expected, received=seq)
+        self.recv_seq[session_id] = (seq + 1) & protocol.MAX_SEQUENCE
+
+    def get_buffer(self, session_id: str) -> AudioBuffer:
+        buf = self.audio_buffers.get(session_id)
+        if buf is None:
+            buf = self.audio_buffers[session_id] = AudioBuffer()
+        return buf
+
     def append_audio(self, session_id: str, chunk: bytes):
-        self.audio_buffers[session_id] = self.audio_buffers.get(session_id, b"") + chunk
+        self.get_buffer(session_id).append(chunk)
         self.audio_chunks[session_id] = self.audio_chunks.get(session_id, 0) + 1
 
     def get_audio_stats(self, session_id: str) -> dict:
-        buf = self.audio_buffers.get(session_id, b"")
+        buf = self.audio_buffers.get(session_id)
         return {
-            "bytes": len(buf),
+            "bytes": len(buf) if buf is not None else 0,
             "chunks": int(self.audio_chunks.get(session_id, 0)),
         }
 
-    def get_and_clear_audio(self, session_id: str) -> bytes:
-        buf = self.audio_buffers.get(session_id, b"")
-        self.audio_buffers[session_id] = b""
-        return buf
+    def detect_endpoint(self, session_id: str, chunk: bytes) -> bool:
+        vad = self.vads.get(session_id)
+        return vad.feed(chunk) if vad is not None else False
+
+    def get_and_clear_audio(self, session_id: str) -> bytearray:
+        vad = self.vads.get(session_id)
+        if vad is not None:
+            vad.reset()
+        # Ownership of the accumulated bytes moves to the caller; no copy is made.
+        return self.get_buffer(session_id).detach()
 
 
 manager = ConnectionManager()
 
+async def _handle_audio_chunk(session_id: str, audio_chunk: bytes):
+    manager.append_audio(session_id, audio_chunk)
+    # Acoustic emotion features build up while the user is still speaking
+    emotion_service.feed(session_id, audio_chunk)
+
+    if manager.detect_endpoint(session_id, audio_chunk):
+        # Server-side endpointing: the speaker went quiet, run the turn without waiting for end_stream
+        logger.info("vad_endpoint_detected", session_id=session_id, bytes_total=manager.get_audio_stats(session_id)["bytes"])
+        # The client's own end_stream for this utterance will be dropped; tell it the turn has started
+        await manager.send(session_id, {"type": "endpoint_detected"})
+        await _start_turn(session_id, manager.get_and_clear_audio(session_id))
+        manager.auto_endpointed[session_id] = True
+        return
+
+    # Send ingestion stats
+    stats = manager.get_audio_stats(session_id)
+    await manager.send(
+        session_id,
+        {
+            "type": "ingest_stats",
+            "bytes_received": stats["bytes"],
+            "chunks_received": stats["chunks"],
+        },
+    )
+
+    # NEW: Mid-prompt action detection
+    # Every 1.5s of new audio, check for "open X" or "go to X"
+    try:
+        text_so_far = await whisper_service.transcribe_stream(session_id, manager.get_buffer(session_id))
+    except Exception as e:
+        logger.error("whisper_stream_exception", error=str(e), session_id=session_id)
+        text_so_far = ""
+    if text_so_far:
+        # Update live transcript in UI
+        await manager.send(session_id, {"type": "transcript_chunk", "text": text_so_far, "final": False})
+        
+        # Detect intents seamlessly
+        text_lower = text_so_far.lower()
+        actions = []
+        if "open" in text_lower or "go to" in text_lower or "show" in text_lower:
+            if "analytics" in text_lower:
+                actions.append({"type": "NAVIGATE", "value": "/analytics"})
+            elif "dashboard" in text_lower:
+                actions.append({"type": "NAVIGATE", "value": "/dashboard"})
+            elif "interaction" in text_lower or "log" in text_lower:
+                actions.append({"type": "NAVIGATE", "value": "/transcripts"})
+            elif "google" in text_lower:
+                actions.append({"type": "OPEN_URL", "value": "https://google.com"})
+        
+        if actions:
+            logger.info("seamless_action_triggered", session_id=session_id, actions=actions)
+            await manager.send(session_id, {"type": "execute_actions", "actions": actions})
+
+
+async def _handle_end_stream(session_id: str):
+    audio_data = manager.get_and_clear_audio(session_id)
+    if manager.auto_endpointed.pop(session_id, False):
+        # The client's end_stream trailing an utterance the VAD already closed; what arrived since is trailing noise
+        whisper_service.reset_stream(session_id)
+        emotion_service.reset_stream(session_id)
+        logger.info("end_stream_after_endpoint_dropped", session_id=session_id, bytes_total=len(audio_data))
+        return
+    await _start_turn(session_id, audio_data)
+
+
+async def _start_turn(session_id: str, audio_data: bytearray):
+    """Close the utterance and run its turn as a task, so the receive loop keeps ingesting audio."""
+    # Both finishers take the session's stream state now; audio for the next utterance starts fresh
+    features_task = asyncio.ensure_future(emotion_service.finish_stream(session_id, len(audio_data)))
+    logger.info("stream_end_received", session_id=session_id, bytes_total=len(audio_data))
+
+    # Check for audio too short (under 0.5s at 16k mono 16bit)
+    if len(audio_data) < 16000:
+        features_task.cancel()
+        logger.warning("audio_too_short", session_id=session_id, bytes=len(audio_data))
+        whisper_service.reset_stream(session_id)
+        await manager.send(session_id, {"type": "error", "message": "Audio input too short. Please speak longer.", "code": "AUDIO_TOO_SHORT"})
+        return
+
+    # Reuses the segments already committed by the live partials; only the unstable tail is decoded again
+    transcription_task = asyncio.ensure_future(whisper_service.finish_stream(session_id, audio_data))
+    previous = manager.turns.get(session_id)
+    turn = asyncio.create_task(_run_turn(session_id, audio_data, transcription_task, features_task, previous))
+    manager.turns[session_id] = turn
+
+    def forget(task: asyncio.Task):
+        if manager.turns.get(session_id) is task:
+            manager.turns.pop(session_id, None)
+
+    turn.add_done_callback(forget)
+
+
+async def _run_turn(
+    session_id: str,
+    audio_data: bytearray,
+    transcription_task: asyncio.Future,
+    features_task: asyncio.Future,
+    previous: asyncio.Task | None,
+):
+    try:
+        if previous is not None:
+            # Transcription of this utterance already runs; only its reply waits for the previous one
+            await asyncio.wait({previous})
+        await manager.send(session_id, {"type": "processing_started"})
+        await manager.send(session_id, {"type": "transcript_chunk", "text": "Transcribing...", "final": False})
+        transcription = await transcription_task
+
+        async def emit(event: dict):
+            if event.get("type") == "audio_chunk":
+                await manager.send_audio(session_id, event["data"], final=False)
+            else:
+                await manager.send(session_id, event)
+
+        # Response tokens, actions and per-sentence TTS audio are forwarded by `emit` while the LLM streams
+        result = await session_service.process_audio_message(
+            session_id, audio_data, transcription=transcription, on_event=emit, audio_features=await features_task
+        )
+    except asyncio.CancelledError:
+        transcription_task.cancel()
+        features_task.cancel()
+        raise
+    except Exception as exc:
+        logger.error("turn_failed", session_id=session_id, error=str(exc))
+        await manager.send(session_id, {"type": "error", "message": "Failed to process audio", "code": "PIPELINE_ERROR"})
+        return
+
+    if "error" in result:
+        await manager.send(session_id, {"type": "error", "message": result["error"], "code": "PIPELINE_ERROR"})
+        return
+
+    await manager.send(session_id, {"type": "transcript_final", "text": result["transcript"], "analysis": result["analysis"]})
+    await manager.send(session_id, {"type": "response_final", "text": result["clean_response"]})
+
+    # Audio was streamed by `emit`; this only flushes the remainder / marks the end of the reply
+    await manager.send_audio(session_id, b"", final=True)
+
+    await manager.send(
+        session_id,
+        {
+            "type": "audio_complete",
+            "processing_time_ms": result["processing_time_ms"],
+            "emotion": result["analysis"].get("emotion", {}),
+        },
+    )
+
+
+async def _handle_message(session_id: str, message: dict):
+    msg_type = message.get("type")
+
+    if msg_type == "audio_chunk":
+        # Frontend sends base64 audio under `data`. Accept a few aliases for robustness.
+        payload = message.get("data") or message.get("payload") or message.get("chunk")
+        if not payload:
+            await manager.send(session_id, {"type": "error", "message": "Missing audio chunk payload", "code": "BAD_AUDIO_CHUNK"})
+            return
+
+        if isinstance(payload, (bytes, bytearray)):
+            # msgpack control frames may carry raw bytes instead of base64
+            audio_chunk = payload
+        else:
+            try:
+                audio_chunk = base64.b64decode(payload)
+            except Exception as e:
+                await manager.send(session_id, {"type": "error", "message": f"Invalid base64 audio chunk: {str(e)}", "code": "BAD_AUDIO_CHUNK"})
+                return
+
+        await _handle_audio_chunk(session_id, audio_chunk)
+
+    elif msg_type == "end_stream":
+        await _handle_end_stream(session_id)
+
+    elif msg_type == "hello":
+        # Protocol negotiation; the acknowledgement always goes out as JSON text so any client can read it.
+        requested = message.get("protocol", protocol.PROTOCOL_JSON)
+        mode = protocol.PROTOCOL_BINARY if requested == protocol.PROTOCOL_BINARY else protocol.PROTOCOL_JSON
+        manager.set_protocol(session_id, protocol.PROTOCOL_JSON)
+        await manager.send(session_id, {"type": "hello", "protocol": mode, "codec": protocol.control_codec() if mode == protocol.PROTOCOL_BINARY else "json"})
+        manager.set_protocol(session_id, mode)
+        if "language" in message:
+            # e.g. "en" / "english"; pins Whisper to it for the session instead of detecting per utterance
+            whisper_service.set_session_language(session_id, message.get("language"))
+
+    elif msg_type == "pong":
+        manager.last_ping[session_id] = time.time()
+
+    elif msg_type == "ping":
+        # Allow clients to also ping the server
+        await manager.send(session_id, {"type": "pong"})
+
+
+async def _handle_binary_frame(session_id: str, data: bytes):
+    try:
+        kind, flags, seq, payload = protocol.decode_frame(data)
+        if kind == protocol.KIND_CONTROL:
+            message = protocol.decode_control(payload, flags)
+    except protocol.FrameError as e:
+        await manager.send(session_id, {"type": "error", "message": str(e), "code": "BAD_FRAME"})
+        return
+
+    manager.track_inbound_seq(session_id, seq)
+    if kind == protocol.KIND_CONTROL:
+        await _handle_message(session_id, message)
+        return
+
+    if len(payload):
+        await _handle_audio_chunk(session_id, payload)
+    if flags & protocol.FLAG_END:
+        # The last audio frame of an utterance doubles as end_stream
+        await _handle_end_stream(session_id)
+
 
 @router.websocket("/ws/audio/{session_id}")
 async def handle_audio_websocket(websocket: WebSocket, session_id: str):
@@ -116,12 +424,15 @@ async def handle_audio_websocket(websocket: WebSocket, session_id: str):
             if session_id in manager.active:
                 await manager.send(session_id, {"type": "ping"})
 
+    if websocket.query_params.get("protocol") == protocol.PROTOCOL_BINARY:
+        await _handle_message(session_id, {"type": "hello", "protocol": protocol.PROTOCOL_BINARY})
+
     heartbeat_task = asyncio.create_task(heartbeat())
 
     try:
         while True:
             try:
-                raw = await asyncio.wait_for(websocket.receive_text(), timeout=60.0)
+                raw = await asyncio.wait_for(websocket.receive(), timeout=60.0)
             except asyncio.TimeoutError:
                 print(f"--- WS TIMEOUT: {session_id} ---")
                 await manager.send(session_id, {"type": "error", "message": "Connection timed out", "code": "TIMEOUT"})
@@ -130,133 +441,21 @@ async def handle_audio_websocket(websocket: WebSocket, session_id: str):
                 print(f"--- WS RECEIVE FAILED: {session_id} {str(e)} ---")
                 break
 
+            if raw.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(raw.get("code", status.WS_1000_NORMAL_CLOSURE))
+
+            if raw.get("bytes") is not None:
+                await _handle_binary_frame(session_id, raw["bytes"])
+                continue
+
             print(f"--- WS MSG RECEIVED: {session_id} ---")
             try:
-                message = json.loads(raw)
+                message = json.loads(raw.get("text") or "")
             except Exception as e:
                 print(f"--- WS JSON PARSE FAILED: {session_id} {str(e)} ---")
                 continue
 
-            msg_type = message.get("type")
-
-            if msg_type == "audio_chunk":
-                # Frontend sends base64 audio under `data`. Accept a few aliases for robustness.
-                b64 = message.get("data") or message.get("payload") or message.get("chunk")
-                if not b64:
-                    await manager.send(session_id, {"type": "error", "message": "Missing audio chunk payload", "code": "BAD_AUDIO_CHUNK"})
-                    continue
-
-                try:
-                    audio_chunk = base64.b64decode(b64)
-                except Exception as e:
-                    await manager.send(session_id, {"type": "error", "message": f"Invalid base64 audio chunk: {str(e)}", "code": "BAD_AUDIO_CHUNK"})
-                    continue
-
-                manager.append_audio(session_id, audio_chunk)
-
-                # Send ingestion stats
-                stats = manager.get_audio_stats(session_id)
-                await manager.send(
-                    session_id,
-                    {
-                        "type": "ingest_stats",
-                        "bytes_received": stats["bytes"],
-                        "chunks_received": stats["chunks"],
-                    },
-                )
-
-                # NEW: Mid-prompt action detection
-                # Every 1.5s of new audio, check for "open X" or "go to X"
-                try:
-                    text_so_far = await whisper_service.transcribe_stream(audio_chunk, session_id)
-                except Exception as e:
-                    logger.error("whisper_stream_exception", error=str(e), session_id=session_id)
-                    text_so_far = ""
-                if text_so_far:
-                    # Update live transcript in UI
-                    await manager.send(session_id, {"type": "transcript_chunk", "text": text_so_far, "final": False})
-                    
-                    # Detect intents seamlessly
-                    text_lower = text_so_far.lower()
-                    actions = []
-                    if "open" in text_lower or "go to" in text_lower or "show" in text_lower:
-                        if "analytics" in text_lower:
-                            actions.append({"type": "NAVIGATE", "value": "/analytics"})
-                        elif "dashboard" in text_lower:
-                            actions.append({"type": "NAVIGATE", "value": "/dashboard"})
-                        elif "interaction" in text_lower or "log" in text_lower:
-                            actions.append({"type": "NAVIGATE", "value": "/transcripts"})
-                        elif "google" in text_lower:
-                            actions.append({"type": "OPEN_URL", "value": "https://google.com"})
-                    
-                    if actions:
-                        logger.info("seamless_action_triggered", session_id=session_id, actions=actions)
-                        await manager.send(session_id, {"type": "execute_actions", "actions": actions})
-
-            elif msg_type == "end_stream":
-                audio_data = manager.get_and_clear_audio(session_id)
-                logger.info("stream_end_received", session_id=session_id, bytes_total=len(audio_data))
-                
-                # Check for audio too short (under 0.5s at 16k mono 16bit)
-                if len(audio_data) < 16000: 
-                    logger.warning("audio_too_short", session_id=session_id, bytes=len(audio_data))
-                    await manager.send(session_id, {"type": "error", "message": "Audio input too short. Please speak longer.", "code": "AUDIO_TOO_SHORT"})
-                    continue
-
-                await manager.send(session_id, {"type": "processing_started"})
-                await manager.send(session_id, {"type": "transcript_chunk", "text": "Transcribing...", "final": False})
-                result = await session_service.process_audio_message(session_id, audio_data)
-
-                if "error" in result:
-                    await manager.send(session_id, {"type": "error", "message": result["error"], "code": "PIPELINE_ERROR"})
-                    continue
-
-                # Parse response for actions
-                response_text = result["response_text"]
-                actions = []
-                
-                # Extract [ACTION:TYPE|VALUE]
-                action_pattern = r"\[ACTION:([^\|\]]+)\|([^\]]+)\]"
-                found_actions = re.findall(action_pattern, response_text)
-                for action_type, action_value in found_actions:
-                    actions.append({"type": action_type, "value": action_value})
-                
-                # Clean the text for TTS and UI display
-                clean_response = re.sub(action_pattern, "", response_text).strip()
-
-                await manager.send(session_id, {"type": "transcript_final", "text": result["transcript"], "analysis": result["analysis"]})
-
-                # Send actions if any
-                if actions:
-                    await manager.send(session_id, {"type": "execute_actions", "actions": actions})
-
-                words = clean_response.split()
-                for i, word in enumerate(words):
-                    await manager.send(session_id, {"type": "response_chunk", "text": word + (" " if i < len(words) - 1 else "")})
-                    await asyncio.sleep(0.05)
-
-                await manager.send(session_id, {"type": "response_final", "text": clean_response})
-
-                audio_b64 = base64.b64encode(result["audio_bytes"]).decode()
-                chunk_size = 32768
-                for i in range(0, len(audio_b64), chunk_size):
-                    await manager.send(session_id, {"type": "audio_chunk", "data": audio_b64[i : i + chunk_size], "index": i // chunk_size})
-
-                await manager.send(
-                    session_id,
-                    {
-                        "type": "audio_complete",
-                        "processing_time_ms": result["processing_time_ms"],
-                        "emotion": result["analysis"].get("emotion", {}),
-                    },
-                )
-
-            elif msg_type == "pong":
-                manager.last_ping[session_id] = time.time()
-
-            elif msg_type == "ping":
-                # Allow clients to also ping the server
-                await manager.send(session_id, {"type": "pong"})
+            await _handle_message(session_id, message)
 
     except WebSocketDisconnect:
         print(f"--- WS DISCONNECT: {session_id} ---")
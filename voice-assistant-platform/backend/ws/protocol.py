@@ -0,0 +1,77 @@
+"""
+Binary framing for /ws/audio.
+
+Every binary WebSocket message is a 6-byte header followed by a payload:
+
+    kind (u8) | flags (u8) | sequence (u32, big endian) | payload
+
+``KIND_AUDIO`` payloads are raw 16 kHz Int16 PCM (inbound) or encoded TTS audio
+(outbound). ``KIND_CONTROL`` payloads are the same dict messages the JSON protocol
+uses, encoded with msgpack (or UTF-8 JSON when ``FLAG_JSON`` is set). Clients opt in
+with ``?protocol=binary`` or a ``{"type": "hello", "protocol": "binary"}`` text frame;
+everyone else keeps the JSON text protocol.
+"""
+
+import json
+import struct
+
+try:
+    import msgpack
+except Exception:  # pragma: no cover
+    msgpack = None
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+
+KIND_AUDIO = 0x01
+KIND_CONTROL = 0x02
+
+FLAG_END = 0x01
+FLAG_JSON = 0x02
+
+HEADER = struct.Struct("!BBI")
+MAX_SEQUENCE = 0xFFFFFFFF
+
+
+class FrameError(ValueError):
+    pass
+
+
+def control_codec() -> str:
+    return "msgpack" if msgpack is not None else PROTOCOL_JSON
+
+
+def encode_frame(kind: int, payload: bytes, seq: int, flags: int = 0) -> bytes:
+    return HEADER.pack(kind, flags, seq & MAX_SEQUENCE) + payload
+
+
+def decode_frame(data: bytes) -> tuple[int, int, int, memoryview]:
+    if len(data) < HEADER.size:
+        raise FrameError(f"frame shorter than {HEADER.size}-byte header")
+    kind, flags, seq = HEADER.unpack_from(data)
+    if kind not in (KIND_AUDIO, KIND_CONTROL):
+        raise FrameError(f"unknown frame kind {kind}")
+    return kind, flags, seq, memoryview(data)[HEADER.size :]
+
+
+def encode_control(message: dict, seq: int) -> bytes:
+    if msgpack is not None:
+        return encode_frame(KIND_CONTROL, msgpack.packb(message, use_bin_type=True), seq)
+    return encode_frame(KIND_CONTROL, json.dumps(message).encode("utf-8"), seq, FLAG_JSON)
+
+
+def decode_control(payload: bytes, flags: int) -> dict:
+    try:
+        if flags & FLAG_JSON or msgpack is None:
+            message = json.loads(bytes(payload).decode("utf-8"))
+        else:
+            message = msgpack.unpackb(payload, raw=False)
+    except Exception as exc:
+        raise FrameError(f"undecodable control payload: {exc}") from exc
+    if not isinstance(message, dict):
+        raise FrameError("control payload must be a map")
+    return message
+
+
+def encode_audio(audio: bytes, seq: int, final: bool = False) -> bytes:
+    return encode_frame(KIND_AUDIO, audio, seq, FLAG_END if final else 0)